@@ -0,0 +1,249 @@
+import argparse
+import json
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, replace
+from datetime import date
+from typing import Any
+
+import config
+from cache import ResponseCache, get_cache_key, get_superset_params
+from calendarific import (
+    CalendarificClient,
+    get_default_breaker,
+    get_default_hedger,
+    get_default_scheduler,
+    get_default_transport,
+)
+from custom_exceptions import InvalidInputData
+from export import JSONL
+from logger import logger, setup_logging
+from metrics import Metrics
+from parameters import CalendarParams
+from utils import get_clean_dict
+
+
+@dataclass
+class Job:
+    values: CalendarParams
+    output_dir: str
+    output_format: str = JSONL
+
+
+def load_jobs(*, path: str, output_dir: str) -> list[Job]:
+    """
+    Read jobs from a JSONL file, one job per line, e.g.
+    ``{"countries": ["ua", "us"], "start": "1992-07-07", "end": "1992-09-18"}``
+    with optional ``output_dir`` and ``format`` keys.
+    """
+    jobs = []
+
+    with open(path) as file:
+        for line_number, line in enumerate(file, start=1):
+            if not line.strip():
+                continue
+
+            try:
+                job = json.loads(line)
+                values = CalendarParams.from_dates(
+                    countries=job["countries"],
+                    start_date=date.fromisoformat(job["start"]),
+                    end_date=date.fromisoformat(job["end"]),
+                )
+            except (KeyError, TypeError, ValueError) as e:
+                raise InvalidInputData(f"Invalid job on line {line_number}: {e}")
+
+            jobs.append(
+                Job(
+                    values=values,
+                    output_dir=job.get("output_dir", output_dir),
+                    output_format=job.get("format", JSONL),
+                )
+            )
+
+    return jobs
+
+
+def get_unique_params(*, jobs: list[Job]) -> list[dict[str, Any]]:
+    """
+    Merge the requests of every job, keeping each one only once.
+
+    Requests whose period is inside another planned request for the same
+    country (e.g. a month of a planned year) are dropped as well, since they
+    are answered from the wider response.
+    """
+    unique_params: dict[str, dict[str, Any]] = {}
+    for job in jobs:
+        for params in job.values.generate_params():
+            clean_params = get_clean_dict(data=params)
+            unique_params.setdefault(get_cache_key(params=clean_params), clean_params)
+
+    return [
+        params
+        for params in unique_params.values()
+        if not any(
+            get_cache_key(params=superset) in unique_params
+            for superset in get_superset_params(params=params)
+        )
+    ]
+
+
+def group_by_country(
+    *, params: list[dict[str, Any]], min_size: int
+) -> list[dict[str, list[dict[str, Any]]]]:
+    """
+    Split requests into groups of whole countries, keyed on the country, with
+    at least ``min_size`` requests in every group but the last one.
+    """
+    by_country: dict[str, list[dict[str, Any]]] = {}
+    for country_params in params:
+        by_country.setdefault(str(country_params["country"]), []).append(country_params)
+
+    groups = []
+    group: dict[str, list[dict[str, Any]]] = {}
+    for country, country_params in by_country.items():
+        group[country] = country_params
+        if sum(len(group_params) for group_params in group.values()) >= min_size:
+            groups.append(group)
+            group = {}
+    if group:
+        groups.append(group)
+
+    return groups
+
+
+class BatchRunner:
+    """
+    Run many jobs while fetching every unique request exactly once.
+
+    Countries are handled in groups of at least ``concurrency`` requests. The
+    responses of a group are fetched into an in-memory store shared by the
+    clients that then filter and write the group's files of each job, and
+    are dropped before the next group.
+    """
+
+    def __init__(
+        self,
+        *,
+        jobs: list[Job],
+        concurrency: int = 1,
+        cache: ResponseCache | None = None,
+        refresh: bool = False,
+        fast_json: bool = False,
+    ) -> None:
+        self.jobs = jobs
+        self.concurrency = concurrency
+        self.cache = cache
+        self.refresh = refresh
+        self.fast_json = fast_json
+        self.responses: dict[str, dict] = {}
+        self.metrics = Metrics()
+        self.scheduler = get_default_scheduler(max_concurrency=concurrency)
+        # Shared by all clients, so that connections are reused across jobs
+        self.transport = get_default_transport(max_connections=concurrency)
+        # One view of the API health for all jobs
+        self.hedger = get_default_hedger(max_concurrency=concurrency)
+        self.breaker = get_default_breaker()
+
+    def run(self) -> None:
+        if not self.jobs:
+            return
+
+        unique_params = get_unique_params(jobs=self.jobs)
+        planned = sum(len(job.values.generate_params()) for job in self.jobs)
+        logger.info(
+            "%d jobs, %d planned requests, %d unique",
+            len(self.jobs),
+            planned,
+            len(unique_params),
+        )
+
+        fetcher = self._get_client(values=self.jobs[0].values, refresh=self.refresh)
+        with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            for group in group_by_country(
+                params=unique_params, min_size=self.concurrency
+            ):
+                for _ in executor.map(
+                    lambda params: fetcher._get_response(params=params),
+                    [params for country in group.values() for params in country],
+                ):
+                    pass
+
+                for job in self.jobs:
+                    countries = [
+                        country
+                        for country in job.values.countries
+                        if str(country) in group
+                    ]
+                    if countries:
+                        self._get_client(
+                            values=replace(job.values, countries=countries),
+                            refresh=False,
+                        ).run(
+                            output_dir=job.output_dir, output_format=job.output_format
+                        )
+                # Only the responses of the countries being written are held
+                self.responses.clear()
+
+    def _get_client(
+        self, *, values: CalendarParams, refresh: bool
+    ) -> CalendarificClient:
+        return CalendarificClient(
+            values=values,
+            cache=self.cache,
+            refresh=refresh,
+            responses=self.responses,
+            scheduler=self.scheduler,
+            transport=self.transport,
+            hedger=self.hedger,
+            breaker=self.breaker,
+            fast_json=self.fast_json,
+            metrics=self.metrics,
+        )
+
+
+if __name__ == "__main__":
+    setup_logging()
+    parser = argparse.ArgumentParser(
+        description="Run many Calendarific jobs from a JSONL file, "
+        "fetching each unique request once."
+    )
+    parser.add_argument("jobs", help="the JSONL file with one job per line")
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=config.CONCURRENCY,
+        help="the maximum number of requests in flight at once",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="neither read nor store responses in the local cache",
+    )
+    parser.add_argument(
+        "--refresh",
+        action="store_true",
+        help="ignore cached responses and store fresh ones",
+    )
+    parser.add_argument(
+        "--fast-json",
+        action="store_true",
+        default=config.FAST_JSON,
+        help="use orjson, when installed, to decode responses and encode output",
+    )
+    args = parser.parse_args()
+
+    BatchRunner(
+        jobs=load_jobs(path=args.jobs, output_dir=config.OUTPUT_DIR),
+        concurrency=args.concurrency,
+        cache=(
+            None
+            if args.no_cache
+            else ResponseCache(
+                path=config.CACHE_PATH,
+                ttl=config.CACHE_TTL,
+                max_entries=config.CACHE_MAX_ENTRIES,
+            )
+        ),
+        refresh=args.refresh,
+        fast_json=args.fast_json,
+    ).run()
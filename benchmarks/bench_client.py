@@ -0,0 +1,210 @@
+"""
+End-to-end benchmark of ``CalendarificClient.run`` against a local stand-in
+server (see ``benchmarks/server.py``).
+
+Every scenario runs in a fresh interpreter, so peak RSS is per scenario.
+
+    python benchmarks/bench_client.py --latency 0.02 --jitter 0.01
+    python benchmarks/bench_client.py --scenario short_windows --rate-limited 0.1
+    python benchmarks/bench_client.py --scenario many_countries --processes 4
+"""
+import argparse
+import json
+import os
+import resource
+import string
+import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import dataclass
+from datetime import date
+from itertools import product
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.server import FakeCalendarificServer  # noqa: E402
+from calendarific import AsyncCalendarificClient, CalendarificClient  # noqa: E402
+from parameters import (  # noqa: E402
+    CalendarParams,
+    Country,
+    Day,
+    EndDate,
+    Month,
+    StartDate,
+    Year,
+)
+from scheduler import RequestScheduler  # noqa: E402
+
+
+@dataclass
+class Scenario:
+    countries: int
+    start_date: date
+    end_date: date
+
+
+SCENARIOS = {
+    "many_countries": Scenario(
+        countries=40, start_date=date(1992, 1, 1), end_date=date(1992, 12, 31)
+    ),
+    "long_range": Scenario(
+        countries=3, start_date=date(1990, 1, 1), end_date=date(2019, 12, 31)
+    ),
+    "short_windows": Scenario(
+        countries=20, start_date=date(1992, 8, 22), end_date=date(1992, 8, 25)
+    ),
+}
+CONCURRENCY = {"sequential": 1, "async": 8}
+
+
+def get_countries(*, count: int) -> list[Country]:
+    codes = ("".join(pair) for pair in product(string.ascii_uppercase, repeat=2))
+
+    return [Country(value=code) for code, _ in zip(codes, range(count))]
+
+
+def percentile(*, values: list[float], share: float) -> float:
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+
+    return ordered[min(len(ordered) - 1, int(share * len(ordered)))]
+
+
+def run_scenario(*, scenario_name: str, client_name: str, args) -> dict:
+    scenario = SCENARIOS[scenario_name]
+    concurrency = CONCURRENCY[client_name]
+    values = CalendarParams(
+        countries=get_countries(count=scenario.countries),
+        start_date=StartDate(
+            Year(scenario.start_date.year),
+            Month(scenario.start_date.month),
+            Day(scenario.start_date.day),
+        ),
+        end_date=EndDate(
+            Year(scenario.end_date.year),
+            Month(scenario.end_date.month),
+            Day(scenario.end_date.day),
+        ),
+    )
+    base = AsyncCalendarificClient if concurrency > 1 else CalendarificClient
+    latencies: list[float] = []
+
+    with FakeCalendarificServer(
+        latency=args.latency,
+        jitter=args.jitter,
+        rate_limited=args.rate_limited,
+        quota=args.quota,
+        holidays_per_year=args.holidays_per_year,
+    ) as server:
+
+        class BenchmarkClient(base):
+            BASE_URL = server.url
+
+            def _send(self, *, url: str, params: dict, **kwargs):
+                started_at = time.perf_counter()
+                try:
+                    return super()._send(url=url, params=params, **kwargs)
+                finally:
+                    latencies.append(time.perf_counter() - started_at)
+
+        scheduler = RequestScheduler(
+            rate=args.rate,
+            burst=max(1, int(args.rate)),
+            max_concurrency=concurrency,
+            max_retries=5,
+            backoff_base=0.01,
+            backoff_max=0.5,
+            latency_threshold=5,
+        )
+        kwargs = {"concurrency": concurrency} if concurrency > 1 else {}
+        client = BenchmarkClient(
+            values=values, scheduler=scheduler, processes=args.processes, **kwargs
+        )
+
+        with tempfile.TemporaryDirectory() as output_dir:
+            started_at = time.perf_counter()
+            client.run(output_dir=output_dir)
+            elapsed = time.perf_counter() - started_at
+
+        return {
+            "scenario": scenario_name,
+            "client": client_name,
+            "requests": server.requests,
+            "throttled": server.throttled,
+            "connections": server.connections,
+            "sent_mb": server.bytes_sent / 1024**2,
+            "requests_per_second": server.requests / elapsed,
+            "p50_ms": percentile(values=latencies, share=0.50) * 1000,
+            "p95_ms": percentile(values=latencies, share=0.95) * 1000,
+            "p99_ms": percentile(values=latencies, share=0.99) * 1000,
+            "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+            "seconds": elapsed,
+        }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--scenario", choices=SCENARIOS, action="append")
+    parser.add_argument("--client", choices=CONCURRENCY, action="append")
+    parser.add_argument("--latency", type=float, default=0.01)
+    parser.add_argument("--jitter", type=float, default=0.005)
+    parser.add_argument("--rate-limited", type=float, default=0.0)
+    parser.add_argument("--quota", type=int, default=None)
+    parser.add_argument("--holidays-per-year", type=int, default=400)
+    parser.add_argument("--rate", type=float, default=0, help="client requests/s")
+    parser.add_argument("--processes", type=int, default=0, help="decoding processes")
+    parser.add_argument("--single", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.single:
+        print(
+            json.dumps(
+                run_scenario(
+                    scenario_name=args.scenario[0],
+                    client_name=args.client[0],
+                    args=args,
+                )
+            )
+        )
+        return
+
+    print(
+        f"{'scenario':<16}{'client':<12}{'requests':>9}{'req/s':>9}"
+        f"{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'conns':>7}{'sent MB':>9}"
+        f"{'RSS MB':>9}{'seconds':>9}"
+    )
+    for scenario_name, client_name in product(
+        args.scenario or SCENARIOS, args.client or CONCURRENCY
+    ):
+        command = [
+            sys.executable,
+            os.path.abspath(__file__),
+            "--single",
+            f"--scenario={scenario_name}",
+            f"--client={client_name}",
+            f"--latency={args.latency}",
+            f"--jitter={args.jitter}",
+            f"--rate-limited={args.rate_limited}",
+            f"--holidays-per-year={args.holidays_per_year}",
+            f"--rate={args.rate}",
+            f"--processes={args.processes}",
+        ]
+        if args.quota is not None:
+            command.append(f"--quota={args.quota}")
+        output = subprocess.run(
+            command, check=True, capture_output=True, text=True
+        ).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        print(
+            f"{result['scenario']:<16}{result['client']:<12}{result['requests']:>9}"
+            f"{result['requests_per_second']:>9.1f}{result['p50_ms']:>9.2f}"
+            f"{result['p95_ms']:>9.2f}{result['p99_ms']:>9.2f}"
+            f"{result['connections']:>7}{result['sent_mb']:>9.2f}"
+            f"{result['peak_rss_mb']:>9.1f}{result['seconds']:>9.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""
+Microbenchmark of response decoding and date filtering.
+
+Compares the previous ``_parse_data`` (deepcopy, ``parse_date`` and
+``list.remove``) with the single pass ISO prefix filter, and the json module
+with orjson, on a synthetic year sized response.
+
+    python benchmarks/bench_parse.py
+"""
+import copy
+import json
+import os
+import sys
+import timeit
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from json_codec import JsonCodec  # noqa: E402
+from utils import filter_by_date, parse_date  # noqa: E402
+
+HOLIDAYS_PER_YEAR = 600
+REPEAT = 20
+
+
+def make_year_response(*, year: int) -> dict:
+    start = datetime(year, 1, 1)
+    holidays = []
+
+    for index in range(HOLIDAYS_PER_YEAR):
+        date = start + timedelta(days=index * 365 // HOLIDAYS_PER_YEAR)
+        holidays.append(
+            {
+                "name": f"Holiday {index}",
+                "description": "Holiday is a observance in the USA " * 3,
+                "country": {"id": "us", "name": "United States"},
+                "date": {
+                    "iso": date.strftime("%Y-%m-%d"),
+                    "datetime": {
+                        "year": date.year,
+                        "month": date.month,
+                        "day": date.day,
+                    },
+                },
+                "type": ["Observance"],
+                "primary_type": "Observance",
+                "canonical_url": f"https://calendarific.com/holiday/us/holiday-{index}",
+                "urlid": f"us/holiday-{index}",
+                "locations": "All",
+                "states": "All",
+            }
+        )
+
+    return {"meta": {"code": 200}, "response": {"holidays": holidays}}
+
+
+def previous_parse_data(*, holidays, start_date, end_date):
+    for holiday in copy.deepcopy(holidays):
+        date = parse_date(iso_date=holiday["date"]["iso"])
+        if date < start_date or date > end_date:
+            holidays.remove(holiday)
+
+    return holidays
+
+
+def measure(statement) -> float:
+    return min(timeit.repeat(statement, number=1, repeat=REPEAT)) * 1000
+
+
+def main() -> None:
+    response = make_year_response(year=1992)
+    holidays = response["response"]["holidays"]
+    body = json.dumps(response).encode()
+    start_date, end_date = datetime(1992, 7, 7), datetime(1992, 9, 18)
+
+    previous = measure(
+        lambda: previous_parse_data(
+            holidays=list(holidays), start_date=start_date, end_date=end_date
+        )
+    )
+    single_pass = measure(
+        lambda: filter_by_date(
+            holidays=holidays, start_date="1992-07-07", end_date="1992-09-18"
+        )
+    )
+    print(f"filter  previous     {previous:8.3f} ms")
+    print(
+        f"filter  single pass  {single_pass:8.3f} ms  ({previous / single_pass:.0f}x)"
+    )
+
+    for name, codec in [("json", JsonCodec()), ("orjson", JsonCodec(fast=True))]:
+        if name == "orjson" and not codec.fast:
+            print("orjson is not installed, skipping")
+            continue
+
+        decode = measure(lambda: codec.loads(body))
+        encode = measure(lambda: [codec.dumps(holiday) for holiday in holidays])
+        print(f"decode  {name:<12} {decode:8.3f} ms")
+        print(f"encode  {name:<12} {encode:8.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
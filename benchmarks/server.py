@@ -0,0 +1,193 @@
+"""
+Local stand-in for the Calendarific ``/api/v2/holidays`` endpoint.
+
+Serves synthetic, deterministic holidays for any country and year, with
+configurable latency, jitter, share of 429 responses and request quota.
+Responses are gzip compressed when the request accepts it, and carry an
+``ETag`` so that conditional requests for unchanged periods get a 304.
+"""
+import gzip
+import hashlib
+import json
+import random
+import threading
+import time
+from datetime import date, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+API_PATH = "/api/v2/holidays"
+HOLIDAY_TYPES = ["National holiday", "Observance", "Local holiday", "Season"]
+
+
+def make_holidays(*, country: str, year: int, count: int) -> list[dict]:
+    start = date(year, 1, 1)
+    days_in_year = (date(year + 1, 1, 1) - start).days
+    holidays = []
+
+    for index in range(count):
+        day = start + timedelta(days=index * days_in_year // count)
+        holidays.append(
+            {
+                "name": f"Holiday {index}",
+                "description": f"Holiday {index} is an observance in {country.upper()}. "
+                * 2,
+                "country": {"id": country, "name": f"Country {country.upper()}"},
+                "date": {
+                    "iso": day.isoformat(),
+                    "datetime": {"year": day.year, "month": day.month, "day": day.day},
+                },
+                "type": [HOLIDAY_TYPES[index % len(HOLIDAY_TYPES)]],
+                "primary_type": HOLIDAY_TYPES[index % len(HOLIDAY_TYPES)],
+                "canonical_url": f"https://calendarific.com/holiday/{country}/holiday-{index}",
+                "urlid": f"{country}/holiday-{index}",
+                "locations": "All",
+                "states": "All",
+            }
+        )
+
+    return holidays
+
+
+class FakeCalendarificServer:
+    """
+    Threaded HTTP server on a free local port, usable as a context manager.
+
+    :param latency: Base response delay in seconds.
+    :param jitter: Random extra delay of up to this many seconds.
+    :param rate_limited: Share of requests answered with 429.
+    :param quota: Requests served before every response becomes 429.
+    :param holidays_per_year: Size of a year response.
+    """
+
+    def __init__(
+        self,
+        *,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        rate_limited: float = 0.0,
+        quota: int | None = None,
+        holidays_per_year: int = 400,
+        seed: int = 0,
+    ) -> None:
+        self.latency = latency
+        self.jitter = jitter
+        self.rate_limited = rate_limited
+        self.quota = quota
+        self.holidays_per_year = holidays_per_year
+        self.requests = 0
+        self.throttled = 0
+        self.not_modified = 0
+        # TCP connections accepted and response body bytes sent
+        self.connections = 0
+        self.bytes_sent = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._years: dict[tuple[str, int], list[dict]] = {}
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._get_handler())
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address
+        return f"http://{host}:{port}{API_PATH}"
+
+    def __enter__(self) -> "FakeCalendarificServer":
+        self._thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def respond(
+        self, *, query: dict[str, list[str]], if_none_match: str | None = None
+    ) -> tuple[int, dict, bytes]:
+        with self._lock:
+            self.requests += 1
+            over_quota = self.quota is not None and self.requests > self.quota
+            throttled = over_quota or self._random.random() < self.rate_limited
+            delay = self.latency + self._random.random() * self.jitter
+            self.throttled += throttled
+
+        time.sleep(delay)
+        if throttled:
+            body = {"meta": {"code": 429, "error_type": "too many requests"}}
+            return 429, {"Retry-After": "0"}, json.dumps(body).encode()
+
+        country = query["country"][0].lower()
+        year = int(query["year"][0])
+        prefix = f"{year:04d}"
+        if "month" in query:
+            prefix += f"-{int(query['month'][0]):02d}"
+        if "day" in query:
+            prefix += f"-{int(query['day'][0]):02d}"
+
+        holidays = [
+            holiday
+            for holiday in self._get_year(country=country, year=year)
+            if holiday["date"]["iso"].startswith(prefix)
+        ]
+        body = json.dumps(
+            {"meta": {"code": 200}, "response": {"holidays": holidays}}
+        ).encode()
+        etag = f'"{hashlib.sha256(body).hexdigest()[:16]}"'
+        headers = {"X-RateLimit-Remaining": "1000", "ETag": etag}
+        if etag == if_none_match:
+            with self._lock:
+                self.not_modified += 1
+            return 304, headers, b""
+
+        return 200, headers, body
+
+    def _get_year(self, *, country: str, year: int) -> list[dict]:
+        key = (country, year)
+        if key not in self._years:
+            self._years[key] = make_holidays(
+                country=country, year=year, count=self.holidays_per_year
+            )
+
+        return self._years[key]
+
+    def _get_handler(self) -> type[BaseHTTPRequestHandler]:
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            # Send headers and body in one segment, avoiding delayed ACK stalls
+            wbufsize = -1
+            disable_nagle_algorithm = True
+
+            def setup(self) -> None:
+                super().setup()
+                with server._lock:
+                    server.connections += 1
+
+            def do_GET(self) -> None:
+                url = urlparse(self.path)
+                if url.path != API_PATH:
+                    self.send_error(404)
+                    return
+
+                status, headers, body = server.respond(
+                    query=parse_qs(url.query),
+                    if_none_match=self.headers.get("If-None-Match"),
+                )
+                if body and "gzip" in self.headers.get("Accept-Encoding", ""):
+                    body = gzip.compress(body, compresslevel=5)
+                    headers = {**headers, "Content-Encoding": "gzip"}
+                with server._lock:
+                    server.bytes_sent += len(body)
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format: str, *args) -> None:
+                pass
+
+        return Handler
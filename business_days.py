@@ -0,0 +1,295 @@
+import argparse
+import glob
+import json
+import os
+import threading
+from datetime import date
+from typing import Any, Iterable, Iterator
+
+from custom_exceptions import ClientException
+from partition import EXTENSIONS, read_partition_lines
+
+# Monday to Friday, in numpy.busdaycalendar notation
+DEFAULT_WEEKMASK = "1111100"
+
+# Holidays that are working days by default, e.g. religious observances
+OBSERVANCE_TYPES = frozenset(
+    {"Observance", "Local observance", "Season", "Clock change/Daylight Saving Time"}
+)
+
+# Country, holiday types and region of a calendar
+CalendarKey = tuple[str, frozenset[str] | None, str | None]
+
+
+def iter_output_holidays(*, output_dir: str, country: str) -> Iterator[dict[str, Any]]:
+    """
+    Yield the holidays of ``country`` written to ``output_dir``, by flat
+    (``us_<range>.txt``) and partitioned (``us/<year>.jsonl[.gz|.zst]``) runs.
+
+    Holidays in several overlapping files are yielded once per file.
+    """
+    country = country.lower()
+    paths = sorted(glob.glob(os.path.join(output_dir, f"{country}_*.txt")))
+    for extension in EXTENSIONS.values():
+        paths.extend(
+            sorted(glob.glob(os.path.join(output_dir, country, f"*{extension}")))
+        )
+
+    for path in paths:
+        for line in read_partition_lines(path=path):
+            yield json.loads(line)
+
+
+def get_holiday_dates(
+    *,
+    holidays: Iterable[dict[str, Any]],
+    types: Iterable[str] | None = None,
+    region: str | None = None,
+) -> list[str]:
+    """
+    Return the sorted, distinct ISO dates of the days off among ``holidays``.
+
+    By default, observances and seasons (``OBSERVANCE_TYPES``) are not days
+    off. With ``types``, only holidays having one of them (e.g. ``"National
+    holiday"``) count. Holidays of some states only count for a ``region``
+    among them, by abbreviation or ISO code (``"ENG"`` or ``"gb-eng"``).
+    """
+    types = None if types is None else set(types)
+
+    return sorted(
+        {
+            holiday["date"]["iso"][:10]
+            for holiday in holidays
+            if _has_types(holiday=holiday, types=types)
+            and _applies_to(holiday=holiday, region=region)
+        }
+    )
+
+
+class BusinessDayCalendar:
+    """
+    Business days of one country, backed by a precomputed
+    ``numpy.busdaycalendar``.
+
+    Every method takes array-likes of dates (``datetime64``, ``date`` or ISO
+    strings) and returns NumPy arrays. Dates outside the fetched range have
+    no holidays, only weekends.
+    """
+
+    def __init__(
+        self, *, holidays: Iterable[str | date], weekmask: str = DEFAULT_WEEKMASK
+    ) -> None:
+        numpy = _import_numpy()
+        self._numpy = numpy
+        self.calendar = numpy.busdaycalendar(
+            weekmask=weekmask,
+            holidays=numpy.array(list(holidays), dtype="datetime64[D]"),
+        )
+
+    @property
+    def holidays(self) -> Any:
+        """The holidays falling on business days of the week, sorted."""
+        return self.calendar.holidays
+
+    def is_business_day(self, dates: Any) -> Any:
+        return self._numpy.is_busday(self._to_days(dates), busdaycal=self.calendar)
+
+    def offset(self, dates: Any, offsets: Any, *, roll: str = "forward") -> Any:
+        """
+        Move each date by its number of business days, e.g. 10 business days
+        after a date with ``offset(dates, 10)``.
+
+        ``roll`` says where a date that is not a business day starts from, see
+        ``numpy.busday_offset``.
+        """
+        return self._numpy.busday_offset(
+            self._to_days(dates), offsets, roll=roll, busdaycal=self.calendar
+        )
+
+    def count(self, start_dates: Any, end_dates: Any) -> Any:
+        """Count the business days from each start date to its end date, excluded."""
+        return self._numpy.busday_count(
+            self._to_days(start_dates),
+            self._to_days(end_dates),
+            busdaycal=self.calendar,
+        )
+
+    def _to_days(self, dates: Any) -> Any:
+        return self._numpy.asarray(dates, dtype="datetime64[D]")
+
+
+class BusinessDays:
+    """
+    Business day arithmetic over the holidays written to ``output_dir``.
+
+    The calendar of a country is built from the output files on first use
+    and kept, so no API request is ever made. Which holidays are days off
+    is chosen with ``types`` and ``region``, see ``get_holiday_dates``.
+    Countries whose weekend is not Saturday and Sunday take a ``weekmasks``
+    entry, e.g. ``{"sa": "1111001"}``.
+    """
+
+    def __init__(
+        self, *, output_dir: str, weekmasks: dict[str, str] | None = None
+    ) -> None:
+        self.output_dir = output_dir
+        self.weekmasks = {
+            country.lower(): weekmask for country, weekmask in (weekmasks or {}).items()
+        }
+        self._calendars: dict[CalendarKey, BusinessDayCalendar] = {}
+        self._lock = threading.Lock()
+
+    def get_calendar(
+        self,
+        *,
+        country: str,
+        types: Iterable[str] | None = None,
+        region: str | None = None,
+    ) -> BusinessDayCalendar:
+        """Return the calendar of ``country``, or of one of its regions."""
+        country = country.lower()
+        key = (
+            country,
+            None if types is None else frozenset(types),
+            None if region is None else region.lower(),
+        )
+
+        with self._lock:
+            if key not in self._calendars:
+                holidays = iter_output_holidays(
+                    output_dir=self.output_dir, country=country
+                )
+                self._calendars[key] = BusinessDayCalendar(
+                    holidays=get_holiday_dates(
+                        holidays=holidays, types=key[1], region=key[2]
+                    ),
+                    weekmask=self.weekmasks.get(country, DEFAULT_WEEKMASK),
+                )
+
+            return self._calendars[key]
+
+    def is_business_day(
+        self,
+        *,
+        country: str,
+        dates: Any,
+        types: Iterable[str] | None = None,
+        region: str | None = None,
+    ) -> Any:
+        return self.get_calendar(
+            country=country, types=types, region=region
+        ).is_business_day(dates)
+
+    def busday_offset(
+        self,
+        *,
+        country: str,
+        dates: Any,
+        offsets: Any,
+        roll: str = "forward",
+        types: Iterable[str] | None = None,
+        region: str | None = None,
+    ) -> Any:
+        return self.get_calendar(country=country, types=types, region=region).offset(
+            dates, offsets, roll=roll
+        )
+
+    def busday_count(
+        self,
+        *,
+        country: str,
+        start_dates: Any,
+        end_dates: Any,
+        types: Iterable[str] | None = None,
+        region: str | None = None,
+    ) -> Any:
+        return self.get_calendar(country=country, types=types, region=region).count(
+            start_dates, end_dates
+        )
+
+
+def _has_types(*, holiday: dict[str, Any], types: set[str] | None) -> bool:
+    holiday_types = holiday.get("type") or ()
+    if types is None:
+        return OBSERVANCE_TYPES.isdisjoint(holiday_types)
+
+    return not types.isdisjoint(holiday_types)
+
+
+def _applies_to(*, holiday: dict[str, Any], region: str | None) -> bool:
+    states = holiday.get("states", "All")
+    if states == "All":
+        return True
+    if region is None or not isinstance(states, list):
+        return False
+
+    region = region.lower()
+    return any(
+        region in (str(state.get("abbrev")).lower(), str(state.get("iso")).lower())
+        for state in states
+    )
+
+
+def _import_numpy() -> Any:
+    try:
+        import numpy
+    except ImportError:
+        raise ClientException("numpy is required for business day calendars")
+
+    return numpy
+
+
+if __name__ == "__main__":
+    import config
+
+    parser = argparse.ArgumentParser(
+        description="Business day arithmetic over the holidays in the output directory."
+    )
+    parser.add_argument(
+        "--output_dir", default=config.OUTPUT_DIR, help="the output directory"
+    )
+    parser.add_argument("--country", required=True, help="the country code")
+    parser.add_argument(
+        "--type",
+        action="append",
+        dest="types",
+        help="only count holidays of this type (repeatable), "
+        "instead of every holiday but observances",
+    )
+    parser.add_argument(
+        "--region",
+        help="also count the holidays of this region, e.g. ENG or gb-eng",
+    )
+    parser.add_argument(
+        "--weekmask",
+        default=DEFAULT_WEEKMASK,
+        help="the business days of the week from Monday, e.g. 1111001",
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    check_parser = subparsers.add_parser("check", help="is a date a business day")
+    check_parser.add_argument("--date", type=date.fromisoformat, required=True)
+    offset_parser = subparsers.add_parser("offset", help="add business days")
+    offset_parser.add_argument("--date", type=date.fromisoformat, required=True)
+    offset_parser.add_argument("--days", type=int, required=True)
+    count_parser = subparsers.add_parser("count", help="count business days")
+    count_parser.add_argument("--date", type=date.fromisoformat, required=True)
+    count_parser.add_argument(
+        "--end_date",
+        type=date.fromisoformat,
+        required=True,
+        help="YYYY-MM-DD, excluded from the count",
+    )
+    args = parser.parse_args()
+
+    business_days = BusinessDays(
+        output_dir=args.output_dir, weekmasks={args.country: args.weekmask}
+    )
+    calendar = business_days.get_calendar(
+        country=args.country, types=args.types, region=args.region
+    )
+    if args.command == "check":
+        print(bool(calendar.is_business_day(args.date)))
+    elif args.command == "offset":
+        print(calendar.offset(args.date, args.days))
+    else:
+        print(int(calendar.count(args.date, args.end_date)))
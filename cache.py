@@ -0,0 +1,261 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from typing import Any
+
+from utils import get_clean_dict
+
+# Periods that ended before the current year are effectively immutable
+PAST_GRANULARITY = "past"
+
+
+def get_granularity(*, params: dict[str, Any]) -> str:
+    if params.get("day") is not None:
+        return "day"
+    if params.get("month") is not None:
+        return "month"
+
+    return "year"
+
+
+def get_cache_key(*, params: dict[str, Any]) -> str:
+    clean_params = {
+        key: str(value).lower() if key == "country" else value
+        for key, value in get_clean_dict(data=params).items()
+        if key != "api_key"
+    }
+
+    return json.dumps(clean_params, sort_keys=True)
+
+
+def get_superset_params(*, params: dict[str, Any]) -> list[dict[str, Any]]:
+    """
+    Return the params of coarser requests whose responses contain ``params``.
+
+    The list is ordered from the narrowest to the widest period, e.g. a day
+    request is covered by its month request and then by its year request.
+    """
+    granularity = get_granularity(params=params)
+    base = {key: value for key, value in params.items() if key not in ("month", "day")}
+    supersets = []
+
+    if granularity == "day":
+        supersets.append({**base, "month": params["month"]})
+    if granularity in ("day", "month"):
+        supersets.append(base)
+
+    return supersets
+
+
+def get_period_prefix(*, params: dict[str, Any]) -> str:
+    """Return the ISO date prefix shared by every holiday of the period."""
+    prefix = f"{int(params['year']):04d}"
+    if params.get("month") is not None:
+        prefix += f"-{int(params['month']):02d}"
+    if params.get("day") is not None:
+        prefix += f"-{int(params['day']):02d}"
+
+    return prefix
+
+
+def filter_response(*, response: dict, params: dict[str, Any]) -> dict:
+    """Narrow a coarser response down to the period described by ``params``."""
+    prefix = get_period_prefix(params=params)
+    holidays = [
+        holiday
+        for holiday in response["response"]["holidays"]
+        if holiday["date"]["iso"].startswith(prefix)
+    ]
+
+    return {**response, "response": {**response["response"], "holidays": holidays}}
+
+
+class ResponseCache:
+    """
+    Persistent SQLite cache of raw API responses.
+
+    Entries are keyed on the request params (without the api key), expire
+    after a TTL that depends on the request granularity and are evicted
+    least-recently-used first once ``max_entries`` is exceeded. Expired
+    entries stay available to ``get(allow_stale=True)`` until evicted, as a
+    fallback when the API is unavailable.
+    """
+
+    def __init__(self, *, path: str, ttl: dict[str, int], max_entries: int) -> None:
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(
+            path, check_same_thread=False, isolation_level=None
+        )
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            "key TEXT PRIMARY KEY, "
+            "granularity TEXT NOT NULL, "
+            "body BLOB NOT NULL, "
+            "stored_at REAL NOT NULL, "
+            "accessed_at REAL NOT NULL, "
+            "etag TEXT, "
+            "last_modified TEXT)"
+        )
+        # Caches created before conditional requests lack the validator columns
+        columns = {
+            row[1] for row in self._connection.execute("PRAGMA table_info(responses)")
+        }
+        for column in ("etag", "last_modified"):
+            if column not in columns:
+                self._connection.execute(
+                    f"ALTER TABLE responses ADD COLUMN {column} TEXT"
+                )
+        self._connection.execute(
+            "CREATE INDEX IF NOT EXISTS responses_accessed_at "
+            "ON responses (accessed_at)"
+        )
+
+    def get(self, *, params: dict[str, Any], allow_stale: bool = False) -> bytes | None:
+        key = get_cache_key(params=params)
+        now = time.time()
+
+        with self._lock:
+            body = self._get_body(
+                key=key, params=params, now=now, allow_stale=allow_stale
+            )
+            if body is not None:
+                self._connection.execute(
+                    "UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key)
+                )
+
+        return body
+
+    def contains(self, *, params: dict[str, Any]) -> bool:
+        key = get_cache_key(params=params)
+
+        with self._lock:
+            return (
+                self._get_body(
+                    key=key, params=params, now=time.time(), allow_stale=False
+                )
+                is not None
+            )
+
+    def set(
+        self,
+        *,
+        params: dict[str, Any],
+        body: bytes,
+        etag: str | None = None,
+        last_modified: str | None = None,
+    ) -> None:
+        """Store a response with its ``ETag`` and ``Last-Modified`` headers."""
+        now = time.time()
+
+        with self._lock:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO responses "
+                "(key, granularity, body, stored_at, accessed_at, etag, last_modified) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    get_cache_key(params=params),
+                    get_granularity(params=params),
+                    body,
+                    now,
+                    now,
+                    etag,
+                    last_modified,
+                ),
+            )
+            self._evict()
+
+    def get_conditional_headers(self, *, params: dict[str, Any]) -> dict[str, str]:
+        """
+        Return the headers asking the API to answer 304 Not Modified when the
+        stored response, even expired, is still current.
+        """
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT etag, last_modified FROM responses WHERE key = ?",
+                (get_cache_key(params=params),),
+            ).fetchone()
+        if row is None:
+            return {}
+
+        etag, last_modified = row
+        headers = {}
+        if etag:
+            headers["If-None-Match"] = etag
+        if last_modified:
+            headers["If-Modified-Since"] = last_modified
+
+        return headers
+
+    def revalidate(self, *, params: dict[str, Any]) -> bytes | None:
+        """Renew the TTL of a response the API reported unchanged, return it."""
+        key = get_cache_key(params=params)
+        now = time.time()
+
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT body FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+
+            self._connection.execute(
+                "UPDATE responses SET stored_at = ?, accessed_at = ? WHERE key = ?",
+                (now, now, key),
+            )
+
+        return row[0]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._connection.execute("DELETE FROM responses")
+
+    def close(self) -> None:
+        with self._lock:
+            self._connection.close()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._connection.execute(
+                "SELECT COUNT(*) FROM responses"
+            ).fetchone()[0]
+
+    def _get_body(
+        self, *, key: str, params: dict[str, Any], now: float, allow_stale: bool
+    ) -> bytes | None:
+        row = self._connection.execute(
+            "SELECT body, stored_at FROM responses WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return None
+
+        body, stored_at = row
+        ttl = self._get_ttl(params=params)
+        if not allow_stale and ttl > 0 and now - stored_at > ttl:
+            return None
+
+        return body
+
+    def _get_ttl(self, *, params: dict[str, Any]) -> int:
+        if int(params["year"]) < datetime.now().year:
+            return self.ttl[PAST_GRANULARITY]
+
+        return self.ttl[get_granularity(params=params)]
+
+    def _evict(self) -> None:
+        self._connection.execute(
+            "DELETE FROM responses WHERE key IN ("
+            "SELECT key FROM responses ORDER BY accessed_at ASC "
+            "LIMIT MAX(0, (SELECT COUNT(*) FROM responses) - ?))",
+            (self.max_entries,),
+        )
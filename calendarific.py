@@ -1,112 +1,1201 @@
-import copy
 import os
 import argparse
-import json
-from typing import Any, Generator
+import logging
+import sys
+import threading
+import time
+from collections import deque
+from datetime import date, datetime
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Generator,
+    Iterator,
+    Mapping,
+    MutableMapping,
+)
 
 import config
-import requests
 
-from custom_exceptions import ClientException
-from logger import logger
-from parameters import CalendarParams, Day, EndDate, Month, StartDate, Year
-from utils import get_clean_dict, parse_date
+from cache import (
+    ResponseCache,
+    filter_response,
+    get_cache_key,
+    get_granularity,
+    get_period_prefix,
+    get_superset_params,
+)
+from custom_exceptions import (
+    CircuitOpenException,
+    ClientException,
+    DeadlineException,
+)
+from dedupe import HolidayDeduplicator
+from encoding import EncodedHoliday, encode_holidays, encode_response
+from export import (
+    EXTENSIONS,
+    FORMATS,
+    JSONL,
+    HolidayColumns,
+    resolve_format,
+    write_columns,
+)
+from holiday import Holiday, parse_holidays
+from holiday_index import build_index
+from json_codec import JsonCodec
+from manifest import Manifest, subtract_intervals
+from metrics import Metrics
+from logger import logger, setup_logging
+from partition import (
+    COMPRESSIONS,
+    FLAT,
+    LAYOUTS,
+    NONE,
+    PARTITIONED,
+    PartitionWriter,
+    resolve_compression,
+)
+from parameters import CalendarParams, Country, Day, EndDate, Month, StartDate, Year
+from planner import AUTO, MIN_CALLS, STRATEGIES, plan_periods, summarize_plan
+from resilience import CircuitBreaker, Hedger, get_max_workers
+from scheduler import RETRY_STATUSES, RequestScheduler
+from tracing import NULL_TRACER, NullTracer, Tracer
+from transport import RequestsTransport, Transport
+from utils import filter_by_date, get_clean_dict, get_iso_date
+from writer import AtomicFileWriter, ContentHashes
+
+# requests and asyncio dominate the startup time, they are imported on first use
+if TYPE_CHECKING:
+    import asyncio
+    from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+    import requests
+
+
+def get_default_scheduler(*, max_concurrency: int) -> RequestScheduler:
+    return RequestScheduler(
+        rate=config.RATE_LIMIT_PER_SECOND,
+        burst=config.RATE_LIMIT_BURST,
+        max_concurrency=max_concurrency,
+        max_retries=config.MAX_RETRIES,
+        backoff_base=config.BACKOFF_BASE,
+        backoff_max=config.BACKOFF_MAX,
+        latency_threshold=config.LATENCY_THRESHOLD,
+    )
+
+
+def get_default_transport(*, max_connections: int) -> RequestsTransport:
+    return RequestsTransport(
+        pool_connections=config.HTTP_POOL_CONNECTIONS,
+        pool_maxsize=max(config.HTTP_POOL_MAXSIZE, max_connections),
+        connect_timeout=config.HTTP_CONNECT_TIMEOUT,
+        read_timeout=config.HTTP_READ_TIMEOUT,
+    )
+
+
+def get_validators(*, headers: Mapping[str, str]) -> dict[str, str | None]:
+    """The response headers that make a conditional request for it possible."""
+    return {"etag": headers.get("ETag"), "last_modified": headers.get("Last-Modified")}
+
+
+def get_log_fields(*, params: dict) -> dict[str, str]:
+    """The fields of the structured log records about a request."""
+    fields = {"granularity": get_granularity(params=params)}
+    if params.get("country") is not None:
+        fields["country"] = str(params["country"]).lower()
+    if params.get("year") is not None:
+        fields["period"] = get_period_prefix(params=params)
+
+    return fields
+
+
+def get_default_hedger(*, max_concurrency: int) -> Hedger:
+    return Hedger(
+        enabled=config.HEDGE_REQUESTS,
+        delay=config.HEDGE_DELAY,
+        percentile=config.HEDGE_PERCENTILE,
+        max_workers=get_max_workers(max_concurrency=max_concurrency),
+    )
+
+
+def get_default_breaker() -> CircuitBreaker:
+    return CircuitBreaker(
+        failure_threshold=config.CIRCUIT_FAILURE_THRESHOLD,
+        reset_timeout=config.CIRCUIT_RESET_TIMEOUT,
+    )
 
 
 class CalendarificClient:
     BASE_URL = "https://calendarific.com/api/v2/holidays"
 
-    def __init__(self, *, values: CalendarParams) -> None:
-        self.params = values.generate_params()
+    def __init__(
+        self,
+        *,
+        values: CalendarParams,
+        cache: ResponseCache | None = None,
+        refresh: bool = False,
+        responses: MutableMapping[str, dict] | None = None,
+        strategy: str = AUTO,
+        scheduler: RequestScheduler | None = None,
+        transport: Transport | None = None,
+        fast_json: bool = False,
+        metrics: Metrics | None = None,
+        tracer: Tracer | NullTracer = NULL_TRACER,
+        dedupe: bool = True,
+        merge_regions: bool = False,
+        hedger: Hedger | None = None,
+        breaker: CircuitBreaker | None = None,
+        deadline: float | None = None,
+        allow_partial: bool = False,
+        processes: int = 0,
+    ) -> None:
+        self.metrics = metrics or Metrics()
+        self.tracer = tracer
+        with self.metrics.time("plan_duration_seconds"), tracer.span(
+            "plan", category="plan", strategy=strategy
+        ):
+            self.params = values.generate_params(strategy=strategy)
+        # The planned params of each country, in plan order
+        self.params_by_country: dict[str, list[dict[str, Any]]] = {}
+        for params in self.params:
+            self.params_by_country.setdefault(str(params["country"]), []).append(params)
+        self.strategy = strategy
         self.input_data = values.get_input_data()
         self.dates = values.get_dates()
-        self.session = requests.Session()
-        self.session.headers.update(**self.headers)
+        self.cache = cache
+        self.refresh = refresh
+        # Optional in-memory store of decoded responses, shared between clients
+        self.responses = responses
+        self.scheduler = scheduler or get_default_scheduler(max_concurrency=1)
+        self.json = JsonCodec(fast=fast_json)
+        # Drop holidays repeated across responses, optionally merging the
+        # per-state records of a holiday into one
+        self.dedupe = dedupe or merge_regions
+        self.merge_regions = merge_regions
+        self.hedger = hedger or get_default_hedger(
+            max_concurrency=self.scheduler.limiter.max_concurrency
+        )
+        self.breaker = breaker or get_default_breaker()
+        # Seconds a request may take, retries included, 0 means no deadline
+        self.deadline = config.REQUEST_DEADLINE if deadline is None else deadline
+        # Answer failed requests with no holidays instead of failing the run,
+        # when no stale cached response is left either
+        self.allow_partial = allow_partial
+        # Params answered from stale or no data, their countries are not
+        # recorded as up to date in the manifest
+        self.degraded_params: list[dict] = []
+        # Worker processes decoding, filtering and encoding the responses of
+        # JSONL runs, 0 does it in the fetching threads
+        self.processes = processes
+        self._pool: "ProcessPoolExecutor | None" = None
+        # Created on first use, so that runs answered locally skip importing requests
+        self._transport = transport
+        self._transport_lock = threading.Lock()
+
+    @property
+    def transport(self) -> Transport:
+        with self._transport_lock:
+            if self._transport is None:
+                self._transport = get_default_transport(
+                    max_connections=self.scheduler.limiter.max_concurrency
+                )
+
+        return self._transport
+
+    @property
+    def session(self) -> "requests.Session":
+        """The session of the default ``RequestsTransport``."""
+        return self.transport.session
+
+    def run(
+        self,
+        *,
+        output_dir: str,
+        output_format: str = JSONL,
+        incremental: bool = False,
+        layout: str = FLAT,
+        compression: str = NONE,
+    ) -> None:
+        self.write_holidays_to_files(
+            output_dir=output_dir,
+            output_format=output_format,
+            incremental=incremental,
+            layout=layout,
+            compression=compression,
+        )
+
+    def get_plan_summary(self) -> dict[str, int]:
+        summary = summarize_plan(params=self.params)
+        summary["cached"] = 0
+        if not self.refresh:
+            summary["cached"] = sum(
+                1 for params in self.params if self._is_available_locally(params=params)
+            )
+        # Every request that reaches the API costs one request of the quota
+        summary["quota_cost"] = summary["requests"] - summary["cached"]
+
+        return summary
+
+    def write_holidays_to_files(
+        self,
+        *,
+        output_dir: str,
+        output_format: str = JSONL,
+        incremental: bool = False,
+        layout: str = FLAT,
+        compression: str = NONE,
+    ) -> None:
+        """
+        Write the holidays of every country to its own file in ``output_dir``.
 
-    def run(self, *, output_dir: str) -> None:
-        self.write_holidays_to_files(output_dir=output_dir)
+        JSONL runs record the written date ranges in the manifest. With
+        ``incremental``, only the ranges missing from the manifest (or stale)
+        are fetched and merged with the holidays already written. The
+        ``partitioned`` layout writes one, optionally compressed, JSONL file
+        per country and year instead.
+        """
+        output_format = resolve_format(output_format=output_format)
+        if incremental and output_format != JSONL:
+            raise ClientException(f"Incremental runs only support {JSONL} output")
+        if layout not in LAYOUTS:
+            raise ClientException(f"Layout must be one of {', '.join(LAYOUTS)}")
+        if layout == PARTITIONED and (incremental or output_format != JSONL):
+            raise ClientException(
+                f"The {PARTITIONED} layout only supports full {JSONL} runs"
+            )
+        if layout == FLAT and compression != NONE:
+            raise ClientException(f"Compression needs the {PARTITIONED} layout")
+        if self.processes and output_format != JSONL:
+            raise ClientException(f"Worker processes only support {JSONL} output")
 
-    def write_holidays_to_files(self, *, output_dir: str) -> None:
         # Ensure the output directory exists
         os.makedirs(output_dir, exist_ok=True)
 
-        for country_holidays in self.get_data():
-            if not country_holidays:
-                continue
+        if self.processes:
+            import multiprocessing
+            from concurrent.futures import ProcessPoolExecutor
+
+            # Forking would copy the locks held by the running threads
+            start_method = (
+                "forkserver"
+                if "forkserver" in multiprocessing.get_all_start_methods()
+                else "spawn"
+            )
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.processes,
+                mp_context=multiprocessing.get_context(start_method),
+            )
+        try:
+            self._write_files(
+                output_dir=output_dir,
+                output_format=output_format,
+                incremental=incremental,
+                layout=layout,
+                compression=compression,
+            )
+        finally:
+            if self._pool is not None:
+                self._pool.shutdown(cancel_futures=True)
+                self._pool = None
+
+    def _write_files(
+        self,
+        *,
+        output_dir: str,
+        output_format: str,
+        incremental: bool,
+        layout: str,
+        compression: str,
+    ) -> None:
+        # Files whose content did not change since the last run are not rewritten
+        hashes = ContentHashes(output_dir=output_dir)
+        if layout == PARTITIONED:
+            self._write_partitions(
+                output_dir=output_dir,
+                compression=resolve_compression(compression=compression),
+                hashes=hashes,
+            )
+            return
+
+        manifest = (
+            Manifest(output_dir=output_dir, max_age=config.MANIFEST_MAX_AGE)
+            if output_format == JSONL
+            else None
+        )
+
+        if incremental:
+            for country in self.input_data["countries"]:
+                with self.tracer.span(str(country), category="country"):
+                    self._sync_country_holidays(
+                        output_dir=output_dir,
+                        manifest=manifest,
+                        country=country,
+                        hashes=hashes,
+                    )
+                hashes.save()
+            return
+
+        if output_format != JSONL:
+            for country, batches in self._iter_unique_batches():
+                with self.tracer.span(str(country), category="country"):
+                    self._write_country_columns(
+                        output_dir=output_dir,
+                        batches=batches,
+                        output_format=output_format,
+                        hashes=hashes,
+                    )
+                hashes.save()
+            return
 
-            file_name = (
-                f"{country_holidays[0]['country']['id']}"
-                f"_{self.input_data['start_day']}"
-                f"-{self.input_data['start_month']}"
-                f"-{self.input_data['start_year']}"
-                f"_{self.input_data['end_day']}"
-                f"-{self.input_data['end_month']}"
-                f"-{self.input_data['end_year']}.txt"
-            )
-            file_path = os.path.join(output_dir, file_name)
-
-            try:
-                with open(file_path, "w") as file:
-                    for holiday in country_holidays:
-                        holiday_json = json.dumps(holiday)
-                        file.write(holiday_json + "\n")
-                logger.info(f"Holidays written to {file_path}")
-            except Exception as e:
-                logger.error(f"Error writing holidays to file: {e}")
+        for country, batches in self._iter_encoded_batches():
+            with self.tracer.span(str(country), category="country"):
+                self._write_country_holidays(
+                    output_dir=output_dir,
+                    batches=batches,
+                    manifest=manifest,
+                    country=country,
+                    hashes=hashes,
+                )
+            hashes.save()
 
     def get_data(self) -> Generator[list[dict[str, Any]], None, None]:
+        for _, batches in self._iter_unique_batches():
+            yield [holiday for batch in batches for holiday in batch]
+
+    def get_holidays(self) -> Generator[list[Holiday], None, None]:
+        """Like ``get_data``, with each holiday parsed into a compact record."""
+        for _, batches in self._iter_unique_batches():
+            yield [
+                holiday
+                for batch in batches
+                for holiday in parse_holidays(holidays=batch)
+            ]
+
+    def _iter_unique_batches(
+        self,
+    ) -> Generator[tuple[Country, Iterator[list[dict]]], None, None]:
+        """Like ``_iter_country_batches``, without repeated holidays."""
+        for country, batches in self._iter_country_batches():
+            if not self.dedupe:
+                yield country, batches
+                continue
+
+            deduplicator = HolidayDeduplicator(merge_regions=self.merge_regions)
+            yield country, (
+                self._deduplicate(deduplicator=deduplicator, holidays=batch)
+                for batch in batches
+            )
+
+    def _iter_encoded_batches(
+        self,
+    ) -> Generator[tuple[Country, Iterator[list[EncodedHoliday]]], None, None]:
+        """Like ``_iter_unique_batches``, with the holidays encoded as JSON lines."""
+        for country, batches in self._iter_country_batches(fetch=self._fetch_encoded):
+            if not self.dedupe:
+                yield country, batches
+                continue
+
+            # Regional variants are already merged by the encoding
+            deduplicator = HolidayDeduplicator()
+            yield country, (
+                self._deduplicate_encoded(deduplicator=deduplicator, holidays=batch)
+                for batch in batches
+            )
+
+    def _deduplicate(
+        self, *, deduplicator: HolidayDeduplicator, holidays: list[dict]
+    ) -> list[dict]:
+        unique = deduplicator.filter(holidays=holidays)
+        self._count_duplicates(count=len(holidays) - len(unique))
+
+        return unique
+
+    def _deduplicate_encoded(
+        self, *, deduplicator: HolidayDeduplicator, holidays: list[EncodedHoliday]
+    ) -> list[EncodedHoliday]:
+        unique = deduplicator.drop_seen(
+            items=holidays, keys=[holiday.key for holiday in holidays]
+        )
+        self._count_duplicates(count=len(holidays) - len(unique))
+
+        return unique
+
+    def _count_duplicates(self, *, count: int) -> None:
+        if count:
+            self.metrics.increment("holidays_duplicate_total", value=count)
+
+    def _iter_country_batches(
+        self, *, fetch: Callable[..., list] | None = None
+    ) -> Generator[tuple[Country, Iterator[list]], None, None]:
+        """
+        Yield each country with a lazy iterator of its per-request holidays,
+        as returned by ``fetch`` (``_fetch_holidays`` by default).
+        """
+        fetch = fetch or self._fetch_holidays
         for country in self.input_data["countries"]:
-            response_data: list[dict] = []
+            yield country, (
+                fetch(country_data=country_data)
+                for country_data in self._get_country_params(country=country)
+            )
+
+    def _write_country_holidays(
+        self,
+        *,
+        output_dir: str,
+        batches: Iterator[list[EncodedHoliday]],
+        country: Country,
+        manifest: Manifest | None = None,
+        hashes: ContentHashes | None = None,
+    ) -> None:
+        # Each batch is written as soon as it arrives and the file only
+        # replaces the previous one once the whole country has been fetched
+        writer: AtomicFileWriter | None = None
+        write_seconds = 0.0
+
+        try:
+            for batch in batches:
+                if not batch:
+                    continue
+
+                with self.tracer.span("write", category="write", size=len(batch)):
+                    started_at = time.perf_counter()
+                    if writer is None:
+                        file_name = self._get_file_name(country_id=str(country).lower())
+                        writer = AtomicFileWriter(
+                            path=os.path.join(output_dir, file_name), hashes=hashes
+                        )
+                        try:
+                            writer.open()
+                        except OSError:
+                            writer = None
+                            raise
+
+                    writer.write_lines(holiday.line for holiday in batch)
+                    write_seconds += time.perf_counter() - started_at
+
+            fetched_at = time.time()
+            if writer is not None:
+                started_at = time.perf_counter()
+                with self.tracer.span("commit", category="write"):
+                    writer.commit()
+                self.metrics.observe(
+                    "write_duration_seconds",
+                    value=write_seconds + time.perf_counter() - started_at,
+                )
+                self._log_commit(writer=writer)
 
-            for country_data in self.params:
-                if country_data["country"] == country:
-                    clean_country_data: dict[str, str] = get_clean_dict(
-                        data=country_data
+            if manifest is not None and not self._is_degraded(country=country):
+                start_date, end_date = self._get_date_range()
+                manifest.record(
+                    country=str(country).lower(),
+                    file_name=None if writer is None else os.path.basename(writer.path),
+                    intervals=[(start_date, end_date, fetched_at)],
+                )
+        except OSError as e:
+            if writer is not None:
+                writer.discard()
+            logger.error("Error writing holidays to file: %s", e)
+        except BaseException:
+            if writer is not None:
+                writer.discard()
+            raise
+
+    def _write_partitions(
+        self, *, output_dir: str, compression: str, hashes: ContentHashes | None = None
+    ) -> None:
+        from concurrent.futures import ThreadPoolExecutor
+
+        start_date, end_date = self._get_date_range()
+        # Compression runs in a worker thread, while the next year is fetched
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            for country, batches in self._iter_encoded_batches():
+                with self.tracer.span(str(country), category="country"):
+                    writer = PartitionWriter(
+                        output_dir=output_dir,
+                        country=str(country),
+                        compression=compression,
+                        bounds=(start_date.isoformat(), end_date.isoformat()),
+                        executor=executor,
+                        hashes=hashes,
                     )
-                    response = self._request(
-                        url=self.api_url, params={**clean_country_data}
+                    for batch in batches:
+                        writer.add(
+                            lines=(
+                                (holiday.iso_date, holiday.line) for holiday in batch
+                            )
+                        )
+
+                    try:
+                        with self.metrics.time("write_duration_seconds"):
+                            paths = writer.close()
+                    except OSError as e:
+                        logger.error("Error writing holidays to file: %s", e)
+                        continue
+                    if hashes is not None:
+                        hashes.save()
+                    self._count_unchanged(count=writer.unchanged)
+                    logger.info(
+                        "Holidays written to %d partitions in %s (%d unchanged)",
+                        len(paths),
+                        os.path.join(output_dir, str(country).lower()),
+                        writer.unchanged,
+                        extra={"country": str(country).lower()},
                     )
 
-                    if (
-                        response["meta"]["code"] == 200
-                        and response["response"]["holidays"]
-                    ):
-                        response_data.extend(
-                            self._parse_data(holidays=response["response"]["holidays"])
-                        )
+    def _sync_country_holidays(
+        self,
+        *,
+        output_dir: str,
+        manifest: Manifest,
+        country: Country,
+        hashes: ContentHashes | None = None,
+    ) -> None:
+        country_id = str(country).lower()
+        start_date, end_date = self._get_date_range()
+        missing = manifest.get_missing_intervals(
+            country=country_id, start=start_date, end=end_date
+        )
+        previous_path = manifest.get_file_path(country=country_id)
+        file_path = os.path.join(output_dir, self._get_file_name(country_id=country_id))
+
+        # The previous file may hold a wider range, it is kept as it is
+        if not missing:
+            logger.info(
+                "Holidays for %s are up to date",
+                country_id,
+                extra={"country": country_id},
+            )
+            return
+
+        # Everything written before, also outside the range, except what is
+        # fetched again
+        previous = manifest.get_intervals(country=country_id)
+        kept = subtract_intervals(intervals=previous, removed=missing)
+        # (date, line) pairs, kept from the previous file or freshly fetched
+        lines = self._read_covered_lines(file_path=previous_path, intervals=kept)
+        fetched_at = time.time()
+        deduplicator = HolidayDeduplicator()
+        for missing_start, missing_end in missing:
+            periods = self._plan_missing_periods(
+                country=country, start_date=missing_start, end_date=missing_end
+            )
+            for period in periods:
+                holidays = self._fetch_encoded(
+                    country_data={"country": country, **period},
+                    bounds=(missing_start.isoformat(), missing_end.isoformat()),
+                )
+                if self.dedupe:
+                    holidays = self._deduplicate_encoded(
+                        deduplicator=deduplicator, holidays=holidays
+                    )
+                lines.extend((holiday.iso_date, holiday.line) for holiday in holidays)
+        lines.sort(key=lambda line: line[0])
+        fetched = [(start, end, fetched_at) for start, end in missing]
+        if self._is_degraded(country=country):
+            # Left missing in the manifest, so that the next run fetches them again
+            fetched = []
+
+        try:
+            if lines:
+                with self.metrics.time("write_duration_seconds"), self.tracer.span(
+                    "write", category="write", size=len(lines)
+                ):
+                    with AtomicFileWriter(path=file_path, hashes=hashes) as writer:
+                        writer.write_lines(line for _, line in lines)
+                self._log_commit(
+                    writer=writer, details=f" ({len(missing)} ranges fetched)"
+                )
+
+            intervals = [*kept, *fetched]
+            manifest.record(
+                country=country_id,
+                file_name=os.path.basename(file_path) if lines else None,
+                intervals=intervals,
+            )
+            # Replaced only when the new file has all its holidays, i.e. not
+            # when stale ranges could not be fetched again
+            is_replaced = not subtract_intervals(
+                intervals=previous,
+                removed=[(start, end) for start, end, _ in intervals],
+            )
+            if (
+                is_replaced
+                and previous_path not in (None, file_path)
+                and os.path.exists(previous_path)
+            ):
+                os.remove(previous_path)
+        except OSError as e:
+            logger.error("Error writing holidays to file: %s", e)
+
+    def _plan_missing_periods(
+        self, *, country: Country, start_date: date, end_date: date
+    ) -> list[dict]:
+        """
+        Plan the requests for a missing range with the fewest calls, or as the
+        client ``strategy`` would, when that leaves no more requests to send.
+
+        The latter finds the responses cached by an interrupted run again.
+        """
+        plans = [
+            plan_periods(
+                start_date=datetime.combine(start_date, datetime.min.time()),
+                end_date=datetime.combine(end_date, datetime.min.time()),
+                strategy=strategy,
+            )
+            for strategy in (self.strategy, MIN_CALLS)
+        ]
+
+        # The first of the cheapest plans
+        return min(
+            plans,
+            key=lambda periods: sum(
+                1
+                for period in periods
+                if self.refresh
+                or not self._is_available_locally(params={"country": country, **period})
+            ),
+        )
+
+    def _read_covered_lines(
+        self, *, file_path: str | None, intervals: list[tuple[date, date, float]]
+    ) -> list[tuple[str, str]]:
+        if file_path is None or not intervals:
+            return []
+
+        bounds = [(start.isoformat(), end.isoformat()) for start, end, _ in intervals]
+        lines = []
+        with open(file_path) as file:
+            for line in file:
+                iso_date = self.json.loads(line)["date"]["iso"][:10]
+                if any(start <= iso_date <= end for start, end in bounds):
+                    lines.append((iso_date, line))
+
+        return lines
+
+    def _get_date_range(self) -> tuple[date, date]:
+        return self.dates["start_date"].date(), self.dates["end_date"].date()
+
+    def _write_country_columns(
+        self,
+        *,
+        output_dir: str,
+        batches: Iterator[list[dict]],
+        output_format: str,
+        hashes: ContentHashes | None = None,
+    ) -> None:
+        columns = HolidayColumns()
+        for batch in batches:
+            columns.extend(holidays=batch)
+
+        if not columns:
+            return
+
+        file_name = self._get_file_name(
+            country_id=columns.country[0], extension=EXTENSIONS[output_format]
+        )
+        file_path = os.path.join(output_dir, file_name)
+
+        try:
+            with self.metrics.time("write_duration_seconds"), self.tracer.span(
+                "write", category="write", size=len(columns)
+            ):
+                with AtomicFileWriter(
+                    path=file_path, binary=True, hashes=hashes
+                ) as writer:
+                    write_columns(
+                        file=writer.file, columns=columns, output_format=output_format
+                    )
+            self._log_commit(writer=writer)
+        except OSError as e:
+            logger.error("Error writing holidays to file: %s", e)
+
+    def _log_commit(self, *, writer: AtomicFileWriter, details: str = "") -> None:
+        extra = {"path": writer.path}
+        if writer.changed:
+            logger.info("Holidays written to %s%s", writer.path, details, extra=extra)
+            return
+
+        self._count_unchanged(count=1)
+        logger.info("Holidays in %s are unchanged%s", writer.path, details, extra=extra)
+
+    def _count_unchanged(self, *, count: int) -> None:
+        if count:
+            self.metrics.increment("files_unchanged_total", value=count)
+
+    def _get_file_name(self, *, country_id: str, extension: str = ".txt") -> str:
+        return (
+            f"{country_id}"
+            f"_{self.input_data['start_day']}"
+            f"-{self.input_data['start_month']}"
+            f"-{self.input_data['start_year']}"
+            f"_{self.input_data['end_day']}"
+            f"-{self.input_data['end_month']}"
+            f"-{self.input_data['end_year']}{extension}"
+        )
+
+    def _get_country_params(self, *, country: Country) -> list[dict[str, Any]]:
+        return self.params_by_country.get(str(country), [])
+
+    def _fetch_holidays(
+        self,
+        *,
+        country_data: dict[str, Any],
+        bounds: tuple[str, str] | None = None,
+    ) -> list[dict]:
+        clean_country_data: dict[str, str] = get_clean_dict(data=country_data)
+        response = self._get_response(params=clean_country_data)
+
+        return self._filter_holidays(response=response, bounds=bounds)
+
+    def _fetch_encoded(
+        self,
+        *,
+        country_data: dict[str, Any],
+        bounds: tuple[str, str] | None = None,
+    ) -> list[EncodedHoliday]:
+        """
+        Like ``_fetch_holidays``, with the holidays encoded as JSON lines.
+
+        With worker processes, response bodies are decoded, filtered and
+        encoded by them and this thread only waits for the result.
+        """
+        if self._pool is None:
+            return encode_holidays(
+                holidays=self._fetch_holidays(country_data=country_data, bounds=bounds),
+                json=self.json,
+                merge_regions=self.merge_regions,
+            )
+
+        params = get_clean_dict(data=country_data)
+        found, found_params, validators = self._find_response(params=params)
+        if isinstance(found, dict):
+            # Held decoded in memory already
+            response = (
+                found
+                if found_params is params
+                else filter_response(response=found, params=params)
+            )
+            return encode_holidays(
+                holidays=self._filter_holidays(response=response, bounds=bounds),
+                json=self.json,
+                merge_regions=self.merge_regions,
+            )
+
+        if bounds is None:
+            start_date, end_date = self._get_date_range()
+            bounds = (start_date.isoformat(), end_date.isoformat())
+        with self.tracer.span("decode", category="decode", size=len(found)):
+            encoded = self._pool.submit(
+                encode_response,
+                body=found,
+                params=None if found_params is params else params,
+                bounds=bounds,
+                fast_json=self.json.fast,
+                merge_regions=self.merge_regions,
+            ).result()
+        if encoded.code == 200:
+            self._store_response(params=found_params, body=found, validators=validators)
+        self.metrics.increment("holidays_kept_total", value=encoded.kept)
+        self.metrics.increment(
+            "holidays_filtered_total", value=encoded.total - encoded.kept
+        )
+
+        return encoded.holidays
+
+    def _filter_holidays(
+        self, *, response: dict, bounds: tuple[str, str] | None
+    ) -> list[dict]:
+        if response["meta"]["code"] != 200 or not response["response"]["holidays"]:
+            return []
+
+        holidays = response["response"]["holidays"]
+        with self.metrics.time("filter_duration_seconds"), self.tracer.span(
+            "filter", category="filter", size=len(holidays)
+        ):
+            if bounds is None:
+                kept = self._parse_data(holidays=holidays)
+            else:
+                kept = filter_by_date(
+                    holidays=holidays, start_date=bounds[0], end_date=bounds[1]
+                )
+        self.metrics.increment("holidays_kept_total", value=len(kept))
+        self.metrics.increment(
+            "holidays_filtered_total", value=len(holidays) - len(kept)
+        )
 
-            yield response_data
+        return kept
+
+    def _get_response(self, *, params: dict) -> dict:
+        """
+        Return the response for ``params``, preferring local data.
+
+        Already fetched or cached responses for the same period are used
+        first, then responses for a coarser period containing it (filtered
+        down locally), and only then the API is called.
+        """
+        found, found_params, validators = self._find_response(params=params)
+        if isinstance(found, dict):
+            response = found
+        else:
+            response = self._decode(body=found)
+            if response["meta"]["code"] == 200:
+                self._store_response(
+                    params=found_params,
+                    body=found,
+                    validators=validators,
+                    response=response,
+                )
+
+        if found_params is params:
+            return response
+
+        return filter_response(response=response, params=params)
+
+    def _find_response(
+        self, *, params: dict
+    ) -> tuple[bytes | dict, dict, dict[str, str | None] | None]:
+        """
+        Find the response for ``params`` like ``_get_response``, without
+        decoding it.
+
+        Return the body, or the response when it is held decoded, the params
+        it answers (``params`` or a coarser period) and, when it was just
+        fetched from the API, its validators (see ``get_validators``).
+        """
+        if not self.refresh:
+            for candidate in [params, *get_superset_params(params=params)]:
+                found = self._get_local_response(params=candidate)
+                if found is None:
+                    continue
+
+                self.metrics.increment(
+                    "cache_hits_total",
+                    match="exact" if candidate is params else "superset",
+                )
+                return found, candidate, None
+
+        if self.cache is not None or self.responses is not None:
+            self.metrics.increment("cache_misses_total")
+
+        # An expired cached response is sent back by the API only if it changed
+        headers = None
+        if self.cache is not None and not self.refresh:
+            headers = self.cache.get_conditional_headers(params=params) or None
+
+        try:
+            response = self._send(url=self.api_url, params={**params}, headers=headers)
+            if response.status_code == 304 and headers:
+                body = self.cache.revalidate(params=params)
+                if body is not None:
+                    self.metrics.increment("not_modified_total")
+                    return body, params, None
+                # Evicted meanwhile
+                response = self._send(url=self.api_url, params={**params})
+        except ClientException:
+            response = self._get_fallback_response(params=params)
+            if response is None:
+                raise
+            return response, params, None
+
+        return response.content, params, get_validators(headers=response.headers)
+
+    def _store_response(
+        self,
+        *,
+        params: dict,
+        body: bytes,
+        validators: dict[str, str | None] | None,
+        response: dict | None = None,
+    ) -> None:
+        """
+        Keep a successful response, fetched (with its ``validators``) or read
+        from the cache.
+        """
+        if validators is not None and self.cache is not None:
+            self.cache.set(params=params, body=body, **validators)
+        if response is not None and self.responses is not None:
+            self.responses[get_cache_key(params=params)] = response
+
+    def _get_fallback_response(self, *, params: dict) -> dict | None:
+        """
+        Return a response for a failed request: an expired cached one, else
+        (with ``allow_partial``) one without holidays.
+        """
+        key = get_cache_key(params=params)
+        if self.cache is not None:
+            for candidate in [params, *get_superset_params(params=params)]:
+                body = self.cache.get(params=candidate, allow_stale=True)
+                if body is None:
+                    continue
+
+                logger.warning(
+                    "Request for %s failed, using a stale response",
+                    key,
+                    extra=get_log_fields(params=params),
+                )
+                self.metrics.increment("fallback_responses_total", source="stale")
+                self.degraded_params.append(params)
+                response = self._decode(body=body)
+                if candidate is params:
+                    return response
+                return filter_response(response=response, params=params)
+
+        if not self.allow_partial:
+            return None
+
+        logger.warning(
+            "Request for %s failed, its holidays are left out",
+            key,
+            extra=get_log_fields(params=params),
+        )
+        self.metrics.increment("fallback_responses_total", source="partial")
+        self.degraded_params.append(params)
+
+        return {
+            "meta": {"code": 503, "error_type": "unavailable"},
+            "response": {"holidays": []},
+        }
+
+    def _is_degraded(self, *, country: Country | None) -> bool:
+        return any(
+            str(params["country"]).lower() == str(country).lower()
+            for params in self.degraded_params
+        )
+
+    def _is_available_locally(self, *, params: dict) -> bool:
+        clean_params = get_clean_dict(data=params)
+
+        for candidate in [clean_params, *get_superset_params(params=clean_params)]:
+            if self.responses is not None and (
+                get_cache_key(params=candidate) in self.responses
+            ):
+                return True
+            if self.cache is not None and self.cache.contains(params=candidate):
+                return True
+
+        return False
+
+    def _get_local_response(self, *, params: dict) -> bytes | dict | None:
+        """Return the response held in memory, else the cached body."""
+        if self.responses is not None:
+            # A single lookup, entries of a bounded store can be evicted meanwhile
+            response = self.responses.get(get_cache_key(params=params))
+            if response is not None:
+                return response
+
+        if self.cache is None:
+            return None
+
+        return self.cache.get(params=params)
 
     def _request(self, *, url: str, params: dict) -> dict:
+        return self._decode(body=self._request_raw(url=url, params=params))
+
+    def _request_raw(self, *, url: str, params: dict) -> bytes:
+        return self._send(url=url, params=params).content
+
+    def _send(
+        self, *, url: str, params: dict, headers: dict[str, str] | None = None
+    ) -> Any:
+        """
+        Send a request through the breaker, scheduler and hedger.
+
+        Return the response, which is 304 Not Modified when conditional
+        ``headers`` match, and raise ``ClientException`` for error statuses.
+        """
+        granularity = get_granularity(params=params)
+        if not self.breaker.allow():
+            self.metrics.increment("circuit_rejected_total")
+            raise CircuitOpenException(
+                f"Error: {granularity} request not sent, the API keeps failing"
+            )
+
+        status = "error"
+        failed = True
+        started_at = time.perf_counter()
+        deadline_at = time.monotonic() + self.deadline if self.deadline else None
+
         try:
-            response = self.session.get(url=url, params=params)
-            response.raise_for_status()
+            with self.tracer.span(
+                "request",
+                category="request",
+                granularity=granularity,
+                **{
+                    key: value
+                    for key, value in params.items()
+                    if key in ("country", "year", "month", "day")
+                },
+            ):
+                response = self.scheduler.run(
+                    send=lambda: self.hedger.send(
+                        send=lambda: self.transport.get(
+                            url=url, params=params, headers=headers
+                        ),
+                        deadline_at=deadline_at,
+                        metrics=self.metrics,
+                    ),
+                    deadline=self.deadline,
+                )
+            status = str(response.status_code)
+            # Client errors are not a sign of a degraded API
+            failed = response.status_code in RETRY_STATUSES
+            if response.status_code >= 400:
+                raise ClientException(
+                    f"Error: {granularity} request failed with status {status}"
+                )
+            self.metrics.increment("response_bytes_total", value=len(response.content))
 
-            return response.json()
-        except requests.RequestException as e:
-            raise ClientException(f"Error: {e}")
+            return response
+        except DeadlineException:
+            self.metrics.increment(
+                "request_deadline_exceeded_total", granularity=granularity
+            )
+            raise
+        finally:
+            if self.breaker.record(failed=failed):
+                self.metrics.increment("circuit_opened_total")
+            latency = time.perf_counter() - started_at
+            self.metrics.increment(
+                "requests_total", granularity=granularity, status=status
+            )
+            self.metrics.observe(
+                "request_duration_seconds",
+                value=latency,
+                granularity=granularity,
+                status=status,
+            )
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(
+                    "Request for %s answered %s in %.3fs",
+                    get_cache_key(params=params),
+                    status,
+                    latency,
+                    extra={
+                        **get_log_fields(params=params),
+                        "status": status,
+                        "latency": round(latency, 6),
+                    },
+                )
 
-    def _parse_data(self, *, holidays: list[dict]) -> list[dict]:
-        for holiday in copy.deepcopy(holidays):
-            date = parse_date(iso_date=holiday["date"]["iso"])
-            if date < self.dates["start_date"] or date > self.dates["end_date"]:
-                holidays.remove(holiday)
+    def _decode(self, *, body: bytes) -> dict:
+        try:
+            with self.tracer.span("decode", category="decode", size=len(body)):
+                return self.json.loads(body)
+        except ValueError as e:
+            raise ClientException(f"Error: invalid JSON response: {e}")
 
-        return holidays
+    def _parse_data(self, *, holidays: list[dict]) -> list[dict]:
+        return filter_by_date(
+            holidays=holidays,
+            start_date=get_iso_date(date=self.dates["start_date"]),
+            end_date=get_iso_date(date=self.dates["end_date"]),
+        )
 
     @property
     def api_url(self) -> str:
         return f"{self.BASE_URL}?api_key={config.API_KEY}"
 
-    @property
-    def headers(self) -> dict[str, str]:
-        return {
-            "User-Agent": "application/json",
-            "Accept": "application/json",
-        }
 
+class AsyncCalendarificClient(CalendarificClient):
+    """
+    Client that sends the planned requests concurrently.
 
-if __name__ == "__main__":
+    At most ``concurrency`` requests are in flight at once and at most
+    ``prefetch`` results are held ahead of the one being consumed, which
+    bounds memory. Results are still yielded per country in input order, so
+    the written files do not change.
+    """
+
+    def __init__(
+        self,
+        *,
+        values: CalendarParams,
+        concurrency: int,
+        prefetch: int | None = None,
+        **kwargs: Any,
+    ) -> None:
+        if concurrency < 1:
+            raise ClientException("Concurrency must be at least 1")
+
+        kwargs.setdefault(
+            "scheduler", get_default_scheduler(max_concurrency=concurrency)
+        )
+        super().__init__(values=values, **kwargs)
+        self.concurrency = concurrency
+        self.prefetch = max(prefetch or concurrency * 4, concurrency)
+
+    def _iter_country_batches(
+        self, *, fetch: Callable[..., list] | None = None
+    ) -> Generator[tuple[Country, Iterator[list]], None, None]:
+        import asyncio
+        from concurrent.futures import ThreadPoolExecutor
+
+        fetch = fetch or self._fetch_holidays
+        loop = asyncio.new_event_loop()
+        executor = ThreadPoolExecutor(max_workers=self.concurrency)
+        semaphore = asyncio.Semaphore(self.concurrency)
+        plan = [
+            (country, self._get_country_params(country=country))
+            for country in self.input_data["countries"]
+        ]
+        pending = (country_data for _, params in plan for country_data in params)
+        tasks: "deque[asyncio.Task]" = deque()
+
+        def schedule() -> None:
+            while len(tasks) < self.prefetch:
+                country_data = next(pending, None)
+                if country_data is None:
+                    return
+                tasks.append(
+                    loop.create_task(
+                        self._fetch_holidays_async(
+                            executor=executor,
+                            semaphore=semaphore,
+                            fetch=fetch,
+                            country_data=country_data,
+                        )
+                    )
+                )
+
+        def iter_batches(count: int) -> Iterator[list]:
+            for _ in range(count):
+                schedule()
+                yield loop.run_until_complete(tasks.popleft())
+
+        try:
+            for country, params in plan:
+                batches = iter_batches(len(params))
+                yield country, batches
+                # Keep the tasks aligned when a country was not fully consumed
+                for _ in batches:
+                    pass
+        finally:
+            for task in tasks:
+                task.cancel()
+            if tasks:
+                loop.run_until_complete(asyncio.gather(*tasks, return_exceptions=True))
+            loop.close()
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    async def _fetch_holidays_async(
+        self,
+        *,
+        executor: "ThreadPoolExecutor",
+        semaphore: "asyncio.Semaphore",
+        fetch: Callable[..., list],
+        country_data: dict[str, Any],
+    ) -> list:
+        import asyncio
+
+        async with semaphore:
+            return await asyncio.get_running_loop().run_in_executor(
+                executor, lambda: fetch(country_data=country_data)
+            )
+
+
+def main() -> None:
+    setup_logging()
     parser = argparse.ArgumentParser(
         description="Get Holiday calendar input_data from the Calendarific API."
     )
@@ -121,21 +1210,243 @@ if __name__ == "__main__":
     parser.add_argument("--end_year", type=int, required=True, help="the end year")
     parser.add_argument("--end_month", type=int, required=True, help="the end month")
     parser.add_argument("--end_day", type=int, required=True, help="the end day")
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=config.CONCURRENCY,
+        help="the maximum number of requests in flight at once",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="neither read nor store responses in the local cache",
+    )
+    parser.add_argument(
+        "--refresh",
+        action="store_true",
+        help="ignore cached responses and store fresh ones",
+    )
+    parser.add_argument(
+        "--deadline",
+        type=float,
+        default=config.REQUEST_DEADLINE,
+        help="seconds a request may take, retries included (0 for no deadline)",
+    )
+    parser.add_argument(
+        "--hedge",
+        action="store_true",
+        default=config.HEDGE_REQUESTS,
+        help="send a duplicate of requests slower than usual, the first response wins",
+    )
+    parser.add_argument(
+        "--allow-partial",
+        action="store_true",
+        help="leave out the holidays of requests that failed without a cached "
+        "response, instead of failing the run",
+    )
+    parser.add_argument(
+        "--plan",
+        choices=STRATEGIES,
+        default=AUTO,
+        help="how the date range is split into requests",
+    )
+    parser.add_argument(
+        "--processes",
+        type=int,
+        default=config.PROCESSES,
+        help="decode, filter and encode responses in this many worker processes "
+        "(JSONL output only), raises --concurrency to match",
+    )
+    parser.add_argument(
+        "--fast-json",
+        action="store_true",
+        default=config.FAST_JSON,
+        help="use orjson, when installed, to decode responses and encode output",
+    )
+    parser.add_argument(
+        "--format",
+        choices=FORMATS,
+        default=JSONL,
+        help="the output file format, columnar formats need pyarrow or numpy",
+    )
+    parser.add_argument(
+        "--no-dedupe",
+        action="store_true",
+        help="keep holidays repeated across responses",
+    )
+    parser.add_argument(
+        "--merge-regions",
+        action="store_true",
+        help="merge the per-state records of a holiday into one listing all states",
+    )
+    parser.add_argument(
+        "--layout",
+        choices=LAYOUTS,
+        default=FLAT,
+        help="one file per country, or one file per country and year "
+        "(<country>/<year>.jsonl)",
+    )
+    parser.add_argument(
+        "--compress",
+        choices=COMPRESSIONS,
+        default=NONE,
+        help="compress the partitions of the partitioned layout",
+    )
+    parser.add_argument(
+        "--incremental",
+        "--resume",
+        action="store_true",
+        help="only fetch the date ranges missing from the output directory",
+    )
+    parser.add_argument(
+        "--build-index",
+        action="store_true",
+        help="index the output directory for holiday_index.py lookups after the run",
+    )
+    parser.add_argument(
+        "--metrics",
+        help="write the run metrics to this file at the end of the run ('-' for stdout)",
+    )
+    parser.add_argument(
+        "--metrics-format",
+        choices=("prometheus", "json"),
+        default="prometheus",
+        help="the format of the --metrics file",
+    )
+    parser.add_argument(
+        "--profile",
+        help="profile the run with cProfile and write the stats to this .pstats file",
+    )
+    parser.add_argument(
+        "--trace",
+        help="write one span per country and pipeline stage to this file "
+        "as Chrome trace-event JSON",
+    )
+    parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="print the planned requests and quota cost without fetching anything",
+    )
     args = parser.parse_args()
 
-    client = CalendarificClient(
-        values=CalendarParams(
-            countries=args.countries,
-            start_date=StartDate(
-                year=Year(value=args.start_year),
-                month=Month(value=args.start_month),
-                day=Day(value=args.start_day),
-            ),
-            end_date=EndDate(
-                year=Year(value=args.end_year),
-                month=Month(value=args.end_month),
-                day=Day(value=args.end_day),
-            ),
+    values = CalendarParams(
+        countries=args.countries,
+        start_date=StartDate(
+            year=Year(value=args.start_year),
+            month=Month(value=args.start_month),
+            day=Day(value=args.start_day),
+        ),
+        end_date=EndDate(
+            year=Year(value=args.end_year),
+            month=Month(value=args.end_month),
+            day=Day(value=args.end_day),
+        ),
+    )
+    cache = (
+        None
+        if args.no_cache
+        else ResponseCache(
+            path=config.CACHE_PATH,
+            ttl=config.CACHE_TTL,
+            max_entries=config.CACHE_MAX_ENTRIES,
         )
     )
-    client.run(output_dir=config.OUTPUT_DIR)
+    tracer = Tracer() if args.trace else NULL_TRACER
+    concurrency = args.concurrency
+    if args.processes > concurrency:
+        # Each fetching thread waits for its own response to be encoded
+        logger.info(
+            "Concurrency raised to %d, one request per worker process",
+            args.processes,
+        )
+        concurrency = args.processes
+    hedger = get_default_hedger(max_concurrency=concurrency)
+    hedger.enabled = args.hedge
+    profiler = None
+    if args.profile:
+        import cProfile
+
+        profiler = cProfile.Profile()
+        profiler.enable()
+
+    if concurrency > 1:
+        client = AsyncCalendarificClient(
+            values=values,
+            concurrency=concurrency,
+            cache=cache,
+            refresh=args.refresh,
+            strategy=args.plan,
+            fast_json=args.fast_json,
+            dedupe=not args.no_dedupe,
+            merge_regions=args.merge_regions,
+            hedger=hedger,
+            deadline=args.deadline,
+            allow_partial=args.allow_partial,
+            processes=args.processes,
+            tracer=tracer,
+        )
+    else:
+        client = CalendarificClient(
+            values=values,
+            cache=cache,
+            refresh=args.refresh,
+            strategy=args.plan,
+            fast_json=args.fast_json,
+            dedupe=not args.no_dedupe,
+            merge_regions=args.merge_regions,
+            hedger=hedger,
+            deadline=args.deadline,
+            allow_partial=args.allow_partial,
+            processes=args.processes,
+            tracer=tracer,
+        )
+
+    if args.dry_run:
+        summary = client.get_plan_summary()
+        logger.info(
+            "Planned requests: %d (year: %d, month: %d, day: %d)",
+            summary["requests"],
+            summary["year"],
+            summary["month"],
+            summary["day"],
+        )
+        logger.info(
+            "Estimated quota cost: %d requests (%d served locally)",
+            summary["quota_cost"],
+            summary["cached"],
+        )
+    else:
+        client.run(
+            output_dir=config.OUTPUT_DIR,
+            output_format=args.format,
+            incremental=args.incremental,
+            layout=args.layout,
+            compression=args.compress,
+        )
+        if args.build_index:
+            count = build_index(output_dir=config.OUTPUT_DIR)
+            logger.info("Indexed %d holidays in %s", count, config.OUTPUT_DIR)
+
+    if profiler is not None:
+        profiler.disable()
+        profiler.dump_stats(args.profile)
+        logger.info("Profile written to %s", args.profile)
+    if args.trace:
+        tracer.write(path=args.trace)
+        logger.info("Trace written to %s", args.trace)
+
+    if args.metrics:
+        metrics_dump = (
+            client.metrics.to_json()
+            if args.metrics_format == "json"
+            else client.metrics.to_prometheus()
+        )
+        if args.metrics == "-":
+            sys.stdout.write(metrics_dump)
+        else:
+            with open(args.metrics, "w") as file:
+                file.write(metrics_dump)
+
+
+if __name__ == "__main__":
+    main()
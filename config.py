@@ -1,7 +1,88 @@
 import os
-from dotenv import load_dotenv
+from typing import Any
 
-load_dotenv()
+# Settings are read from the environment and .env on first access, so that
+# importing a module does not pay for parsing .env when it is never needed.
+_loaded = False
 
-API_KEY = os.getenv("API_KEY")
-OUTPUT_DIR = os.getenv("OUTPUT_DIR")
+
+def load() -> None:
+    """Read .env and the environment into the module settings, once."""
+    global _loaded
+    if _loaded:
+        return
+
+    from dotenv import load_dotenv
+
+    load_dotenv()
+    settings = _read_settings()
+    # Keep values assigned before loading, e.g. by tests or embedding code
+    for name, value in settings.items():
+        globals().setdefault(name, value)
+    _loaded = True
+
+
+def __getattr__(name: str) -> Any:
+    if name.isupper() and not _loaded:
+        load()
+        return globals()[name]
+
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def _read_settings() -> dict[str, Any]:
+    return {
+        "API_KEY": os.getenv("API_KEY"),
+        "OUTPUT_DIR": os.getenv("OUTPUT_DIR"),
+        "CONCURRENCY": int(os.getenv("CONCURRENCY", 1)),
+        "CACHE_PATH": os.getenv("CACHE_PATH", "./.cache/responses.sqlite3"),
+        "CACHE_MAX_ENTRIES": int(os.getenv("CACHE_MAX_ENTRIES", 100_000)),
+        # Time to live in seconds per request granularity, 0 means never expire
+        "CACHE_TTL": {
+            "year": int(os.getenv("CACHE_TTL_YEAR", 7 * 24 * 60 * 60)),
+            "month": int(os.getenv("CACHE_TTL_MONTH", 24 * 60 * 60)),
+            "day": int(os.getenv("CACHE_TTL_DAY", 60 * 60)),
+            "past": int(os.getenv("CACHE_TTL_PAST", 0)),
+        },
+        # Requests per second (0 disables the limit) and the size of a burst
+        "RATE_LIMIT_PER_SECOND": float(os.getenv("RATE_LIMIT_PER_SECOND", 10)),
+        "RATE_LIMIT_BURST": int(os.getenv("RATE_LIMIT_BURST", 10)),
+        "MAX_RETRIES": int(os.getenv("MAX_RETRIES", 5)),
+        "BACKOFF_BASE": float(os.getenv("BACKOFF_BASE", 0.5)),
+        "BACKOFF_MAX": float(os.getenv("BACKOFF_MAX", 30)),
+        # Responses slower than this (in seconds) reduce the requests in flight
+        "LATENCY_THRESHOLD": float(os.getenv("LATENCY_THRESHOLD", 5)),
+        # Connection pools of the HTTP transport and its timeouts in seconds
+        "HTTP_POOL_CONNECTIONS": int(os.getenv("HTTP_POOL_CONNECTIONS", 1)),
+        "HTTP_POOL_MAXSIZE": int(os.getenv("HTTP_POOL_MAXSIZE", 10)),
+        "HTTP_CONNECT_TIMEOUT": float(os.getenv("HTTP_CONNECT_TIMEOUT", 5)),
+        "HTTP_READ_TIMEOUT": float(os.getenv("HTTP_READ_TIMEOUT", 30)),
+        # Seconds a request may take, retries included (0 means no deadline)
+        "REQUEST_DEADLINE": float(os.getenv("REQUEST_DEADLINE", 60)),
+        # Send a duplicate of requests slower than the HEDGE_PERCENTILE of
+        # recent ones (HEDGE_DELAY seconds until enough are known)
+        "HEDGE_REQUESTS": os.getenv("HEDGE_REQUESTS", "").lower()
+        in ("1", "true", "yes"),
+        "HEDGE_DELAY": float(os.getenv("HEDGE_DELAY", 1)),
+        "HEDGE_PERCENTILE": float(os.getenv("HEDGE_PERCENTILE", 0.95)),
+        # Failures in a row that stop requests, and the pause in seconds
+        "CIRCUIT_FAILURE_THRESHOLD": int(os.getenv("CIRCUIT_FAILURE_THRESHOLD", 5)),
+        "CIRCUIT_RESET_TIMEOUT": float(os.getenv("CIRCUIT_RESET_TIMEOUT", 30)),
+        # Address of service.py, with the size and lifetime (0 means no limit)
+        # in seconds of its in-memory responses and answers
+        "SERVICE_HOST": os.getenv("SERVICE_HOST", "127.0.0.1"),
+        "SERVICE_PORT": int(os.getenv("SERVICE_PORT", 8080)),
+        "SERVICE_MAX_ENTRIES": int(os.getenv("SERVICE_MAX_ENTRIES", 1024)),
+        "SERVICE_TTL": int(os.getenv("SERVICE_TTL", 60 * 60)),
+        # Worker processes decoding and encoding JSONL runs, 0 uses none
+        "PROCESSES": int(os.getenv("PROCESSES", 0)),
+        # Use orjson, when installed, to decode responses and encode output
+        "FAST_JSON": os.getenv("FAST_JSON", "").lower() in ("1", "true", "yes"),
+        # Console log level and format (text or json), and the debug records
+        # per second written at most (0 means no limit)
+        "LOG_LEVEL": os.getenv("LOG_LEVEL", "INFO").upper(),
+        "LOG_FORMAT": os.getenv("LOG_FORMAT", "text").lower(),
+        "LOG_DEBUG_RATE": float(os.getenv("LOG_DEBUG_RATE", 10)),
+        # Seconds after which incremental runs fetch the current year again
+        "MANIFEST_MAX_AGE": int(os.getenv("MANIFEST_MAX_AGE", 7 * 24 * 60 * 60)),
+    }
@@ -2,5 +2,17 @@ class ClientException(Exception):
     """Custom errors for CalendarificClient."""
 
 
+class DeadlineException(ClientException):
+    """A request got no response within its deadline."""
+
+
+class CircuitOpenException(ClientException):
+    """A request was not sent because the upstream is failing."""
+
+
 class InvalidInputData(Exception):
     """Custom errors for parameters dataclasses."""
+
+
+class IndexException(Exception):
+    """Custom errors for the holiday index."""
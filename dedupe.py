@@ -0,0 +1,105 @@
+from typing import Any, Hashable, TypeVar
+
+ALL_STATES = "All"
+
+T = TypeVar("T")
+
+
+def get_holiday_key(*, holiday: dict[str, Any]) -> tuple[Hashable, ...]:
+    """Identity of a holiday: its ``urlid`` (or name), date and states."""
+    return (
+        holiday.get("urlid") or holiday.get("name"),
+        holiday["date"]["iso"],
+        _get_states_key(states=holiday.get("states")),
+    )
+
+
+def merge_regional_variants(*, holidays: list[dict[str, Any]]) -> list[dict[str, Any]]:
+    """
+    Merge the records of a holiday repeated once per state into one record.
+
+    Records with the same ``urlid`` (or name) and date are merged, in order of
+    first appearance. The merged record lists the states of all of them,
+    sorted, or ``"All"`` when one of them applies to the whole country.
+    """
+    variants: dict[tuple[Hashable, str], list[dict[str, Any]]] = {}
+    for holiday in holidays:
+        key = (holiday.get("urlid") or holiday.get("name"), holiday["date"]["iso"])
+        variants.setdefault(key, []).append(holiday)
+
+    return [
+        group[0] if len(group) == 1 else _merge(holidays=group)
+        for group in variants.values()
+    ]
+
+
+class HolidayDeduplicator:
+    """
+    Drop holidays already seen, across every batch given to ``filter``.
+
+    With ``merge_regions``, the regional variants within a batch are merged
+    first (see ``merge_regional_variants``). One instance covers one country.
+    """
+
+    def __init__(self, *, merge_regions: bool = False) -> None:
+        self.merge_regions = merge_regions
+        self.duplicates = 0
+        self._seen: set[tuple[Hashable, ...]] = set()
+
+    def filter(self, *, holidays: list[dict[str, Any]]) -> list[dict[str, Any]]:
+        if self.merge_regions:
+            holidays = merge_regional_variants(holidays=holidays)
+
+        return self.drop_seen(
+            items=holidays,
+            keys=[get_holiday_key(holiday=holiday) for holiday in holidays],
+        )
+
+    def drop_seen(self, *, items: list[T], keys: list[Hashable]) -> list[T]:
+        """Drop the items whose key was seen before, e.g. already encoded holidays."""
+        unique = []
+        for item, key in zip(items, keys):
+            if key not in self._seen:
+                self._seen.add(key)
+                unique.append(item)
+        self.duplicates += len(items) - len(unique)
+
+        return unique
+
+
+def _get_state_id(*, state: Any) -> str:
+    if isinstance(state, dict):
+        return str(state.get("iso") or state.get("abbrev") or state.get("name"))
+
+    return str(state)
+
+
+def _get_states_key(*, states: Any) -> Hashable:
+    if isinstance(states, list):
+        return tuple(sorted(_get_state_id(state=state) for state in states))
+
+    return states
+
+
+def _merge(*, holidays: list[dict[str, Any]]) -> dict[str, Any]:
+    merged = dict(holidays[0])
+    if any(not isinstance(holiday.get("states"), list) for holiday in holidays):
+        merged["states"] = ALL_STATES
+        merged["locations"] = ALL_STATES
+        return merged
+
+    states = {
+        _get_state_id(state=state): state
+        for holiday in holidays
+        for state in holiday["states"]
+    }
+    merged["states"] = [states[state_id] for state_id in sorted(states)]
+    locations = {
+        location.strip()
+        for holiday in holidays
+        for location in str(holiday.get("locations") or "").split(",")
+        if location.strip()
+    }
+    merged["locations"] = ", ".join(sorted(locations))
+
+    return merged
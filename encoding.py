@@ -0,0 +1,82 @@
+from typing import Any, Hashable, NamedTuple
+
+from cache import get_period_prefix
+from custom_exceptions import ClientException
+from dedupe import get_holiday_key, merge_regional_variants
+from json_codec import JsonCodec
+from utils import filter_by_date
+
+
+class EncodedHoliday(NamedTuple):
+    """A holiday ready to be written, with what is needed to order and dedupe it."""
+
+    iso_date: str
+    key: tuple[Hashable, ...]
+    line: str
+
+
+class EncodedResponse(NamedTuple):
+    code: int
+    # Holidays of the requested period, and the ones kept within the bounds
+    total: int
+    kept: int
+    holidays: list[EncodedHoliday]
+
+
+def encode_holidays(
+    *, holidays: list[dict[str, Any]], json: JsonCodec, merge_regions: bool = False
+) -> list[EncodedHoliday]:
+    """Encode each holiday as a JSON line, merging regional variants first."""
+    if merge_regions:
+        holidays = merge_regional_variants(holidays=holidays)
+
+    return [
+        EncodedHoliday(
+            iso_date=holiday["date"]["iso"][:10],
+            key=get_holiday_key(holiday=holiday),
+            line=json.dumps(holiday) + "\n",
+        )
+        for holiday in holidays
+    ]
+
+
+def encode_response(
+    *,
+    body: bytes,
+    params: dict[str, Any] | None,
+    bounds: tuple[str, str],
+    fast_json: bool,
+    merge_regions: bool,
+) -> EncodedResponse:
+    """
+    Decode a response body, keep the holidays between ``bounds`` (ISO dates)
+    and encode them.
+
+    With ``params``, the response is of a coarser period and is narrowed down
+    to theirs first. Runs in worker processes, so that the client process
+    only does network and file I/O.
+    """
+    json = JsonCodec(fast=fast_json)
+    try:
+        response = json.loads(body)
+    except ValueError as e:
+        raise ClientException(f"Error: invalid JSON response: {e}")
+
+    code = response["meta"]["code"]
+    holidays = response["response"]["holidays"] if code == 200 else []
+    if not holidays:
+        return EncodedResponse(code=code, total=0, kept=0, holidays=[])
+
+    if params is not None:
+        prefix = get_period_prefix(params=params)
+        holidays = [
+            holiday for holiday in holidays if holiday["date"]["iso"].startswith(prefix)
+        ]
+    kept = filter_by_date(holidays=holidays, start_date=bounds[0], end_date=bounds[1])
+
+    return EncodedResponse(
+        code=code,
+        total=len(holidays),
+        kept=len(kept),
+        holidays=encode_holidays(holidays=kept, json=json, merge_regions=merge_regions),
+    )
@@ -0,0 +1,127 @@
+from typing import Any, BinaryIO
+
+from custom_exceptions import ClientException
+from logger import logger
+
+JSONL = "jsonl"
+PARQUET = "parquet"
+ARROW = "arrow"
+NPY = "npy"
+FORMATS = (JSONL, PARQUET, ARROW, NPY)
+EXTENSIONS = {JSONL: ".txt", PARQUET: ".parquet", ARROW: ".arrow", NPY: ".npy"}
+# Separator of the holiday types in the NumPy "type" column
+TYPE_SEPARATOR = "|"
+
+
+def resolve_format(*, output_format: str) -> str:
+    """
+    Return the format that will actually be written.
+
+    Parquet and Arrow IPC need pyarrow and fall back to NumPy when it is not
+    installed. Raises ``ClientException`` when no library is available.
+    """
+    if output_format not in FORMATS:
+        raise ClientException(f"Output format must be one of {', '.join(FORMATS)}")
+
+    if output_format in (PARQUET, ARROW) and not _is_installed(module="pyarrow"):
+        logger.warning("pyarrow is not installed, writing %s instead", NPY)
+        output_format = NPY
+
+    if output_format == NPY and not _is_installed(module="numpy"):
+        raise ClientException(f"numpy is required for the {NPY} output format")
+
+    return output_format
+
+
+class HolidayColumns:
+    """Typed columns of the holidays of one country."""
+
+    def __init__(self) -> None:
+        self.date: list[str] = []
+        self.country: list[str] = []
+        self.name: list[str] = []
+        self.primary_type: list[str] = []
+        self.type: list[list[str]] = []
+
+    def extend(self, *, holidays: list[dict[str, Any]]) -> None:
+        for holiday in holidays:
+            self.date.append(holiday["date"]["iso"][:10])
+            self.country.append(holiday["country"]["id"])
+            self.name.append(holiday["name"])
+            self.primary_type.append(holiday.get("primary_type") or "")
+            self.type.append(list(holiday.get("type") or []))
+
+    def __len__(self) -> int:
+        return len(self.date)
+
+
+def write_columns(
+    *, file: BinaryIO, columns: HolidayColumns, output_format: str
+) -> None:
+    if output_format == PARQUET:
+        import pyarrow.parquet as parquet
+
+        parquet.write_table(_to_arrow_table(columns=columns), file)
+    elif output_format == ARROW:
+        import pyarrow as arrow
+
+        table = _to_arrow_table(columns=columns)
+        with arrow.ipc.new_file(file, table.schema) as ipc_writer:
+            ipc_writer.write_table(table)
+    elif output_format == NPY:
+        import numpy
+
+        numpy.save(file, to_structured_array(columns=columns), allow_pickle=False)
+    else:
+        raise ClientException(f"{output_format} is not a columnar output format")
+
+
+def to_structured_array(*, columns: HolidayColumns) -> Any:
+    import numpy
+
+    types = [TYPE_SEPARATOR.join(values) for values in columns.type]
+    dtype = numpy.dtype(
+        [
+            ("date", "datetime64[D]"),
+            ("country", f"U{_max_length(values=columns.country)}"),
+            ("name", f"U{_max_length(values=columns.name)}"),
+            ("primary_type", f"U{_max_length(values=columns.primary_type)}"),
+            ("type", f"U{_max_length(values=types)}"),
+        ]
+    )
+    array = numpy.empty(len(columns), dtype=dtype)
+    array["date"] = columns.date
+    array["country"] = columns.country
+    array["name"] = columns.name
+    array["primary_type"] = columns.primary_type
+    array["type"] = types
+
+    return array
+
+
+def _to_arrow_table(*, columns: HolidayColumns) -> Any:
+    import pyarrow as arrow
+    import pyarrow.compute as compute
+
+    return arrow.table(
+        {
+            "date": compute.cast(arrow.array(columns.date), arrow.date32()),
+            "country": arrow.array(columns.country).dictionary_encode(),
+            "name": arrow.array(columns.name, type=arrow.string()),
+            "primary_type": arrow.array(columns.primary_type).dictionary_encode(),
+            "type": arrow.array(columns.type, type=arrow.list_(arrow.string())),
+        }
+    )
+
+
+def _max_length(*, values: list[str]) -> int:
+    return max((len(value) for value in values), default=0) or 1
+
+
+def _is_installed(*, module: str) -> bool:
+    try:
+        __import__(module)
+    except ImportError:
+        return False
+
+    return True
@@ -0,0 +1,159 @@
+import copy
+import sys
+from datetime import date
+from typing import Any, NamedTuple
+
+CANONICAL_URL_PREFIX = "https://calendarific.com/holiday/"
+# Key order of a holiday as returned by the API, kept when writing it back
+KEYS = (
+    "name",
+    "description",
+    "country",
+    "date",
+    "type",
+    "primary_type",
+    "canonical_url",
+    "urlid",
+    "locations",
+    "states",
+)
+COUNTRY_KEYS = ("id", "name")
+DATE_KEYS = ("iso", "datetime")
+DATETIME_KEYS = ("year", "month", "day")
+
+# Shared instances of repeated values (type lists, states), see _intern
+_interned: dict[Any, Any] = {}
+
+
+class Holiday(NamedTuple):
+    """
+    Compact holiday record.
+
+    Repeated strings (country, types, locations, states) are interned, the
+    date is stored as an ordinal and ``canonical_url`` only when it cannot be
+    derived from ``urlid``. Holidays that do not have the usual API shape
+    keep their original dict in ``raw``, so ``to_dict`` is always lossless.
+    """
+
+    name: str
+    description: str
+    country_id: str
+    country_name: str
+    ordinal: int
+    types: tuple[str, ...]
+    primary_type: str
+    urlid: str
+    canonical_url: str | None
+    locations: str
+    states: str | tuple[tuple[tuple[str, Any], ...], ...]
+    raw: dict | None = None
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> "Holiday":
+        regular = _has_regular_shape(data=data)
+        country = data.get("country") or {}
+        states = data.get("states")
+        urlid = data.get("urlid")
+        canonical_url = data.get("canonical_url")
+        if regular and canonical_url == f"{CANONICAL_URL_PREFIX}{urlid}":
+            canonical_url = None
+
+        return cls(
+            name=data.get("name"),
+            description=data.get("description"),
+            country_id=_intern(country.get("id")),
+            country_name=_intern(country.get("name")),
+            ordinal=date.fromisoformat(data["date"]["iso"][:10]).toordinal(),
+            types=_intern(tuple(_intern(value) for value in data.get("type") or ())),
+            primary_type=_intern(data.get("primary_type")),
+            urlid=urlid,
+            canonical_url=canonical_url,
+            locations=_intern(data.get("locations")),
+            states=(
+                _intern(tuple(_intern(tuple(state.items())) for state in states))
+                if isinstance(states, list)
+                else _intern(states)
+            ),
+            raw=None if regular else copy.deepcopy(data),
+        )
+
+    @property
+    def date(self) -> date:
+        return date.fromordinal(self.ordinal)
+
+    @property
+    def iso_date(self) -> str:
+        return self.date.isoformat()
+
+    def to_dict(self) -> dict[str, Any]:
+        if self.raw is not None:
+            return copy.deepcopy(self.raw)
+
+        day = self.date
+
+        return {
+            "name": self.name,
+            "description": self.description,
+            "country": {"id": self.country_id, "name": self.country_name},
+            "date": {
+                "iso": day.isoformat(),
+                "datetime": {"year": day.year, "month": day.month, "day": day.day},
+            },
+            "type": list(self.types),
+            "primary_type": self.primary_type,
+            "canonical_url": (
+                f"{CANONICAL_URL_PREFIX}{self.urlid}"
+                if self.canonical_url is None
+                else self.canonical_url
+            ),
+            "urlid": self.urlid,
+            "locations": self.locations,
+            "states": (
+                self.states
+                if isinstance(self.states, str)
+                else [dict(state) for state in self.states]
+            ),
+        }
+
+
+def parse_holidays(*, holidays: list[dict[str, Any]]) -> list[Holiday]:
+    return [Holiday.from_dict(holiday) for holiday in holidays]
+
+
+def _intern(value: Any) -> Any:
+    if isinstance(value, str):
+        return sys.intern(value)
+
+    try:
+        return _interned.setdefault(value, value)
+    except TypeError:
+        return value
+
+
+def _has_regular_shape(*, data: dict[str, Any]) -> bool:
+    """Check that ``to_dict`` rebuilds ``data`` with the same keys and order."""
+    try:
+        date_data = data["date"]
+        datetime_data = date_data["datetime"]
+        day = date.fromisoformat(date_data["iso"])
+        states = data["states"]
+
+        return (
+            tuple(data) == KEYS
+            and tuple(data["country"]) == COUNTRY_KEYS
+            and tuple(date_data) == DATE_KEYS
+            and len(date_data["iso"]) == 10
+            and tuple(datetime_data) == DATETIME_KEYS
+            and (datetime_data["year"], datetime_data["month"], datetime_data["day"])
+            == (day.year, day.month, day.day)
+            and isinstance(data["type"], list)
+            and (
+                isinstance(states, str)
+                or (
+                    isinstance(states, list)
+                    and all(isinstance(state, dict) for state in states)
+                )
+            )
+        )
+    except (KeyError, TypeError, ValueError):
+        return False
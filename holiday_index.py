@@ -0,0 +1,210 @@
+import argparse
+import bisect
+import glob
+import json
+import mmap
+import os
+import struct
+from datetime import date
+from typing import Any
+
+from custom_exceptions import IndexException
+from writer import AtomicFileWriter
+
+INDEX_FILE_NAME = "holidays.idx"
+MAGIC = b"CALIDX01"
+# Magic, number of records, offset of the file table
+HEADER = struct.Struct(">8sQQ")
+# Country, date ordinal, file id, line offset, line length. Big-endian, so
+# the first KEY_SIZE bytes of a record sort like (country, date)
+RECORD = struct.Struct(">2sIHQI")
+KEY_SIZE = 6
+
+
+def build_index(*, output_dir: str, index_path: str | None = None) -> int:
+    """
+    Index every holiday of the JSONL output files in ``output_dir``.
+
+    :return: The number of indexed holidays.
+    """
+    index_path = index_path or os.path.join(output_dir, INDEX_FILE_NAME)
+    file_paths = sorted(glob.glob(os.path.join(output_dir, "*.txt")))
+    if len(file_paths) > 0xFFFF:
+        raise IndexException("Too many output files to index")
+
+    records = []
+    files = []
+    for file_id, file_path in enumerate(file_paths):
+        files.append([os.path.basename(file_path), os.path.getsize(file_path)])
+        offset = 0
+        with open(file_path, "rb") as file:
+            for line in file:
+                holiday = json.loads(line)
+                records.append(
+                    (
+                        _encode_country(country=holiday["country"]["id"]),
+                        date.fromisoformat(holiday["date"]["iso"][:10]).toordinal(),
+                        file_id,
+                        offset,
+                        len(line),
+                    )
+                )
+                offset += len(line)
+
+    records.sort()
+    file_table = json.dumps(files).encode()
+
+    with AtomicFileWriter(path=index_path, binary=True) as writer:
+        writer.file.write(
+            HEADER.pack(MAGIC, len(records), HEADER.size + len(records) * RECORD.size)
+        )
+        for record in records:
+            writer.file.write(RECORD.pack(*record))
+        writer.file.write(file_table)
+
+    return len(records)
+
+
+class _Keys:
+    """Sequence view of the record keys, for bisect."""
+
+    def __init__(self, *, buffer: mmap.mmap, count: int) -> None:
+        self._buffer = buffer
+        self._count = count
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __getitem__(self, position: int) -> bytes:
+        start = HEADER.size + position * RECORD.size
+        return self._buffer[start : start + KEY_SIZE]
+
+
+class HolidayIndex:
+    """
+    Memory-mapped index of the output files, answering point and range
+    queries by bisection without parsing the files.
+    """
+
+    def __init__(self, *, output_dir: str, index_path: str | None = None) -> None:
+        self.output_dir = output_dir
+        index_path = index_path or os.path.join(output_dir, INDEX_FILE_NAME)
+
+        try:
+            with open(index_path, "rb") as file:
+                self._buffer = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError) as e:
+            raise IndexException(f"Cannot open index {index_path}: {e}")
+
+        magic, self._count, files_offset = HEADER.unpack_from(self._buffer)
+        if magic != MAGIC:
+            raise IndexException(f"{index_path} is not a holiday index")
+
+        self._files = json.loads(self._buffer[files_offset:])
+        self._keys = _Keys(buffer=self._buffer, count=self._count)
+        self._open_files: dict[int, Any] = {}
+
+    def __len__(self) -> int:
+        return self._count
+
+    def is_holiday(self, *, country: str, day: date) -> bool:
+        start, end = self._bounds(country=country, start=day, end=day)
+
+        return end > start
+
+    def lookup(self, *, country: str, day: date) -> list[dict]:
+        return self.range(country=country, start=day, end=day)
+
+    def range(self, *, country: str, start: date, end: date) -> list[dict]:
+        """Return the holidays of ``country`` between ``start`` and ``end``."""
+        first, last = self._bounds(country=country, start=start, end=end)
+        holidays = []
+        seen_lines = set()
+
+        for position in range(first, last):
+            _, _, file_id, offset, length = RECORD.unpack_from(
+                self._buffer, HEADER.size + position * RECORD.size
+            )
+            line = self._read_line(file_id=file_id, offset=offset, length=length)
+            # The same holiday can be in several overlapping output files
+            if line not in seen_lines:
+                seen_lines.add(line)
+                holidays.append(json.loads(line))
+
+        return holidays
+
+    def close(self) -> None:
+        for file in self._open_files.values():
+            file.close()
+        self._buffer.close()
+
+    def _bounds(self, *, country: str, start: date, end: date) -> tuple[int, int]:
+        encoded_country = _encode_country(country=country)
+
+        return (
+            bisect.bisect_left(
+                self._keys, _get_key(country=encoded_country, day=start)
+            ),
+            bisect.bisect_right(self._keys, _get_key(country=encoded_country, day=end)),
+        )
+
+    def _read_line(self, *, file_id: int, offset: int, length: int) -> bytes:
+        if file_id not in self._open_files:
+            file_name, size = self._files[file_id]
+            file_path = os.path.join(self.output_dir, file_name)
+            if not os.path.exists(file_path) or os.path.getsize(file_path) != size:
+                raise IndexException(f"{file_path} changed, rebuild the index")
+
+            with open(file_path, "rb") as file:
+                self._open_files[file_id] = mmap.mmap(
+                    file.fileno(), 0, access=mmap.ACCESS_READ
+                )
+
+        return self._open_files[file_id][offset : offset + length]
+
+
+def _encode_country(*, country: str) -> bytes:
+    encoded_country = str(country).lower().encode()
+    if len(encoded_country) != 2:
+        raise IndexException(f"Cannot index country {country}")
+
+    return encoded_country
+
+
+def _get_key(*, country: bytes, day: date) -> bytes:
+    return country + day.toordinal().to_bytes(4, "big")
+
+
+if __name__ == "__main__":
+    import config
+
+    parser = argparse.ArgumentParser(
+        description="Build or query the holiday index of the output directory."
+    )
+    parser.add_argument(
+        "--output_dir", default=config.OUTPUT_DIR, help="the output directory"
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    subparsers.add_parser("build", help="index the output files")
+    lookup_parser = subparsers.add_parser("lookup", help="find holidays")
+    lookup_parser.add_argument("--country", required=True, help="the country code")
+    lookup_parser.add_argument(
+        "--date", type=date.fromisoformat, required=True, help="YYYY-MM-DD"
+    )
+    lookup_parser.add_argument(
+        "--end_date",
+        type=date.fromisoformat,
+        help="YYYY-MM-DD, look up the range from --date to this date",
+    )
+    args = parser.parse_args()
+
+    if args.command == "build":
+        count = build_index(output_dir=args.output_dir)
+        print(f"Indexed {count} holidays")
+    else:
+        index = HolidayIndex(output_dir=args.output_dir)
+        for holiday in index.range(
+            country=args.country, start=args.date, end=args.end_date or args.date
+        ):
+            print(json.dumps(holiday))
+        index.close()
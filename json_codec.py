@@ -0,0 +1,43 @@
+import json
+from typing import Any
+
+from logger import logger
+
+
+def _import_orjson() -> Any:
+    # Imported on demand, orjson is only needed by fast codecs
+    try:
+        import orjson
+    except ImportError:  # pragma: no cover - depends on the environment
+        return None
+
+    return orjson
+
+
+class JsonCodec:
+    """
+    JSON decoding and encoding with an optional orjson backend.
+
+    The standard library is used unless ``fast`` is set and orjson is
+    installed. orjson output is compact and not ASCII-escaped, so the lines
+    it writes differ from the default ``json.dumps`` output byte for byte.
+    """
+
+    def __init__(self, *, fast: bool = False) -> None:
+        self._orjson = _import_orjson() if fast else None
+        if fast and self._orjson is None:
+            logger.warning("orjson is not installed, using the json module")
+
+        self.fast = self._orjson is not None
+
+    def loads(self, data: bytes | str) -> Any:
+        if self.fast:
+            return self._orjson.loads(data)
+
+        return json.loads(data)
+
+    def dumps(self, obj: Any) -> str:
+        if self.fast:
+            return self._orjson.dumps(obj).decode()
+
+        return json.dumps(obj)
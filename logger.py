@@ -1,9 +1,169 @@
+import atexit
+import json
 import logging
+import threading
+import time
+from typing import Any, Callable
 
+TEXT = "text"
+JSON = "json"
+LOG_FORMATS = (TEXT, JSON)
+# Fields passed with ``extra=`` that structured records carry
+RECORD_FIELDS = ("country", "period", "granularity", "status", "latency", "path")
+
+# Until ``setup_logging``, records follow the level and handlers of the root
+# logger, as for any library
 logger = logging.getLogger(__name__)
-logger.setLevel(logging.DEBUG)
 
 console_handler = logging.StreamHandler()
 console_handler.setLevel(logging.INFO)
 
-logger.addHandler(console_handler)
+# The queue handler of the logger and the thread writing its records
+_listener: Any = None
+_queue_handler: logging.Handler | None = None
+_lock = threading.Lock()
+
+
+class JsonFormatter(logging.Formatter):
+    """
+    Format a record as one JSON object per line, with its time, level,
+    message and the ``RECORD_FIELDS`` it was given.
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": self.formatTime(record),
+            "level": record.levelname,
+            "message": record.getMessage(),
+        }
+        for field in RECORD_FIELDS:
+            value = getattr(record, field, None)
+            if value is not None:
+                entry[field] = value
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+
+        return json.dumps(entry, default=str)
+
+
+class RateLimitFilter(logging.Filter):
+    """
+    Let through at most ``rate`` records per second, in bursts of up to
+    ``burst``, of the levels up to ``level``. Records of higher levels always
+    pass, and the dropped ones are counted in ``dropped``.
+    """
+
+    def __init__(
+        self,
+        *,
+        rate: float,
+        burst: int = 10,
+        level: int = logging.DEBUG,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        super().__init__()
+        self.rate = rate
+        self.burst = burst
+        self.level = level
+        self.dropped = 0
+        self._clock = clock
+        self._tokens = float(burst)
+        self._updated_at = clock()
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno > self.level:
+            return True
+
+        with self._lock:
+            now = self._clock()
+            self._tokens = min(
+                self.burst, self._tokens + (now - self._updated_at) * self.rate
+            )
+            self._updated_at = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return True
+
+            self.dropped += 1
+            return False
+
+
+def setup_logging(
+    *,
+    level: str | int | None = None,
+    log_format: str | None = None,
+    debug_rate: float | None = None,
+) -> None:
+    """
+    Print log records to the console, called by the command line entry points.
+
+    Records are put on a queue and written by a background thread, so that
+    logging never blocks on the console. ``level``, ``log_format`` (``text``
+    or ``json``) and ``debug_rate`` (debug records per second, 0 for no
+    limit) default to ``LOG_LEVEL``, ``LOG_FORMAT`` and ``LOG_DEBUG_RATE``.
+    Calling it again replaces the previous setup.
+    """
+    global _listener, _queue_handler
+    from logging.handlers import QueueListener
+
+    import config
+
+    level = level or config.LOG_LEVEL
+    log_format = log_format or config.LOG_FORMAT
+    debug_rate = config.LOG_DEBUG_RATE if debug_rate is None else debug_rate
+    if log_format not in LOG_FORMATS:
+        raise ValueError(f"Unknown log format {log_format!r}")
+
+    with _lock:
+        _stop_listener()
+
+        console_handler.setLevel(level)
+        console_handler.setFormatter(
+            JsonFormatter() if log_format == JSON else logging.Formatter()
+        )
+
+        _queue_handler = _get_queue_handler()
+        if debug_rate:
+            # Dropped before they are queued
+            _queue_handler.addFilter(RateLimitFilter(rate=debug_rate))
+        # Disabled levels are dropped before a record is even created
+        logger.setLevel(level)
+        logger.addHandler(_queue_handler)
+        _listener = QueueListener(
+            _queue_handler.queue, console_handler, respect_handler_level=True
+        )
+        _listener.start()
+
+
+def stop_logging() -> None:
+    """Write the queued records and detach the console, e.g. before exiting."""
+    with _lock:
+        _stop_listener()
+        logger.setLevel(logging.NOTSET)
+
+
+def _get_queue_handler() -> logging.Handler:
+    import queue
+    from logging.handlers import QueueHandler
+
+    class RecordQueueHandler(QueueHandler):
+        # ``QueueHandler.prepare`` formats the message in the logging thread,
+        # the records are queued as they are and formatted by the listener
+        def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+            return record
+
+    return RecordQueueHandler(queue.SimpleQueue())
+
+
+def _stop_listener() -> None:
+    global _listener, _queue_handler
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+    if _queue_handler is not None:
+        logger.removeHandler(_queue_handler)
+        _queue_handler = None
+
+
+atexit.register(stop_logging)
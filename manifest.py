@@ -0,0 +1,152 @@
+import json
+import os
+import time
+from datetime import date, timedelta
+
+from writer import AtomicFileWriter
+
+MANIFEST_FILE_NAME = ".calendarific-manifest.json"
+
+Interval = tuple[date, date]
+# An interval with the time its holidays were fetched
+TimedInterval = tuple[date, date, float]
+
+
+class Manifest:
+    """
+    Journal of the date intervals already written per country.
+
+    Stored next to the output files as ``{country: {"file": name,
+    "intervals": [[start, end, fetched_at], ...]}}`` and saved after every
+    country, so an interrupted run can be resumed.
+    """
+
+    def __init__(self, *, output_dir: str, max_age: float) -> None:
+        self.path = os.path.join(output_dir, MANIFEST_FILE_NAME)
+        self.output_dir = output_dir
+        self.max_age = max_age
+        self.entries: dict[str, dict] = {}
+
+        if os.path.exists(self.path):
+            with open(self.path) as file:
+                self.entries = json.load(file)
+
+    def get_file_path(self, *, country: str) -> str | None:
+        entry = self.entries.get(country)
+        if entry is None or entry["file"] is None:
+            return None
+
+        return os.path.join(self.output_dir, entry["file"])
+
+    def get_intervals(self, *, country: str) -> list[TimedInterval]:
+        """
+        Return all the intervals whose holidays are in the country file, also
+        the stale ones and those outside the range of the current run.
+        """
+        entry = self.entries.get(country)
+        file_path = self.get_file_path(country=country)
+        if entry is None or (file_path is not None and not os.path.exists(file_path)):
+            return []
+
+        return sorted(
+            (date.fromisoformat(start), date.fromisoformat(end), fetched_at)
+            for start, end, fetched_at in entry["intervals"]
+        )
+
+    def get_covered_intervals(
+        self, *, country: str, start: date, end: date
+    ) -> list[TimedInterval]:
+        """
+        Return the fresh intervals between ``start`` and ``end`` whose
+        holidays are in the country file, clipped to that range.
+        """
+        now = time.time()
+        current_year = date.today().year
+        covered = []
+
+        for covered_start, covered_end, fetched_at in self.get_intervals(
+            country=country
+        ):
+            covered_start = max(start, covered_start)
+            covered_end = min(end, covered_end)
+            # Holidays of past years do not change
+            is_fresh = (
+                self.max_age <= 0
+                or covered_end.year < current_year
+                or now - fetched_at <= self.max_age
+            )
+            if covered_start <= covered_end and is_fresh:
+                covered.append((covered_start, covered_end, fetched_at))
+
+        return sorted(covered)
+
+    def get_missing_intervals(
+        self, *, country: str, start: date, end: date
+    ) -> list[Interval]:
+        missing = []
+        cursor = start
+
+        for covered_start, covered_end, _ in self.get_covered_intervals(
+            country=country, start=start, end=end
+        ):
+            if covered_start > cursor:
+                missing.append((cursor, covered_start - timedelta(days=1)))
+            cursor = max(cursor, covered_end + timedelta(days=1))
+
+        if cursor <= end:
+            missing.append((cursor, end))
+
+        return missing
+
+    def record(
+        self, *, country: str, file_name: str | None, intervals: list[TimedInterval]
+    ) -> None:
+        """Replace the country entry and save the manifest."""
+        self.entries[country] = {
+            "file": file_name,
+            "intervals": [
+                [start.isoformat(), end.isoformat(), fetched_at]
+                for start, end, fetched_at in merge_intervals(intervals=intervals)
+            ],
+        }
+
+        with AtomicFileWriter(path=self.path) as writer:
+            writer.write_lines([json.dumps(self.entries, indent=2)])
+
+
+def merge_intervals(*, intervals: list[TimedInterval]) -> list[TimedInterval]:
+    """Sort intervals and merge adjacent ones fetched at the same time."""
+    merged: list[TimedInterval] = []
+
+    for start, end, fetched_at in sorted(intervals):
+        if (
+            merged
+            and merged[-1][2] == fetched_at
+            and start <= merged[-1][1] + timedelta(days=1)
+        ):
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end), fetched_at)
+        else:
+            merged.append((start, end, fetched_at))
+
+    return merged
+
+
+def subtract_intervals(
+    *, intervals: list[TimedInterval], removed: list[Interval]
+) -> list[TimedInterval]:
+    """Return the parts of ``intervals`` outside all the ``removed`` ones."""
+    remaining = list(intervals)
+
+    for removed_start, removed_end in removed:
+        parts = []
+        for start, end, fetched_at in remaining:
+            if end < removed_start or start > removed_end:
+                parts.append((start, end, fetched_at))
+                continue
+            if start < removed_start:
+                parts.append((start, removed_start - timedelta(days=1), fetched_at))
+            if end > removed_end:
+                parts.append((removed_end + timedelta(days=1), end, fetched_at))
+        remaining = parts
+
+    return sorted(remaining)
@@ -0,0 +1,150 @@
+import json
+import threading
+import time
+from contextlib import contextmanager
+from typing import Iterator
+
+PREFIX = "calendarific_"
+# Upper bounds in seconds of the duration histogram buckets
+DURATION_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+Labels = tuple[tuple[str, str], ...]
+
+
+class Histogram:
+    def __init__(self, *, buckets: tuple[float, ...]) -> None:
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.count += 1
+        self.sum += value
+        for position, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[position] += 1
+                break
+
+
+class Metrics:
+    """
+    Thread-safe counters and duration histograms of a client run.
+
+    Exported as JSON with ``to_dict`` or in the Prometheus text format with
+    ``to_prometheus``. Names are given without the ``calendarific_`` prefix.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._counters: dict[str, dict[Labels, float]] = {}
+        self._histograms: dict[str, dict[Labels, Histogram]] = {}
+
+    def increment(self, name: str, *, value: float = 1, **labels: str) -> None:
+        key = _get_labels(labels=labels)
+        with self._lock:
+            counter = self._counters.setdefault(name, {})
+            counter[key] = counter.get(key, 0) + value
+
+    def observe(self, name: str, *, value: float, **labels: str) -> None:
+        key = _get_labels(labels=labels)
+        with self._lock:
+            histograms = self._histograms.setdefault(name, {})
+            if key not in histograms:
+                histograms[key] = Histogram(buckets=DURATION_BUCKETS)
+            histograms[key].observe(value)
+
+    @contextmanager
+    def time(self, name: str, **labels: str) -> Iterator[None]:
+        started_at = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, value=time.perf_counter() - started_at, **labels)
+
+    def get_counter(self, name: str, **labels: str) -> float:
+        """Return the counter total over every label set matching ``labels``."""
+        with self._lock:
+            return sum(
+                value
+                for key, value in self._counters.get(name, {}).items()
+                if set(labels.items()) <= set(key)
+            )
+
+    def get_cache_hit_ratio(self) -> float | None:
+        hits = self.get_counter("cache_hits_total")
+        lookups = hits + self.get_counter("cache_misses_total")
+
+        return hits / lookups if lookups else None
+
+    def to_dict(self) -> dict:
+        with self._lock:
+            data = {
+                "counters": {
+                    name: [
+                        {"labels": dict(key), "value": value}
+                        for key, value in values.items()
+                    ]
+                    for name, values in self._counters.items()
+                },
+                "histograms": {
+                    name: [
+                        {
+                            "labels": dict(key),
+                            "count": histogram.count,
+                            "sum": histogram.sum,
+                            "buckets": dict(zip(histogram.buckets, histogram.counts)),
+                        }
+                        for key, histogram in values.items()
+                    ]
+                    for name, values in self._histograms.items()
+                },
+            }
+        data["cache_hit_ratio"] = self.get_cache_hit_ratio()
+
+        return data
+
+    def to_json(self) -> str:
+        return json.dumps(self.to_dict(), indent=2)
+
+    def to_prometheus(self) -> str:
+        lines = []
+
+        with self._lock:
+            for name, values in sorted(self._counters.items()):
+                lines.append(f"# TYPE {PREFIX}{name} counter")
+                for key, value in values.items():
+                    lines.append(f"{PREFIX}{name}{_format_labels(labels=key)} {value}")
+
+            for name, values in sorted(self._histograms.items()):
+                lines.append(f"# TYPE {PREFIX}{name} histogram")
+                for key, histogram in values.items():
+                    cumulative = 0
+                    for bound, count in zip(histogram.buckets, histogram.counts):
+                        cumulative += count
+                        bucket_labels = _format_labels(
+                            labels=key + (("le", str(bound)),)
+                        )
+                        lines.append(
+                            f"{PREFIX}{name}_bucket{bucket_labels} {cumulative}"
+                        )
+                    bucket_labels = _format_labels(labels=key + (("le", "+Inf"),))
+                    lines.append(
+                        f"{PREFIX}{name}_bucket{bucket_labels} {histogram.count}"
+                    )
+                    labels = _format_labels(labels=key)
+                    lines.append(f"{PREFIX}{name}_sum{labels} {histogram.sum}")
+                    lines.append(f"{PREFIX}{name}_count{labels} {histogram.count}")
+
+        return "\n".join(lines) + "\n"
+
+
+def _get_labels(*, labels: dict[str, str]) -> Labels:
+    return tuple(sorted((name, str(value)) for name, value in labels.items()))
+
+
+def _format_labels(*, labels: Labels) -> str:
+    if not labels:
+        return ""
+
+    return "{" + ",".join(f'{name}="{value}"' for name, value in labels) + "}"
@@ -1,13 +1,9 @@
 from dataclasses import dataclass
-from datetime import datetime
-from datetime import timedelta
+from datetime import date, datetime
 from typing import Any
 
 from custom_exceptions import InvalidInputData
-
-# Arbitrary limits to avoid making too many requests
-DAY_LIMIT = 3
-MONTH_LIMIT_IN_DAYS = 90
+from planner import AUTO, plan_periods
 
 
 @dataclass
@@ -31,6 +27,9 @@ class Country:
 
         self.value = self.value.upper()
 
+    def __str__(self) -> str:
+        return self.value
+
     @staticmethod
     def _is_valid_iso_3166_code(*, code: str) -> bool:
         """
@@ -100,33 +99,40 @@ class CalendarParams:
         if self.start_date.date > self.end_date.date:
             raise InvalidInputData("Start date must be before end date")
 
-    def generate_params(self) -> list[dict[str, Any]]:
-        params_list = []
-        seen_params = set()
-        start_date = self.start_date.date
-        end_date = self.end_date.date
-        days_diff: int = (end_date - start_date).days
-
+    @classmethod
+    def from_dates(
+        cls, *, countries: list[str], start_date: date, end_date: date
+    ) -> "CalendarParams":
+        return cls(
+            countries=[Country(value=country) for country in countries],
+            start_date=StartDate(
+                year=Year(value=start_date.year),
+                month=Month(value=start_date.month),
+                day=Day(value=start_date.day),
+            ),
+            end_date=EndDate(
+                year=Year(value=end_date.year),
+                month=Month(value=end_date.month),
+                day=Day(value=end_date.day),
+            ),
+        )
+
+    def generate_params(self, *, strategy: str = AUTO) -> list[dict[str, Any]]:
+        periods = plan_periods(
+            start_date=self.start_date.date,
+            end_date=self.end_date.date,
+            strategy=strategy,
+        )
+        countries: list[Country] = []
         for country in self.countries:
-            current_date = start_date
-            while current_date <= end_date:
-                country_params = {
-                    "country": country,
-                    "year": current_date.year,
-                    "month": current_date.month
-                    if days_diff <= MONTH_LIMIT_IN_DAYS
-                    else None,
-                    "day": current_date.day if days_diff <= DAY_LIMIT else None,
-                }
-
-                param_str = str(country_params)
-                if param_str not in seen_params:
-                    params_list.append(country_params)
-                    seen_params.add(param_str)
-
-                current_date += timedelta(days=1)
-
-        return params_list
+            if country not in countries:
+                countries.append(country)
+
+        return [
+            {"country": country, **period}
+            for country in countries
+            for period in periods
+        ]
 
     def get_input_data(self) -> dict[str, Any]:
         return {
@@ -0,0 +1,213 @@
+import gzip
+import json
+import os
+from concurrent.futures import Executor, Future
+from datetime import date
+from typing import Any, Iterable, Iterator
+
+from custom_exceptions import ClientException
+from logger import logger
+from writer import AtomicFileWriter, ContentHashes
+
+FLAT = "flat"
+PARTITIONED = "partitioned"
+LAYOUTS = (FLAT, PARTITIONED)
+
+NONE = "none"
+GZIP = "gzip"
+ZSTD = "zstd"
+COMPRESSIONS = (NONE, GZIP, ZSTD)
+EXTENSIONS = {NONE: ".jsonl", GZIP: ".jsonl.gz", ZSTD: ".jsonl.zst"}
+
+
+def resolve_compression(*, compression: str) -> str:
+    """
+    Return the compression that will actually be used.
+
+    zstd needs the zstandard package and falls back to gzip when it is not
+    installed.
+    """
+    if compression not in COMPRESSIONS:
+        raise ClientException(f"Compression must be one of {', '.join(COMPRESSIONS)}")
+
+    if compression == ZSTD and _import_zstandard() is None:
+        logger.warning("zstandard is not installed, using %s instead", GZIP)
+        return GZIP
+
+    return compression
+
+
+def get_partition_path(
+    *, output_dir: str, country: str, year: int, compression: str
+) -> str:
+    return os.path.join(
+        output_dir, country.lower(), f"{year:04d}{EXTENSIONS[compression]}"
+    )
+
+
+def find_partition(*, output_dir: str, country: str, year: int) -> str | None:
+    """Return the path of the partition of ``year``, whatever its compression."""
+    for compression in COMPRESSIONS:
+        path = get_partition_path(
+            output_dir=output_dir, country=country, year=year, compression=compression
+        )
+        if os.path.exists(path):
+            return path
+
+    return None
+
+
+def read_partition_lines(*, path: str) -> list[str]:
+    with open(path, "rb") as file:
+        data = file.read()
+
+    if path.endswith(EXTENSIONS[GZIP]):
+        data = gzip.decompress(data)
+    elif path.endswith(EXTENSIONS[ZSTD]):
+        data = _import_zstandard().ZstdDecompressor().decompress(data)
+
+    return data.decode().splitlines(keepends=True)
+
+
+def read_partitions(
+    *, output_dir: str, country: str, start_date: date, end_date: date
+) -> Iterator[dict[str, Any]]:
+    """
+    Yield the holidays of ``country`` between the dates, in date order.
+
+    Only the partitions of the years in the range are opened.
+    """
+    start, end = start_date.isoformat(), end_date.isoformat()
+
+    for year in range(start_date.year, end_date.year + 1):
+        path = find_partition(output_dir=output_dir, country=country, year=year)
+        if path is None:
+            continue
+
+        is_whole_year = start <= f"{year:04d}-01-01" and f"{year:04d}-12-31" <= end
+        for line in read_partition_lines(path=path):
+            holiday = json.loads(line)
+            if is_whole_year or start <= holiday["date"]["iso"][:10] <= end:
+                yield holiday
+
+
+class PartitionWriter:
+    """
+    Write the holidays of one country to one file per year, e.g.
+    ``us/1992.jsonl.gz``.
+
+    Lines are added in date order. Each year is compressed and written by
+    ``executor`` once the next year starts, so fetching continues meanwhile.
+    Lines of a partition outside ``bounds`` (ISO dates) are kept, so runs over
+    different ranges fill the same partitions. With ``hashes``, partitions
+    whose content did not change are not rewritten and counted in
+    ``unchanged``.
+    """
+
+    def __init__(
+        self,
+        *,
+        output_dir: str,
+        country: str,
+        compression: str,
+        bounds: tuple[str, str],
+        executor: Executor,
+        hashes: ContentHashes | None = None,
+    ) -> None:
+        self.output_dir = output_dir
+        self.country = country.lower()
+        self.compression = compression
+        self.bounds = bounds
+        self.executor = executor
+        self.hashes = hashes
+        self.unchanged = 0
+        self._year: int | None = None
+        self._lines: list[tuple[str, str]] = []
+        self._futures: dict[int, Future] = {}
+
+    def add(self, *, lines: Iterable[tuple[str, str]]) -> None:
+        """Add ``(iso_date, line)`` pairs."""
+        for iso_date, line in lines:
+            year = int(iso_date[:4])
+            if year != self._year:
+                self._flush()
+                self._year = year
+            self._lines.append((iso_date, line))
+
+    def close(self) -> list[str]:
+        """Write the remaining partitions and return their paths once written."""
+        self._flush()
+        # Years without holidays in range may hold stale ones from a previous run
+        for year in range(int(self.bounds[0][:4]), int(self.bounds[1][:4]) + 1):
+            if year not in self._futures and self._find(year=year) is not None:
+                self._submit(year=year, lines=[])
+
+        paths = [future.result() for future in self._futures.values()]
+
+        return [path for path in paths if path is not None]
+
+    def _flush(self) -> None:
+        if self._year is not None:
+            self._submit(year=self._year, lines=self._lines)
+        self._year = None
+        self._lines = []
+
+    def _submit(self, *, year: int, lines: list[tuple[str, str]]) -> None:
+        previous = self._futures.get(year)
+        if previous is not None:
+            previous.result()
+
+        self._futures[year] = self.executor.submit(self._write, year=year, lines=lines)
+
+    def _find(self, *, year: int) -> str | None:
+        return find_partition(
+            output_dir=self.output_dir, country=self.country, year=year
+        )
+
+    def _write(self, *, year: int, lines: list[tuple[str, str]]) -> str | None:
+        path = get_partition_path(
+            output_dir=self.output_dir,
+            country=self.country,
+            year=year,
+            compression=self.compression,
+        )
+        previous_path = self._find(year=year)
+        if previous_path is not None:
+            start, end = self.bounds
+            for line in read_partition_lines(path=previous_path):
+                iso_date = json.loads(line)["date"]["iso"][:10]
+                if not start <= iso_date <= end:
+                    lines.append((iso_date, line))
+            lines.sort(key=lambda line: line[0])
+
+        if not lines:
+            if previous_path is not None:
+                os.remove(previous_path)
+            return None
+
+        data = "".join(line for _, line in lines).encode()
+        if self.compression == GZIP:
+            # No timestamp in the header, so that the same lines give the same file
+            data = gzip.compress(data, compresslevel=6, mtime=0)
+        elif self.compression == ZSTD:
+            data = _import_zstandard().ZstdCompressor().compress(data)
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with AtomicFileWriter(path=path, binary=True, hashes=self.hashes) as writer:
+            writer.write(data)
+        if not writer.changed:
+            self.unchanged += 1
+        # A partition written with another compression is replaced
+        if previous_path is not None and previous_path != path:
+            os.remove(previous_path)
+
+        return path
+
+
+def _import_zstandard() -> Any:
+    try:
+        import zstandard
+    except ImportError:  # pragma: no cover - depends on the environment
+        return None
+
+    return zstandard
@@ -0,0 +1,102 @@
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import Any
+
+from cache import get_granularity
+from custom_exceptions import InvalidInputData
+
+# Arbitrary limits to avoid making too many requests
+DAY_LIMIT = 3
+MONTH_LIMIT_IN_DAYS = 90
+
+# Granularity picked from the length of the whole range (day, month or year)
+AUTO = "auto"
+# Fewest API calls per calendar year, then the smallest responses
+MIN_CALLS = "min_calls"
+STRATEGIES = (AUTO, MIN_CALLS)
+
+Period = dict[str, int | None]
+
+
+def plan_periods(
+    *, start_date: datetime, end_date: datetime, strategy: str = AUTO
+) -> list[Period]:
+    """
+    Split the range into the periods that have to be requested from the API.
+
+    The work is proportional to the number of periods returned, not to the
+    number of days in the range.
+
+    :param start_date: The first day of the range.
+    :param end_date: The last day of the range.
+    :param strategy: ``AUTO`` or ``MIN_CALLS``.
+    :return: Periods as dicts with ``year``, ``month`` and ``day`` keys.
+    """
+    if strategy == AUTO:
+        return _plan_auto(start_date=start_date, end_date=end_date)
+    if strategy == MIN_CALLS:
+        return _plan_min_calls(start_date=start_date, end_date=end_date)
+
+    raise InvalidInputData(f"Plan strategy must be one of {', '.join(STRATEGIES)}")
+
+
+def summarize_plan(*, params: list[dict[str, Any]]) -> dict[str, int]:
+    granularities = Counter(get_granularity(params=item) for item in params)
+
+    return {
+        "requests": len(params),
+        "year": granularities["year"],
+        "month": granularities["month"],
+        "day": granularities["day"],
+    }
+
+
+def _plan_auto(*, start_date: datetime, end_date: datetime) -> list[Period]:
+    days_diff = (end_date - start_date).days
+
+    if days_diff <= DAY_LIMIT:
+        return [
+            _day_period(date=start_date + timedelta(days=offset))
+            for offset in range(days_diff + 1)
+        ]
+    if days_diff <= MONTH_LIMIT_IN_DAYS:
+        return [
+            {"year": year, "month": month, "day": None}
+            for year, month in _iter_months(start_date=start_date, end_date=end_date)
+        ]
+
+    return [
+        {"year": year, "month": None, "day": None}
+        for year in range(start_date.year, end_date.year + 1)
+    ]
+
+
+def _plan_min_calls(*, start_date: datetime, end_date: datetime) -> list[Period]:
+    # Every calendar year costs at most one (year) request. A narrower request
+    # is only used when it is also a single call: one day or one month.
+    periods = []
+
+    for year in range(start_date.year, end_date.year + 1):
+        segment_start = max(start_date, datetime(year, 1, 1))
+        segment_end = min(end_date, datetime(year, 12, 31))
+
+        if segment_start == segment_end:
+            periods.append(_day_period(date=segment_start))
+        elif segment_start.month == segment_end.month:
+            periods.append({"year": year, "month": segment_start.month, "day": None})
+        else:
+            periods.append({"year": year, "month": None, "day": None})
+
+    return periods
+
+
+def _day_period(*, date: datetime) -> Period:
+    return {"year": date.year, "month": date.month, "day": date.day}
+
+
+def _iter_months(*, start_date: datetime, end_date: datetime):
+    year, month = start_date.year, start_date.month
+
+    while (year, month) <= (end_date.year, end_date.month):
+        yield year, month
+        year, month = (year + 1, 1) if month == 12 else (year, month + 1)
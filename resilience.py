@@ -0,0 +1,232 @@
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Callable
+
+from custom_exceptions import DeadlineException
+from logger import logger
+from metrics import Metrics
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class LatencyTracker:
+    """Recent response latencies, to derive the hedging delay from."""
+
+    def __init__(self, *, size: int = 500) -> None:
+        self._latencies: deque[float] = deque(maxlen=size)
+        self._lock = threading.Lock()
+
+    def observe(self, latency: float) -> None:
+        with self._lock:
+            self._latencies.append(latency)
+
+    def get_percentile(self, share: float) -> float | None:
+        with self._lock:
+            ordered = sorted(self._latencies)
+        if not ordered:
+            return None
+
+        return ordered[min(len(ordered) - 1, int(share * len(ordered)))]
+
+    def __len__(self) -> int:
+        return len(self._latencies)
+
+
+def get_max_workers(*, max_concurrency: int) -> int:
+    """
+    Workers for ``max_concurrency`` requests in flight, each of which may run
+    a duplicate, and may leave its slower attempt running once answered.
+    """
+    return max(1, max_concurrency) * 2
+
+
+class Hedger:
+    """
+    Send a request and, when it is slow, a duplicate of it.
+
+    The duplicate is sent once the first attempt has taken longer than the
+    ``percentile`` of recent latencies (``delay`` until ``min_samples`` are
+    known). The first response wins, the other one is ignored. Requests are
+    sent from worker threads, so waiting for them can also stop at a
+    deadline even when a socket hangs.
+
+    :param enabled: Send duplicates, otherwise only enforce deadlines.
+    :param max_workers: Attempts running at once. A request waiting for a
+        free worker is still on the clock of its deadline, so this should
+        be twice the requests in flight, see ``get_max_workers``.
+    """
+
+    def __init__(
+        self,
+        *,
+        enabled: bool = True,
+        delay: float = 1.0,
+        percentile: float = 0.95,
+        min_samples: int = 20,
+        max_workers: int = 32,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.enabled = enabled
+        self.delay = delay
+        self.percentile = percentile
+        self.min_samples = min_samples
+        self.latencies = LatencyTracker()
+        self._max_workers = max_workers
+        self._clock = clock
+        self._executor: ThreadPoolExecutor | None = None
+        self._lock = threading.Lock()
+
+    def get_delay(self) -> float:
+        if len(self.latencies) < self.min_samples:
+            return self.delay
+
+        return self.latencies.get_percentile(self.percentile)
+
+    def send(
+        self,
+        *,
+        send: Callable[[], Any],
+        deadline_at: float | None = None,
+        metrics: Metrics | None = None,
+    ) -> Any:
+        """
+        Return the first response of ``send``, called once or twice.
+
+        :param deadline_at: Time on the hedger clock after which waiting stops
+            with ``DeadlineException``.
+        """
+        metrics = metrics or Metrics()
+        if not self.enabled and deadline_at is None:
+            return self._timed(send=send)
+
+        executor = self._get_executor()
+        attempts = [executor.submit(self._timed, send=send)]
+
+        if self.enabled:
+            delay = self._get_timeout(delay=self.get_delay(), deadline_at=deadline_at)
+            done, _ = wait(attempts, timeout=delay)
+            if not done and not self._is_past(deadline_at=deadline_at):
+                attempts.append(executor.submit(self._timed, send=send))
+                metrics.increment("hedged_requests_total")
+
+        pending = set(attempts)
+        error: BaseException | None = None
+        while pending:
+            done, pending = wait(
+                pending,
+                timeout=self._get_timeout(delay=None, deadline_at=deadline_at),
+                return_when=FIRST_COMPLETED,
+            )
+            if not done:
+                raise DeadlineException("Error: no response before the deadline")
+
+            for attempt in _in_order(attempts=attempts, done=done):
+                if attempt.exception() is None:
+                    if attempt is not attempts[0]:
+                        metrics.increment("hedge_wins_total")
+                    return attempt.result()
+                error = error or attempt.exception()
+
+        raise error
+
+    def close(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def _timed(self, *, send: Callable[[], Any]) -> Any:
+        started_at = self._clock()
+        response = send()
+        self.latencies.observe(self._clock() - started_at)
+
+        return response
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self._max_workers, thread_name_prefix="hedger"
+                )
+
+        return self._executor
+
+    def _get_timeout(
+        self, *, delay: float | None, deadline_at: float | None
+    ) -> float | None:
+        if deadline_at is None:
+            return delay
+
+        remaining = max(0.0, deadline_at - self._clock())
+
+        return remaining if delay is None else min(delay, remaining)
+
+    def _is_past(self, *, deadline_at: float | None) -> bool:
+        return deadline_at is not None and self._clock() >= deadline_at
+
+
+class CircuitBreaker:
+    """
+    Stop sending requests while the upstream keeps failing.
+
+    After ``failure_threshold`` failures in a row the circuit opens and
+    requests fail fast. After ``reset_timeout`` seconds one trial request is
+    let through (half open). Its success closes the circuit, its failure
+    opens it again.
+    """
+
+    def __init__(
+        self,
+        *,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._clock = clock
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self.state == CLOSED:
+                return True
+            if self.state == OPEN and (
+                self._clock() - self._opened_at >= self.reset_timeout
+            ):
+                self.state = HALF_OPEN
+                return True
+
+            return False
+
+    def record(self, *, failed: bool) -> bool:
+        """Record the outcome of a request, return whether the circuit opened."""
+        with self._lock:
+            if not failed:
+                self.state = CLOSED
+                self._failures = 0
+                return False
+
+            self._failures += 1
+            if self.state == HALF_OPEN or (
+                self.state == CLOSED and self._failures >= self.failure_threshold
+            ):
+                self.state = OPEN
+                self._opened_at = self._clock()
+                logger.warning(
+                    "Upstream failed %d times, pausing requests for %ss",
+                    self._failures,
+                    self.reset_timeout,
+                )
+                return True
+
+            return False
+
+
+def _in_order(*, attempts: list[Future], done: set[Future]) -> list[Future]:
+    return [attempt for attempt in attempts if attempt in done]
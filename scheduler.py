@@ -0,0 +1,219 @@
+import random
+import threading
+import time
+from typing import Any, Callable, Mapping
+
+from custom_exceptions import DeadlineException
+from logger import logger
+
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+# Reset headers above this value are epoch timestamps rather than delays
+EPOCH_THRESHOLD = 10**9
+
+
+class TokenBucket:
+    """Thread-safe token bucket, ``rate`` tokens per second up to ``capacity``."""
+
+    def __init__(
+        self,
+        *,
+        rate: float,
+        capacity: int,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        self.rate = rate
+        self.capacity = capacity
+        self._clock = clock
+        self._sleep = sleep
+        self._tokens = float(capacity)
+        self._updated_at = clock()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        while True:
+            with self._lock:
+                now = self._clock()
+                wait = self._paused_until - now
+
+                if wait <= 0:
+                    if self.rate <= 0:
+                        return
+
+                    self._tokens = min(
+                        self.capacity,
+                        self._tokens + (now - self._updated_at) * self.rate,
+                    )
+                    self._updated_at = now
+                    if self._tokens >= 1:
+                        self._tokens -= 1
+                        return
+
+                    wait = (1 - self._tokens) / self.rate
+
+            self._sleep(wait)
+
+    def pause(self, *, seconds: float) -> None:
+        with self._lock:
+            self._paused_until = max(self._paused_until, self._clock() + seconds)
+
+
+class AdaptiveLimiter:
+    """
+    Concurrency limit that adapts to the upstream (AIMD).
+
+    The limit grows by one after ``limit`` fast successes and is halved on
+    every error or response slower than ``latency_threshold`` seconds.
+    """
+
+    def __init__(self, *, max_concurrency: int, latency_threshold: float) -> None:
+        self.max_concurrency = max_concurrency
+        self.latency_threshold = latency_threshold
+        self.limit = max_concurrency
+        self._in_flight = 0
+        self._successes = 0
+        self._condition = threading.Condition()
+
+    def acquire(self) -> None:
+        with self._condition:
+            self._condition.wait_for(lambda: self._in_flight < self.limit)
+            self._in_flight += 1
+
+    def release(self, *, latency: float, failed: bool) -> None:
+        with self._condition:
+            self._in_flight -= 1
+
+            if failed or latency > self.latency_threshold:
+                self.limit = max(1, self.limit // 2)
+                self._successes = 0
+            else:
+                self._successes += 1
+                if self._successes >= self.limit:
+                    self.limit = min(self.max_concurrency, self.limit + 1)
+                    self._successes = 0
+
+            self._condition.notify_all()
+
+
+class RequestScheduler:
+    """
+    Send requests within the rate limit and retry throttled or failed ones.
+
+    429 and 5xx responses are retried with jittered exponential backoff, or
+    after the delay given by the ``Retry-After`` header. Rate limit headers
+    pause every request sharing the scheduler until the limit resets.
+    """
+
+    def __init__(
+        self,
+        *,
+        rate: float,
+        burst: int,
+        max_concurrency: int,
+        max_retries: int,
+        backoff_base: float,
+        backoff_max: float,
+        latency_threshold: float,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        self.bucket = TokenBucket(rate=rate, capacity=burst, clock=clock, sleep=sleep)
+        self.limiter = AdaptiveLimiter(
+            max_concurrency=max_concurrency, latency_threshold=latency_threshold
+        )
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.remaining_quota: int | None = None
+        self._clock = clock
+        self._sleep = sleep
+
+    def run(self, *, send: Callable[[], Any], deadline: float | None = None) -> Any:
+        """
+        Call ``send`` until it returns a response that should not be retried.
+
+        :param send: Sends the request and returns a response with
+            ``status_code`` and ``headers`` attributes.
+        :param deadline: Seconds after which no retry is started, raising
+            ``DeadlineException`` instead.
+        :return: The last response.
+        """
+        attempt = 0
+        deadline_at = None if not deadline else self._clock() + deadline
+
+        while True:
+            self.bucket.acquire()
+            self.limiter.acquire()
+            started_at = self._clock()
+            failed = True
+            try:
+                response = send()
+                failed = response.status_code in RETRY_STATUSES
+            finally:
+                self.limiter.release(latency=self._clock() - started_at, failed=failed)
+
+            self._update_quota(headers=response.headers)
+
+            if not failed or attempt >= self.max_retries:
+                return response
+
+            delay = self._get_retry_delay(headers=response.headers, attempt=attempt)
+            if deadline_at is not None and self._clock() + delay > deadline_at:
+                raise DeadlineException(
+                    f"Error: status {response.status_code}, no time left to retry"
+                )
+            logger.warning(
+                "Request failed with status %s, retrying in %.2fs",
+                response.status_code,
+                delay,
+                extra={"status": response.status_code},
+            )
+            if response.status_code == 429:
+                self.bucket.pause(seconds=delay)
+            self._sleep(delay)
+            attempt += 1
+
+    def _get_retry_delay(self, *, headers: Mapping[str, str], attempt: int) -> float:
+        retry_after = _parse_delay(value=headers.get("Retry-After"))
+        if retry_after is not None:
+            return retry_after
+
+        return random.uniform(
+            0, min(self.backoff_max, self.backoff_base * 2**attempt)
+        )
+
+    def _update_quota(self, *, headers: Mapping[str, str]) -> None:
+        remaining = headers.get("X-RateLimit-Remaining")
+        if remaining is None or not remaining.isdigit():
+            return
+
+        self.remaining_quota = int(remaining)
+        if self.remaining_quota > 0:
+            return
+
+        reset = _parse_delay(value=headers.get("X-RateLimit-Reset"))
+        if reset is not None:
+            logger.warning("Rate limit exhausted, pausing for %.2fs", reset)
+            self.bucket.pause(seconds=reset)
+
+
+def _parse_delay(*, value: str | None) -> float | None:
+    """Parse a delay header given in seconds, as an epoch or as an HTTP date."""
+    if not value:
+        return None
+
+    try:
+        seconds = float(value)
+    except ValueError:
+        from email.utils import parsedate_to_datetime
+
+        try:
+            return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+        except (TypeError, ValueError):
+            return None
+
+    if seconds > EPOCH_THRESHOLD:
+        return max(0.0, seconds - time.time())
+
+    return max(0.0, seconds)
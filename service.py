@@ -0,0 +1,356 @@
+import argparse
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable, Iterator, MutableMapping
+from concurrent.futures import Future
+from datetime import date
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any
+from urllib.parse import parse_qs, urlparse
+
+import config
+from cache import ResponseCache, get_cache_key
+from calendarific import (
+    CalendarificClient,
+    get_default_breaker,
+    get_default_hedger,
+    get_default_scheduler,
+    get_default_transport,
+)
+from custom_exceptions import ClientException, InvalidInputData
+from json_codec import JsonCodec
+from logger import logger, setup_logging
+from metrics import Metrics
+from parameters import CalendarParams
+from transport import redact
+
+
+class LRUCache(MutableMapping[str, Any]):
+    """
+    Thread-safe mapping holding at most ``max_entries`` items.
+
+    The least recently read or written item is evicted first. Items older
+    than ``ttl`` seconds are dropped on access, 0 keeps them until evicted.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_entries: int,
+        ttl: float = 0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._clock = clock
+        self._items: OrderedDict[str, tuple[float, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __getitem__(self, key: str) -> Any:
+        with self._lock:
+            stored_at, value = self._items[key]
+            if self.ttl and self._clock() - stored_at > self.ttl:
+                del self._items[key]
+                raise KeyError(key)
+
+            self._items.move_to_end(key)
+            return value
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        with self._lock:
+            self._items[key] = (self._clock(), value)
+            self._items.move_to_end(key)
+            while len(self._items) > self.max_entries:
+                self._items.popitem(last=False)
+
+    def __delitem__(self, key: str) -> None:
+        with self._lock:
+            del self._items[key]
+
+    def __iter__(self) -> Iterator[str]:
+        with self._lock:
+            return iter(list(self._items))
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+
+class RequestCoalescer:
+    """Runs concurrent calls with the same key once, sharing the result."""
+
+    def __init__(self) -> None:
+        self._in_flight: dict[str, Future] = {}
+        self._lock = threading.Lock()
+
+    def run(self, *, key: str, fetch: Callable[[], Any]) -> tuple[Any, bool]:
+        """
+        Return the result of ``fetch`` and whether it came from another call.
+
+        Exceptions raised by ``fetch`` are raised in every waiting call.
+        """
+        with self._lock:
+            future = self._in_flight.get(key)
+            is_leader = future is None
+            if is_leader:
+                future = self._in_flight[key] = Future()
+
+        if not is_leader:
+            return future.result(), True
+
+        try:
+            result = fetch()
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result, False
+        finally:
+            with self._lock:
+                del self._in_flight[key]
+
+
+class CoalescingClient(CalendarificClient):
+    """Client whose concurrent fetches of the same request share one call."""
+
+    def __init__(self, *, coalescer: RequestCoalescer, **kwargs: Any) -> None:
+        super().__init__(**kwargs)
+        self.coalescer = coalescer
+
+    def _get_response(self, *, params: dict) -> dict:
+        response, is_shared = self.coalescer.run(
+            key=get_cache_key(params=params),
+            fetch=lambda: super(CoalescingClient, self)._get_response(params=params),
+        )
+        if is_shared:
+            self.metrics.increment("coalesced_requests_total")
+
+        return response
+
+
+class HolidayService:
+    """
+    Answers holiday queries from memory, fetching from the API when needed.
+
+    Parsed API responses are kept in an LRU and shared by all queries, and
+    the encoded answers of recent queries in another. Identical upstream
+    requests in flight at the same time are sent once.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_entries: int = 1024,
+        ttl: float = 0,
+        concurrency: int = 8,
+        cache: ResponseCache | None = None,
+        fast_json: bool = False,
+    ) -> None:
+        self.responses = LRUCache(max_entries=max_entries, ttl=ttl)
+        self.answers = LRUCache(max_entries=max_entries, ttl=ttl)
+        self.coalescer = RequestCoalescer()
+        self.cache = cache
+        self.fast_json = fast_json
+        self.json = JsonCodec(fast=fast_json)
+        self.metrics = Metrics()
+        self.scheduler = get_default_scheduler(max_concurrency=concurrency)
+        self.transport = get_default_transport(max_connections=concurrency)
+        self.hedger = get_default_hedger(max_concurrency=concurrency)
+        self.breaker = get_default_breaker()
+
+    def query(self, *, countries: list[str], start_date: date, end_date: date) -> bytes:
+        """
+        Return the holidays of each country between the dates as JSON, e.g.
+        ``{"holidays": {"us": [...], "gb": [...]}}``.
+        """
+        key = f"{','.join(countries).lower()}|{start_date}|{end_date}"
+        answer = self.answers.get(key)
+        if answer is not None:
+            self.metrics.increment("queries_total", source="memory")
+            return answer
+
+        values = CalendarParams.from_dates(
+            countries=countries, start_date=start_date, end_date=end_date
+        )
+        client = CoalescingClient(
+            values=values,
+            coalescer=self.coalescer,
+            cache=self.cache,
+            responses=self.responses,
+            scheduler=self.scheduler,
+            transport=self.transport,
+            hedger=self.hedger,
+            breaker=self.breaker,
+            fast_json=self.fast_json,
+            metrics=self.metrics,
+        )
+        holidays = {
+            str(country).lower(): country_holidays
+            for country, country_holidays in zip(values.countries, client.get_data())
+        }
+        answer = self.json.dumps({"holidays": holidays}).encode()
+        # Answers from stale or missing data are not kept, the next query retries
+        if not client.degraded_params:
+            self.answers[key] = answer
+        self.metrics.increment("queries_total", source="client")
+
+        return answer
+
+
+def parse_query(*, query: dict[str, list[str]]) -> tuple[list[str], date, date]:
+    """
+    Return the countries and dates of a ``/holidays`` query string.
+
+    Raise ``KeyError``, ``ValueError`` or ``InvalidInputData`` when the query
+    is not valid, before anything is sent upstream.
+    """
+    countries = query["countries"][0].split(",")
+    start_date = date.fromisoformat(query["start"][0])
+    end_date = date.fromisoformat(query["end"][0])
+    CalendarParams.from_dates(
+        countries=countries, start_date=start_date, end_date=end_date
+    )
+
+    return countries, start_date, end_date
+
+
+def create_server(
+    *, service: HolidayService, host: str, port: int
+) -> ThreadingHTTPServer:
+    """
+    Serve ``GET /holidays?countries=us,gb&start=YYYY-MM-DD&end=YYYY-MM-DD``
+    and the service metrics at ``GET /metrics``.
+    """
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        # Send headers and body in one segment, avoiding delayed ACK stalls
+        wbufsize = -1
+        disable_nagle_algorithm = True
+
+        def do_GET(self) -> None:
+            url = urlparse(self.path)
+            if url.path == "/metrics":
+                self._send(200, service.metrics.to_prometheus().encode(), "text/plain")
+            elif url.path == "/holidays":
+                self._send_holidays(query=parse_qs(url.query))
+            else:
+                self._send_error(404, "Not found")
+
+        def _send_holidays(self, *, query: dict[str, list[str]]) -> None:
+            started_at = time.perf_counter()
+            try:
+                countries, start_date, end_date = parse_query(query=query)
+            except (KeyError, ValueError, InvalidInputData) as e:
+                self._send_error(400, f"Invalid query: {e}")
+                return
+
+            try:
+                body = service.query(
+                    countries=countries, start_date=start_date, end_date=end_date
+                )
+            except (ClientException, KeyError, ValueError) as e:
+                # Failed requests and responses the client could not read
+                # Only logged, the details are not for the caller
+                logger.error(
+                    "Error answering %s: %s",
+                    self.path,
+                    redact(text=repr(e)),
+                    extra={"path": self.path},
+                )
+                self._send_error(502, "Upstream error")
+                return
+            except Exception:
+                logger.exception(
+                    "Error answering %s", self.path, extra={"path": self.path}
+                )
+                self._send_error(500, "Internal error")
+                return
+
+            self._send(200, body, "application/json")
+            service.metrics.observe(
+                "query_duration_seconds", value=time.perf_counter() - started_at
+            )
+
+        def _send_error(self, status: int, message: str) -> None:
+            self._send(status, service.json.dumps({"error": message}).encode())
+
+        def _send(
+            self, status: int, body: bytes, content_type: str = "application/json"
+        ) -> None:
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format: str, *args: Any) -> None:
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    server.daemon_threads = True
+
+    return server
+
+
+if __name__ == "__main__":
+    setup_logging()
+    parser = argparse.ArgumentParser(
+        description="Serve holiday queries over HTTP from a long-running client."
+    )
+    parser.add_argument("--host", default=config.SERVICE_HOST, help="the host to bind")
+    parser.add_argument(
+        "--port", type=int, default=config.SERVICE_PORT, help="the port to bind"
+    )
+    parser.add_argument(
+        "--max-entries",
+        type=int,
+        default=config.SERVICE_MAX_ENTRIES,
+        help="the number of responses and answers kept in memory",
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=config.CONCURRENCY,
+        help="the maximum number of upstream requests in flight at once",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="neither read nor store responses in the local cache",
+    )
+    parser.add_argument(
+        "--fast-json",
+        action="store_true",
+        default=config.FAST_JSON,
+        help="use orjson, when installed, to decode responses and encode answers",
+    )
+    args = parser.parse_args()
+
+    server = create_server(
+        service=HolidayService(
+            max_entries=args.max_entries,
+            ttl=config.SERVICE_TTL,
+            concurrency=args.concurrency,
+            cache=(
+                None
+                if args.no_cache
+                else ResponseCache(
+                    path=config.CACHE_PATH,
+                    ttl=config.CACHE_TTL,
+                    max_entries=config.CACHE_MAX_ENTRIES,
+                )
+            ),
+            fast_json=args.fast_json,
+        ),
+        host=args.host,
+        port=args.port,
+    )
+    logger.info("Serving holidays on http://%s:%s/holidays", args.host, args.port)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
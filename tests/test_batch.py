@@ -0,0 +1,172 @@
+import json
+import os
+import tempfile
+
+import pytest
+
+from batch import BatchRunner, get_unique_params, group_by_country, load_jobs
+from calendarific import CalendarificClient
+from custom_exceptions import InvalidInputData
+
+
+@pytest.fixture
+def temp_dir():
+    with tempfile.TemporaryDirectory() as temp_dir:
+        yield temp_dir
+
+
+def _write_jobs(temp_dir, jobs):
+    path = os.path.join(temp_dir, "jobs.jsonl")
+    with open(path, "w") as file:
+        for job in jobs:
+            file.write(json.dumps(job) + "\n")
+
+    return path
+
+
+def _holidays_callback(request, context):
+    country = request.qs["country"][0]
+    year = int(request.qs["year"][0])
+    months = [int(request.qs["month"][0])] if "month" in request.qs else range(1, 13)
+
+    return {
+        "meta": {"code": 200},
+        "response": {
+            "holidays": [
+                {
+                    "name": f"Holiday {month}",
+                    "country": {"id": country, "name": country},
+                    "date": {"iso": f"{year}-{month:02d}-10"},
+                }
+                for month in months
+            ]
+        },
+    }
+
+
+def test_load_jobs(temp_dir):
+    path = _write_jobs(
+        temp_dir,
+        [
+            {"countries": ["ua"], "start": "1992-07-07", "end": "1992-09-18"},
+            {
+                "countries": ["us", "gb"],
+                "start": "1992-01-01",
+                "end": "1993-12-31",
+                "output_dir": "elsewhere",
+                "format": "npy",
+            },
+        ],
+    )
+
+    jobs = load_jobs(path=path, output_dir="output")
+
+    assert [job.output_dir for job in jobs] == ["output", "elsewhere"]
+    assert [job.output_format for job in jobs] == ["jsonl", "npy"]
+    assert jobs[1].values.get_input_data()["countries"][1].value == "GB"
+
+
+def test_load_jobs_invalid(temp_dir):
+    path = _write_jobs(temp_dir, [{"countries": ["ua"], "start": "1992-07-07"}])
+
+    with pytest.raises(InvalidInputData):
+        load_jobs(path=path, output_dir="output")
+
+
+def test_get_unique_params(temp_dir):
+    path = _write_jobs(
+        temp_dir,
+        [
+            {"countries": ["ua", "us"], "start": "1992-07-07", "end": "1992-09-18"},
+            {"countries": ["ua"], "start": "1992-08-01", "end": "1992-08-30"},
+            {"countries": ["us"], "start": "1992-01-01", "end": "1993-12-31"},
+        ],
+    )
+
+    unique_params = get_unique_params(jobs=load_jobs(path=path, output_dir="output"))
+
+    assert sorted(
+        (str(params["country"]), params["year"], params.get("month"))
+        for params in unique_params
+    ) == [
+        ("UA", 1992, 7),
+        ("UA", 1992, 8),
+        ("UA", 1992, 9),
+        ("US", 1992, None),
+        ("US", 1993, None),
+    ]
+
+
+def test_batch_runner_fetches_each_request_once(temp_dir, requests_mock):
+    requests_mock.get(CalendarificClient.BASE_URL, json=_holidays_callback)
+    path = _write_jobs(
+        temp_dir,
+        [
+            {"countries": ["ua", "us"], "start": "1992-07-07", "end": "1992-09-18"},
+            {"countries": ["us"], "start": "1992-01-01", "end": "1992-12-31"},
+            {"countries": ["ua"], "start": "1992-08-01", "end": "1992-08-30"},
+        ],
+    )
+    output_dir = os.path.join(temp_dir, "output")
+
+    BatchRunner(jobs=load_jobs(path=path, output_dir=output_dir), concurrency=2).run()
+
+    assert requests_mock.call_count == 4
+    assert sorted(file for file in os.listdir(output_dir) if file.endswith(".txt")) == [
+        "ua_1-8-1992_30-8-1992.txt",
+        "ua_7-7-1992_18-9-1992.txt",
+        "us_1-1-1992_31-12-1992.txt",
+        "us_7-7-1992_18-9-1992.txt",
+    ]
+    with open(os.path.join(output_dir, "us_7-7-1992_18-9-1992.txt")) as file:
+        assert [json.loads(line)["name"] for line in file] == [
+            "Holiday 7",
+            "Holiday 8",
+            "Holiday 9",
+        ]
+
+
+def test_group_by_country():
+    params = [
+        {"country": "UA", "year": 1992},
+        {"country": "US", "year": 1992},
+        {"country": "UA", "year": 1993},
+        {"country": "GB", "year": 1992},
+    ]
+
+    assert group_by_country(params=params, min_size=2) == [
+        {"UA": [params[0], params[2]]},
+        {"US": [params[1]], "GB": [params[3]]},
+    ]
+
+
+def test_batch_runner_drops_written_responses(temp_dir, requests_mock):
+    class Responses(dict):
+        peak = 0
+
+        def __setitem__(self, key, value):
+            super().__setitem__(key, value)
+            Responses.peak = max(Responses.peak, len(self))
+
+    requests_mock.get(CalendarificClient.BASE_URL, json=_holidays_callback)
+    path = _write_jobs(
+        temp_dir,
+        [
+            {"countries": ["ua", "us"], "start": "1992-01-01", "end": "1993-12-31"},
+            {"countries": ["gb", "us"], "start": "1992-01-01", "end": "1992-12-31"},
+        ],
+    )
+    output_dir = os.path.join(temp_dir, "output")
+    runner = BatchRunner(jobs=load_jobs(path=path, output_dir=output_dir))
+    runner.responses = Responses()
+
+    runner.run()
+
+    assert requests_mock.call_count == 5
+    assert Responses.peak == 2
+    assert sorted(file for file in os.listdir(output_dir) if file.endswith(".txt")) == [
+        "gb_1-1-1992_31-12-1992.txt",
+        "ua_1-1-1992_31-12-1993.txt",
+        "us_1-1-1992_31-12-1992.txt",
+        "us_1-1-1992_31-12-1993.txt",
+    ]
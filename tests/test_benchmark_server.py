@@ -0,0 +1,69 @@
+import json
+import os
+import tempfile
+
+import requests
+
+from benchmarks.server import FakeCalendarificServer
+from calendarific import CalendarificClient
+from parameters import CalendarParams, Country, Day, EndDate, Month, StartDate, Year
+from scheduler import RequestScheduler
+
+
+def test_server_filters_by_period():
+    with FakeCalendarificServer(holidays_per_year=365) as server:
+        year = requests.get(server.url, params={"country": "ua", "year": 1992}).json()
+        day = requests.get(
+            server.url, params={"country": "ua", "year": 1992, "month": 8, "day": 24}
+        ).json()
+
+    assert len(year["response"]["holidays"]) == 365
+    assert [holiday["date"]["iso"] for holiday in day["response"]["holidays"]] == [
+        "1992-08-24"
+    ]
+
+
+def test_client_run_against_server_with_throttling():
+    with FakeCalendarificServer(rate_limited=0.5, holidays_per_year=50) as server:
+
+        class LocalClient(CalendarificClient):
+            BASE_URL = server.url
+
+        client = LocalClient(
+            values=CalendarParams(
+                countries=[Country(value="UA"), Country(value="GB")],
+                start_date=StartDate(Year(1992), Month(7), Day(7)),
+                end_date=EndDate(Year(1992), Month(9), Day(18)),
+            ),
+            scheduler=RequestScheduler(
+                rate=0,
+                burst=1,
+                max_concurrency=1,
+                max_retries=20,
+                backoff_base=0,
+                backoff_max=0,
+                latency_threshold=5,
+            ),
+        )
+
+        with tempfile.TemporaryDirectory() as output_dir:
+            client.run(output_dir=output_dir)
+
+            with open(os.path.join(output_dir, "ua_7-7-1992_18-9-1992.txt")) as file:
+                dates = [json.loads(line)["date"]["iso"] for line in file]
+
+    assert server.throttled > 0
+    assert dates == sorted(dates)
+    assert dates[0] >= "1992-07-07" and dates[-1] <= "1992-09-18"
+
+
+def test_server_answers_conditional_requests():
+    with FakeCalendarificServer(holidays_per_year=10) as server:
+        params = {"country": "ua", "year": 1992}
+        response = requests.get(server.url, params=params)
+        headers = {"If-None-Match": response.headers["ETag"]}
+        not_modified = requests.get(server.url, params=params, headers=headers)
+
+    assert not_modified.status_code == 304
+    assert not_modified.content == b""
+    assert server.not_modified == 1
@@ -0,0 +1,123 @@
+import gzip
+import json
+import os
+import tempfile
+
+import pytest
+
+from business_days import BusinessDays, get_holiday_dates, iter_output_holidays
+
+numpy = pytest.importorskip("numpy")
+
+EXPECTED_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(__file__)), "expected_result"
+)
+
+
+def _holiday(iso_date, types=("National holiday",)):
+    return {"name": "Holiday", "date": {"iso": iso_date}, "type": list(types)}
+
+
+@pytest.fixture
+def output_dir():
+    with tempfile.TemporaryDirectory() as output_dir:
+        flat = [_holiday("2024-12-25"), _holiday("2024-12-26")]
+        with open(os.path.join(output_dir, "gb_1-1-2024_31-12-2024.txt"), "w") as file:
+            file.writelines(json.dumps(holiday) + "\n" for holiday in flat)
+
+        os.makedirs(os.path.join(output_dir, "gb"))
+        partitioned = [
+            _holiday("2025-01-01"),
+            _holiday("2025-01-02", types=("Local holiday",)),
+        ]
+        with gzip.open(os.path.join(output_dir, "gb", "2025.jsonl.gz"), "wt") as file:
+            file.writelines(json.dumps(holiday) + "\n" for holiday in partitioned)
+        yield output_dir
+
+
+def test_iter_output_holidays_reads_flat_and_partitioned_files(output_dir):
+    holidays = iter_output_holidays(output_dir=output_dir, country="GB")
+
+    assert get_holiday_dates(holidays=holidays) == [
+        "2024-12-25",
+        "2024-12-26",
+        "2025-01-01",
+        "2025-01-02",
+    ]
+    assert list(iter_output_holidays(output_dir=output_dir, country="us")) == []
+
+
+def test_get_holiday_dates_filters_types():
+    holidays = [_holiday("2025-01-01"), _holiday("2025-01-02", types=("Observance",))]
+
+    assert get_holiday_dates(holidays=holidays, types=["National holiday"]) == [
+        "2025-01-01"
+    ]
+
+
+def test_is_business_day(output_dir):
+    business_days = BusinessDays(output_dir=output_dir)
+
+    result = business_days.is_business_day(
+        country="gb", dates=["2024-12-24", "2024-12-25", "2024-12-28", "2025-01-02"]
+    )
+
+    assert result.tolist() == [True, False, False, False]
+
+
+def test_busday_offset_and_count(output_dir):
+    business_days = BusinessDays(output_dir=output_dir)
+
+    # Christmas, Boxing Day, the weekend and New Year's Day are skipped
+    assert business_days.busday_offset(
+        country="gb", dates=["2024-12-24", "2024-12-20"], offsets=[1, 3]
+    ).tolist() == [
+        numpy.datetime64("2024-12-27").item(),
+        numpy.datetime64("2024-12-27").item(),
+    ]
+    assert business_days.busday_count(
+        country="gb", start_dates=["2024-12-23"], end_dates=["2025-01-06"]
+    ).tolist() == [6]
+
+
+def test_calendar_by_type(output_dir):
+    business_days = BusinessDays(output_dir=output_dir)
+
+    assert business_days.is_business_day(
+        country="gb", dates="2025-01-02", types=["National holiday"]
+    )
+    assert not business_days.is_business_day(country="gb", dates="2025-01-02")
+    assert business_days.get_calendar(country="GB") is business_days.get_calendar(
+        country="gb"
+    )
+
+
+def test_weekmask(output_dir):
+    business_days = BusinessDays(output_dir=output_dir, weekmasks={"GB": "1111001"})
+
+    assert business_days.is_business_day(country="gb", dates="2024-12-29")
+    assert not business_days.is_business_day(country="gb", dates="2024-12-27")
+
+
+def test_observances_and_regional_holidays_are_business_days():
+    business_days = BusinessDays(output_dir=EXPECTED_DIR)
+    # Milad un Nabi, the Battle of the Boyne and the English Summer Bank Holiday
+    dates = ["1992-09-10", "1992-07-13", "1992-08-31"]
+
+    assert business_days.is_business_day(country="gb", dates=dates).tolist() == [
+        True,
+        True,
+        True,
+    ]
+    assert business_days.busday_count(
+        country="gb", start_dates=["1992-09-07"], end_dates=["1992-09-14"]
+    ).tolist() == [5]
+    assert business_days.is_business_day(
+        country="gb", dates=dates, region="ENG"
+    ).tolist() == [True, True, False]
+    assert business_days.is_business_day(
+        country="gb", dates=dates, region="gb-nir"
+    ).tolist() == [True, False, False]
+    assert not business_days.is_business_day(
+        country="gb", dates="1992-09-10", types=["Observance"]
+    )
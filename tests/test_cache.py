@@ -0,0 +1,287 @@
+import json
+import os
+import sqlite3
+import tempfile
+
+import pytest
+
+from cache import (
+    ResponseCache,
+    filter_response,
+    get_cache_key,
+    get_granularity,
+    get_superset_params,
+)
+from calendarific import CalendarificClient
+from parameters import CalendarParams, Country, Day, EndDate, Month, StartDate, Year
+
+TTL = {"year": 60, "month": 60, "day": 60, "past": 0}
+
+
+@pytest.fixture
+def cache():
+    with tempfile.TemporaryDirectory() as temp_dir:
+        response_cache = ResponseCache(
+            path=os.path.join(temp_dir, "cache", "responses.sqlite3"),
+            ttl=TTL,
+            max_entries=2,
+        )
+        yield response_cache
+        response_cache.close()
+
+
+@pytest.mark.parametrize(
+    "params, expected_granularity",
+    [
+        ({"country": "us", "year": 2021}, "year"),
+        ({"country": "us", "year": 2021, "month": 5, "day": None}, "month"),
+        ({"country": "us", "year": 2021, "month": 5, "day": 3}, "day"),
+    ],
+)
+def test_get_granularity(params, expected_granularity):
+    assert get_granularity(params=params) == expected_granularity
+
+
+def test_get_cache_key_ignores_api_key_and_empty_values():
+    assert get_cache_key(
+        params={"country": Country(value="US"), "year": 2021, "month": None}
+    ) == get_cache_key(params={"api_key": "secret", "year": 2021, "country": "us"})
+
+
+def test_cache_get_set(cache):
+    params = {"country": "us", "year": 1992}
+
+    assert cache.get(params=params) is None
+
+    cache.set(params=params, body=b"{}")
+
+    assert cache.get(params=params) == b"{}"
+
+
+def test_cache_expires_entries(cache, monkeypatch):
+    params = {"country": "us", "year": 2049}
+    cache.set(params=params, body=b"{}")
+
+    monkeypatch.setattr("cache.time.time", lambda: 10**12)
+
+    assert cache.get(params=params) is None
+    assert not cache.contains(params=params)
+    # Kept as a fallback for when the API is unavailable
+    assert cache.get(params=params, allow_stale=True) == b"{}"
+
+
+def test_cache_evicts_least_recently_used(cache, monkeypatch):
+    for timestamp, year in enumerate([1990, 1991, 1992]):
+        monkeypatch.setattr("cache.time.time", lambda: float(timestamp))
+        cache.set(params={"country": "us", "year": year}, body=b"{}")
+
+    assert len(cache) == 2
+    assert cache.get(params={"country": "us", "year": 1990}) is None
+
+
+def test_client_reuses_cached_responses(cache, requests_mock):
+    mocked_response = {
+        "meta": {"code": 200},
+        "response": {
+            "holidays": [{"name": "Independence Day", "date": {"iso": "1992-08-24"}}]
+        },
+    }
+    requests_mock.get(CalendarificClient.BASE_URL, json=mocked_response)
+    calendar_params = CalendarParams(
+        countries=[Country(value="UA")],
+        start_date=StartDate(Year(1992), Month(1), Day(1)),
+        end_date=EndDate(Year(1992), Month(12), Day(31)),
+    )
+
+    first_run = list(CalendarificClient(values=calendar_params, cache=cache).get_data())
+    second_run = list(
+        CalendarificClient(values=calendar_params, cache=cache).get_data()
+    )
+
+    assert first_run == second_run == [mocked_response["response"]["holidays"]]
+    assert requests_mock.call_count == 1
+    assert requests_mock.last_request.qs["country"] == ["ua"]
+
+    list(
+        CalendarificClient(values=calendar_params, cache=cache, refresh=True).get_data()
+    )
+
+    assert requests_mock.call_count == 2
+    assert json.loads(cache.get(params={"country": "UA", "year": 1992})) == (
+        mocked_response
+    )
+
+
+def test_get_superset_params():
+    assert get_superset_params(
+        params={"country": "us", "year": 1992, "month": 8, "day": 24}
+    ) == [
+        {"country": "us", "year": 1992, "month": 8},
+        {"country": "us", "year": 1992},
+    ]
+    assert get_superset_params(params={"country": "us", "year": 1992}) == []
+
+
+def test_filter_response():
+    response = {
+        "meta": {"code": 200},
+        "response": {
+            "holidays": [
+                {"name": "A", "date": {"iso": "1992-08-24"}},
+                {"name": "B", "date": {"iso": "1992-08-25T10:00:00"}},
+                {"name": "C", "date": {"iso": "1992-09-01"}},
+            ]
+        },
+    }
+
+    month = filter_response(response=response, params={"year": 1992, "month": 8})
+    day = filter_response(
+        response=response, params={"year": 1992, "month": 8, "day": 25}
+    )
+
+    assert [holiday["name"] for holiday in month["response"]["holidays"]] == [
+        "A",
+        "B",
+    ]
+    assert [holiday["name"] for holiday in day["response"]["holidays"]] == ["B"]
+    assert len(response["response"]["holidays"]) == 3
+
+
+@pytest.mark.parametrize(
+    "start_date, end_date, expected_names",
+    [
+        (
+            StartDate(Year(1992), Month(7), Day(7)),
+            EndDate(Year(1992), Month(9), Day(18)),
+            ["Independence Day"],
+        ),
+        (
+            StartDate(Year(1992), Month(12), Day(24)),
+            EndDate(Year(1992), Month(12), Day(26)),
+            ["Christmas Day"],
+        ),
+    ],
+)
+def test_client_serves_narrower_periods_from_cached_year(
+    cache, requests_mock, start_date, end_date, expected_names
+):
+    year_response = {
+        "meta": {"code": 200},
+        "response": {
+            "holidays": [
+                {"name": "New Year's Day", "date": {"iso": "1992-01-01"}},
+                {"name": "Independence Day", "date": {"iso": "1992-08-24"}},
+                {"name": "Christmas Day", "date": {"iso": "1992-12-25"}},
+            ]
+        },
+    }
+    cache.set(
+        params={"country": "UA", "year": 1992}, body=json.dumps(year_response).encode()
+    )
+    requests_mock.get(CalendarificClient.BASE_URL, exc=AssertionError)
+    calendar_params = CalendarParams(
+        countries=[Country(value="UA")], start_date=start_date, end_date=end_date
+    )
+
+    data = list(CalendarificClient(values=calendar_params, cache=cache).get_data())
+
+    assert [holiday["name"] for holiday in data[0]] == expected_names
+    assert requests_mock.call_count == 0
+
+
+def test_client_reuses_fetched_responses_across_clients(requests_mock):
+    requests_mock.get(
+        CalendarificClient.BASE_URL,
+        json={
+            "meta": {"code": 200},
+            "response": {"holidays": [{"name": "A", "date": {"iso": "1992-08-24"}}]},
+        },
+    )
+    responses = {}
+
+    for start_date, end_date in [
+        (
+            StartDate(Year(1992), Month(1), Day(1)),
+            EndDate(Year(1992), Month(12), Day(31)),
+        ),
+        (
+            StartDate(Year(1992), Month(8), Day(1)),
+            EndDate(Year(1992), Month(8), Day(30)),
+        ),
+    ]:
+        calendar_params = CalendarParams(
+            countries=[Country(value="UA")], start_date=start_date, end_date=end_date
+        )
+        data = list(
+            CalendarificClient(values=calendar_params, responses=responses).get_data()
+        )
+
+        assert [holiday["name"] for holiday in data[0]] == ["A"]
+
+    assert requests_mock.call_count == 1
+
+
+def test_cache_conditional_headers(cache, monkeypatch):
+    params = {"country": "us", "year": 2049}
+    cache.set(
+        params=params,
+        body=b"{}",
+        etag='"v1"',
+        last_modified="Wed, 21 Oct 2015 07:28:00 GMT",
+    )
+    monkeypatch.setattr("cache.time.time", lambda: 10**12)
+
+    assert cache.get_conditional_headers(params=params) == {
+        "If-None-Match": '"v1"',
+        "If-Modified-Since": "Wed, 21 Oct 2015 07:28:00 GMT",
+    }
+    assert cache.get_conditional_headers(params={"country": "us", "year": 2048}) == {}
+    assert cache.revalidate(params=params) == b"{}"
+    assert cache.get(params=params) == b"{}"
+
+
+def test_client_revalidates_expired_response(cache, requests_mock, monkeypatch):
+    mocked_response = {
+        "meta": {"code": 200},
+        "response": {
+            "holidays": [{"name": "Independence Day", "date": {"iso": "2049-08-24"}}]
+        },
+    }
+    requests_mock.get(
+        CalendarificClient.BASE_URL, json=mocked_response, headers={"ETag": '"v1"'}
+    )
+    calendar_params = CalendarParams(
+        countries=[Country(value="UA")],
+        start_date=StartDate(Year(2049), Month(1), Day(1)),
+        end_date=EndDate(Year(2049), Month(12), Day(31)),
+    )
+    list(CalendarificClient(values=calendar_params, cache=cache).get_data())
+
+    monkeypatch.setattr("cache.time.time", lambda: 10**12)
+    requests_mock.get(CalendarificClient.BASE_URL, status_code=304)
+    client = CalendarificClient(values=calendar_params, cache=cache)
+
+    assert list(client.get_data()) == [mocked_response["response"]["holidays"]]
+    assert requests_mock.last_request.headers["If-None-Match"] == '"v1"'
+    assert client.metrics.get_counter("not_modified_total") == 1
+
+
+def test_cache_adds_validator_columns_to_old_database():
+    with tempfile.TemporaryDirectory() as temp_dir:
+        path = os.path.join(temp_dir, "responses.sqlite3")
+        connection = sqlite3.connect(path)
+        connection.execute(
+            "CREATE TABLE responses (key TEXT PRIMARY KEY, granularity TEXT NOT NULL, "
+            "body BLOB NOT NULL, stored_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+        )
+        connection.commit()
+        connection.close()
+
+        response_cache = ResponseCache(path=path, ttl=TTL, max_entries=2)
+        params = {"country": "us", "year": 2049}
+        response_cache.set(params=params, body=b"{}", etag='"v1"')
+
+        assert response_cache.get_conditional_headers(params=params) == {
+            "If-None-Match": '"v1"'
+        }
+        response_cache.close()
@@ -7,7 +7,7 @@ from datetime import datetime
 
 import requests
 
-from calendarific import CalendarificClient
+from calendarific import AsyncCalendarificClient, CalendarificClient
 from custom_exceptions import ClientException
 from parameters import CalendarParams, Country, StartDate, EndDate, Day, Month, Year
 
@@ -230,3 +230,92 @@ def test_run(calendar_params, mocked_response, temp_dir, requests_mock):
         holidays = file.readlines()
 
     assert json.loads(holidays[0]) == mocked_response["response"]["holidays"][0]
+
+
+def _holidays_callback(request, context):
+    country = request.qs["country"][0]
+    month = int(request.qs["month"][0])
+
+    return {
+        "meta": {"code": 200},
+        "response": {
+            "holidays": [
+                {
+                    "name": f"{country} {month}",
+                    "country": {"id": country, "name": country},
+                    "date": {"iso": f"2021-{month:02d}-15"},
+                }
+            ]
+        },
+    }
+
+
+def test_async_get_data_keeps_country_order(requests_mock):
+    calendar_params = CalendarParams(
+        countries=["us", "gb", "ua"],
+        start_date=StartDate(Year(2021), Month(1), Day(1)),
+        end_date=EndDate(Year(2021), Month(3), Day(31)),
+    )
+    requests_mock.get(CalendarificClient.BASE_URL, json=_holidays_callback)
+
+    sync_data = list(CalendarificClient(values=calendar_params).get_data())
+    async_data = list(
+        AsyncCalendarificClient(values=calendar_params, concurrency=4).get_data()
+    )
+
+    assert async_data == sync_data
+    assert [country[0]["country"]["id"] for country in async_data] == [
+        "us",
+        "gb",
+        "ua",
+    ]
+    assert [holiday["name"] for holiday in async_data[0]] == ["us 1", "us 2", "us 3"]
+
+
+def test_async_client_invalid_concurrency(calendar_params):
+    with pytest.raises(ClientException):
+        AsyncCalendarificClient(values=calendar_params, concurrency=0)
+
+
+def test_run_keeps_previous_file_when_fetch_fails(temp_dir, requests_mock):
+    calendar_params = CalendarParams(
+        countries=["ua"],
+        start_date=StartDate(Year(2021), Month(1), Day(1)),
+        end_date=EndDate(Year(2021), Month(3), Day(31)),
+    )
+    client = CalendarificClient(values=calendar_params)
+    file_path = os.path.join(temp_dir, "ua_1-1-2021_31-3-2021.txt")
+    with open(file_path, "w") as file:
+        file.write("previous\n")
+    requests_mock.get(
+        client.BASE_URL,
+        [
+            {"json": _holidays_callback},
+            {"exc": requests.ConnectionError},
+        ],
+    )
+
+    with pytest.raises(ClientException):
+        client.run(output_dir=temp_dir)
+
+    with open(file_path) as file:
+        assert file.read() == "previous\n"
+    assert os.listdir(temp_dir) == ["ua_1-1-2021_31-3-2021.txt"]
+
+
+def test_run_leaves_unchanged_files_untouched(temp_dir, requests_mock):
+    calendar_params = CalendarParams(
+        countries=["ua"],
+        start_date=StartDate(Year(2021), Month(1), Day(1)),
+        end_date=EndDate(Year(2021), Month(3), Day(31)),
+    )
+    requests_mock.get(CalendarificClient.BASE_URL, json=_holidays_callback)
+    file_path = os.path.join(temp_dir, "ua_1-1-2021_31-3-2021.txt")
+
+    CalendarificClient(values=calendar_params).run(output_dir=temp_dir)
+    mtime = os.stat(file_path).st_mtime_ns
+    client = CalendarificClient(values=calendar_params)
+    client.run(output_dir=temp_dir)
+
+    assert os.stat(file_path).st_mtime_ns == mtime
+    assert client.metrics.get_counter("files_unchanged_total") == 1
@@ -0,0 +1,109 @@
+from datetime import date
+
+from calendarific import CalendarificClient
+from dedupe import HolidayDeduplicator, get_holiday_key, merge_regional_variants
+from parameters import CalendarParams
+
+
+def _state(abbrev):
+    return {"abbrev": abbrev, "name": abbrev, "iso": f"us-{abbrev.lower()}"}
+
+
+def _holiday(*, states="All", iso_date="2024-04-15", locations="All"):
+    return {
+        "name": "Patriots' Day",
+        "country": {"id": "us"},
+        "date": {"iso": iso_date},
+        "urlid": "us/patriots-day",
+        "locations": locations,
+        "states": states,
+    }
+
+
+def test_holiday_key_ignores_state_order():
+    first = _holiday(states=[_state("MA"), _state("ME")])
+    second = _holiday(states=[_state("ME"), _state("MA")])
+
+    assert get_holiday_key(holiday=first) == get_holiday_key(holiday=second)
+    assert get_holiday_key(holiday=first) != get_holiday_key(
+        holiday=_holiday(states=[_state("MA")])
+    )
+
+
+def test_deduplicator_drops_repeats_across_batches():
+    deduplicator = HolidayDeduplicator()
+    holiday = _holiday()
+
+    assert deduplicator.filter(holidays=[holiday, dict(holiday)]) == [holiday]
+    assert deduplicator.filter(holidays=[holiday, _holiday(iso_date="2024-04-16")]) == [
+        _holiday(iso_date="2024-04-16")
+    ]
+    assert deduplicator.duplicates == 2
+
+
+def test_merge_regional_variants():
+    holidays = [
+        _holiday(states=[_state("ME")], locations="ME"),
+        {"name": "Other", "date": {"iso": "2024-04-15"}, "states": "All"},
+        _holiday(states=[_state("MA")], locations="MA"),
+    ]
+
+    merged = merge_regional_variants(holidays=holidays)
+
+    assert [holiday["name"] for holiday in merged] == ["Patriots' Day", "Other"]
+    assert merged[0]["states"] == [_state("MA"), _state("ME")]
+    assert merged[0]["locations"] == "MA, ME"
+    assert holidays[0]["states"] == [_state("ME")]
+
+
+def test_merge_regional_variants_with_whole_country():
+    merged = merge_regional_variants(
+        holidays=[_holiday(states=[_state("MA")], locations="MA"), _holiday()]
+    )
+
+    assert merged == [_holiday()]
+
+
+def _get_client(*, requests_mock, **kwargs):
+    holidays = [
+        _holiday(states=[_state("MA")], locations="MA"),
+        _holiday(states=[_state("ME")], locations="ME"),
+        _holiday(states=[_state("MA")], locations="MA"),
+    ]
+    requests_mock.get(
+        CalendarificClient.BASE_URL,
+        json={"meta": {"code": 200}, "response": {"holidays": holidays}},
+    )
+
+    return CalendarificClient(
+        values=CalendarParams.from_dates(
+            countries=["us"], start_date=date(2024, 1, 1), end_date=date(2024, 12, 31)
+        ),
+        **kwargs,
+    )
+
+
+def test_client_drops_duplicates(requests_mock):
+    client = _get_client(requests_mock=requests_mock)
+
+    (holidays,) = client.get_data()
+
+    assert [holiday["locations"] for holiday in holidays] == ["MA", "ME"]
+    assert client.metrics.get_counter("holidays_duplicate_total") == 1
+
+
+def test_client_merges_regions(requests_mock):
+    client = _get_client(requests_mock=requests_mock, merge_regions=True)
+
+    (holidays,) = client.get_data()
+
+    assert len(holidays) == 1
+    assert holidays[0]["states"] == [_state("MA"), _state("ME")]
+
+
+def test_client_keeps_duplicates_without_dedupe(requests_mock):
+    client = _get_client(requests_mock=requests_mock, dedupe=False)
+
+    (holidays,) = client.get_data()
+
+    assert len(holidays) == 3
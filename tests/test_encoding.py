@@ -0,0 +1,173 @@
+import gzip
+import json
+import os
+import tempfile
+from datetime import date
+
+import pytest
+
+from calendarific import AsyncCalendarificClient, CalendarificClient
+from custom_exceptions import ClientException
+from encoding import encode_response
+from export import PARQUET
+from manifest import MANIFEST_FILE_NAME
+from parameters import CalendarParams
+from partition import GZIP, PARTITIONED
+from writer import HASHES_FILE_NAME
+
+
+def _holiday(iso_date, name="Holiday", states="All"):
+    return {
+        "name": name,
+        "country": {"id": "us"},
+        "date": {"iso": iso_date},
+        "states": states,
+    }
+
+
+def _body(holidays, code=200):
+    return json.dumps(
+        {"meta": {"code": code}, "response": {"holidays": holidays}}
+    ).encode()
+
+
+def test_encode_response_filters_and_encodes():
+    holidays = [_holiday("1992-01-01"), _holiday("1992-08-24"), _holiday("1992-12-25")]
+
+    encoded = encode_response(
+        body=_body(holidays),
+        params=None,
+        bounds=("1992-02-01", "1992-12-31"),
+        fast_json=False,
+        merge_regions=False,
+    )
+
+    assert (encoded.code, encoded.total, encoded.kept) == (200, 3, 2)
+    assert [holiday.iso_date for holiday in encoded.holidays] == [
+        "1992-08-24",
+        "1992-12-25",
+    ]
+    assert json.loads(encoded.holidays[0].line) == holidays[1]
+
+
+def test_encode_response_narrows_coarser_response_and_merges_regions():
+    holidays = [
+        _holiday("1992-04-20", states=[{"iso": "us-ma"}]),
+        _holiday("1992-04-20", states=[{"iso": "us-me"}]),
+        _holiday("1992-05-25"),
+    ]
+
+    encoded = encode_response(
+        body=_body(holidays),
+        params={"country": "us", "year": 1992, "month": 4},
+        bounds=("1992-01-01", "1992-12-31"),
+        fast_json=False,
+        merge_regions=True,
+    )
+
+    assert (encoded.total, encoded.kept) == (2, 2)
+    assert len(encoded.holidays) == 1
+    assert json.loads(encoded.holidays[0].line)["states"] == [
+        {"iso": "us-ma"},
+        {"iso": "us-me"},
+    ]
+
+
+def test_encode_response_rejects_invalid_json():
+    with pytest.raises(ClientException):
+        encode_response(
+            body=b"{",
+            params=None,
+            bounds=("1992-01-01", "1992-12-31"),
+            fast_json=False,
+            merge_regions=False,
+        )
+
+
+def _callback(request, context):
+    year = int(request.qs["year"][0])
+    holidays = [_holiday(f"{year}-01-01"), _holiday(f"{year}-07-04")]
+    # Repeated across responses, written once
+    holidays.append(_holiday("1991-12-25", name="Repeated"))
+    return {"meta": {"code": 200}, "response": {"holidays": holidays}}
+
+
+def _read_output(output_dir):
+    contents = {}
+    for root, _, file_names in os.walk(output_dir):
+        for file_name in file_names:
+            if file_name in (MANIFEST_FILE_NAME, HASHES_FILE_NAME):
+                continue
+            path = os.path.join(root, file_name)
+            # gzip headers hold the time of writing
+            with (gzip.open if path.endswith(".gz") else open)(path, "rb") as file:
+                contents[os.path.relpath(path, output_dir)] = file.read()
+
+    return contents
+
+
+@pytest.mark.parametrize(
+    "client_class, options",
+    [
+        (CalendarificClient, {}),
+        (AsyncCalendarificClient, {"concurrency": 4}),
+    ],
+)
+@pytest.mark.parametrize("layout", [{}, {"layout": PARTITIONED, "compression": GZIP}])
+def test_client_writes_the_same_files_with_processes(
+    requests_mock, client_class, options, layout
+):
+    requests_mock.get(CalendarificClient.BASE_URL, json=_callback)
+    values = CalendarParams.from_dates(
+        countries=["us", "gb"], start_date=date(1991, 6, 1), end_date=date(1993, 6, 30)
+    )
+    outputs = []
+
+    for processes in (0, 2):
+        with tempfile.TemporaryDirectory() as output_dir:
+            client = client_class(values=values, processes=processes, **options)
+            client.run(output_dir=output_dir, **layout)
+            outputs.append(_read_output(output_dir))
+
+    assert outputs[0] == outputs[1]
+    assert len(outputs[0]) > 1
+    assert client.metrics.get_counter("holidays_duplicate_total") > 0
+
+
+def test_client_does_not_fork_worker_processes(requests_mock, monkeypatch):
+    import concurrent.futures
+
+    requests_mock.get(CalendarificClient.BASE_URL, json=_callback)
+    start_methods = []
+    executor = concurrent.futures.ProcessPoolExecutor
+
+    def spy(*, mp_context, **kwargs):
+        start_methods.append(mp_context.get_start_method())
+        return executor(mp_context=mp_context, **kwargs)
+
+    monkeypatch.setattr(concurrent.futures, "ProcessPoolExecutor", spy)
+    client = AsyncCalendarificClient(
+        values=CalendarParams.from_dates(
+            countries=["us"], start_date=date(1992, 1, 1), end_date=date(1992, 12, 31)
+        ),
+        concurrency=2,
+        processes=2,
+    )
+
+    with tempfile.TemporaryDirectory() as output_dir:
+        client.run(output_dir=output_dir)
+
+    assert start_methods in (["forkserver"], ["spawn"])
+
+
+def test_client_rejects_processes_for_columnar_output():
+    client = CalendarificClient(
+        values=CalendarParams.from_dates(
+            countries=["us"], start_date=date(1992, 1, 1), end_date=date(1992, 12, 31)
+        ),
+        processes=2,
+    )
+
+    with tempfile.TemporaryDirectory() as output_dir:
+        with pytest.raises(ClientException):
+            client.run(output_dir=output_dir, output_format=PARQUET)
@@ -0,0 +1,122 @@
+import io
+import os
+import tempfile
+
+import pytest
+
+import export
+from calendarific import CalendarificClient
+from custom_exceptions import ClientException
+from export import (
+    ARROW,
+    JSONL,
+    NPY,
+    PARQUET,
+    HolidayColumns,
+    resolve_format,
+    write_columns,
+)
+from parameters import CalendarParams, Country, Day, EndDate, Month, StartDate, Year
+from writer import HASHES_FILE_NAME
+
+HOLIDAYS = [
+    {
+        "name": "Independence Day",
+        "country": {"id": "ua", "name": "Ukraine"},
+        "date": {"iso": "1992-08-24"},
+        "type": ["National holiday"],
+        "primary_type": "National holiday",
+    },
+    {
+        "name": "Day of Knowledge",
+        "country": {"id": "ua", "name": "Ukraine"},
+        "date": {"iso": "1992-09-01T10:00:00"},
+        "type": ["Observance", "Season"],
+        "primary_type": "Observance",
+    },
+]
+
+
+@pytest.fixture
+def columns():
+    holiday_columns = HolidayColumns()
+    holiday_columns.extend(holidays=HOLIDAYS)
+
+    return holiday_columns
+
+
+def test_resolve_format(monkeypatch):
+    assert resolve_format(output_format=JSONL) == JSONL
+
+    with pytest.raises(ClientException):
+        resolve_format(output_format="csv")
+
+    monkeypatch.setattr(export, "_is_installed", lambda module: module == "numpy")
+    assert resolve_format(output_format=PARQUET) == NPY
+
+    monkeypatch.setattr(export, "_is_installed", lambda module: False)
+    with pytest.raises(ClientException):
+        resolve_format(output_format=NPY)
+
+
+def test_write_npy(columns):
+    numpy = pytest.importorskip("numpy")
+    file = io.BytesIO()
+
+    write_columns(file=file, columns=columns, output_format=NPY)
+    file.seek(0)
+    array = numpy.load(file)
+
+    assert array["date"].tolist() == [
+        numpy.datetime64("1992-08-24").item(),
+        numpy.datetime64("1992-09-01").item(),
+    ]
+    assert array["type"].tolist() == ["National holiday", "Observance|Season"]
+
+
+@pytest.mark.parametrize("output_format", [PARQUET, ARROW])
+def test_write_arrow_formats(columns, output_format):
+    arrow = pytest.importorskip("pyarrow")
+    file = io.BytesIO()
+
+    write_columns(file=file, columns=columns, output_format=output_format)
+    file.seek(0)
+    if output_format == PARQUET:
+        import pyarrow.parquet as parquet
+
+        table = parquet.read_table(file)
+    else:
+        table = arrow.ipc.open_file(file).read_all()
+
+    assert table.schema.field("date").type == arrow.date32()
+    assert table.column("name").to_pylist() == [
+        "Independence Day",
+        "Day of Knowledge",
+    ]
+    assert table.column("type").to_pylist() == [
+        ["National holiday"],
+        ["Observance", "Season"],
+    ]
+
+
+def test_client_writes_columnar_file(requests_mock):
+    pytest.importorskip("numpy")
+    requests_mock.get(
+        CalendarificClient.BASE_URL,
+        json={"meta": {"code": 200}, "response": {"holidays": HOLIDAYS}},
+    )
+    calendar_params = CalendarParams(
+        countries=[Country(value="UA")],
+        start_date=StartDate(Year(1992), Month(1), Day(1)),
+        end_date=EndDate(Year(1992), Month(12), Day(31)),
+    )
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        CalendarificClient(values=calendar_params).run(
+            output_dir=temp_dir, output_format=NPY
+        )
+
+        assert sorted(os.listdir(temp_dir)) == [
+            HASHES_FILE_NAME,
+            "ua_1-1-1992_31-12-1992.npy",
+        ]
@@ -0,0 +1,84 @@
+import glob
+import json
+import os
+from datetime import date
+
+import pytest
+
+from calendarific import CalendarificClient
+from holiday import Holiday
+from parameters import CalendarParams, Country, Day, EndDate, Month, StartDate, Year
+
+EXPECTED_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(__file__)), "expected_result"
+)
+EXPECTED_LINES = [
+    line
+    for file_path in sorted(glob.glob(os.path.join(EXPECTED_DIR, "*.txt")))
+    for line in open(file_path)
+]
+
+
+@pytest.mark.parametrize("line", EXPECTED_LINES)
+def test_holiday_round_trip(line):
+    holiday = Holiday.from_dict(json.loads(line))
+
+    assert holiday.raw is None
+    assert json.dumps(holiday.to_dict()) + "\n" == line
+
+
+def test_holiday_fields():
+    holiday = Holiday.from_dict(json.loads(EXPECTED_LINES[0]))
+
+    assert holiday.date == date.fromisoformat(holiday.iso_date)
+    assert holiday.canonical_url is None
+    assert isinstance(holiday.types, tuple)
+
+
+def test_holiday_interns_repeated_values():
+    data = json.loads(EXPECTED_LINES[0])
+    first = Holiday.from_dict(json.loads(json.dumps(data)))
+    second = Holiday.from_dict(json.loads(json.dumps(data)))
+
+    assert first.country_name is second.country_name
+    assert first.types is second.types
+    assert first.states is second.states
+
+
+def test_holiday_keeps_irregular_records():
+    data = {
+        "name": "Daylight Saving Time starts",
+        "country": {"id": "us", "name": "United States"},
+        "date": {
+            "iso": "2021-03-14T02:00:00-08:00",
+            "datetime": {"year": 2021, "month": 3, "day": 14, "hour": 2},
+            "timezone": {"offset": "-08:00"},
+        },
+        "type": ["Clock change/Daylight Saving Time"],
+    }
+
+    holiday = Holiday.from_dict(data)
+
+    assert holiday.raw is not None
+    assert holiday.date == date(2021, 3, 14)
+    assert holiday.to_dict() == data
+
+
+def test_client_get_holidays(requests_mock):
+    data = json.loads(EXPECTED_LINES[0])
+    requests_mock.get(
+        CalendarificClient.BASE_URL,
+        json={"meta": {"code": 200}, "response": {"holidays": [data]}},
+    )
+    day = date.fromisoformat(data["date"]["iso"])
+    calendar_params = CalendarParams(
+        countries=[Country(value=data["country"]["id"])],
+        start_date=StartDate(Year(day.year), Month(day.month), Day(day.day)),
+        end_date=EndDate(Year(day.year), Month(day.month), Day(day.day)),
+    )
+
+    holidays = list(CalendarificClient(values=calendar_params).get_holidays())
+
+    assert [[holiday.to_dict() for holiday in country] for country in holidays] == [
+        [data]
+    ]
@@ -0,0 +1,78 @@
+import os
+import shutil
+import tempfile
+from datetime import date
+
+import pytest
+
+from custom_exceptions import IndexException
+from holiday_index import HolidayIndex, build_index
+
+EXPECTED_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(__file__)), "expected_result"
+)
+
+
+@pytest.fixture
+def output_dir():
+    with tempfile.TemporaryDirectory() as temp_dir:
+        for file_name in os.listdir(EXPECTED_DIR):
+            shutil.copy(os.path.join(EXPECTED_DIR, file_name), temp_dir)
+        yield temp_dir
+
+
+@pytest.fixture
+def index(output_dir):
+    build_index(output_dir=output_dir)
+    holiday_index = HolidayIndex(output_dir=output_dir)
+    yield holiday_index
+    holiday_index.close()
+
+
+def test_build_index(output_dir):
+    assert build_index(output_dir=output_dir) == 40
+
+
+def test_lookup(index):
+    holidays = index.lookup(country="UA", day=date(1992, 8, 24))
+
+    assert [holiday["name"] for holiday in holidays] == ["Independence Day"]
+    assert index.is_holiday(country="ua", day=date(1992, 8, 24))
+    assert not index.is_holiday(country="ua", day=date(1992, 8, 25))
+    assert not index.is_holiday(country="pl", day=date(1992, 8, 24))
+
+
+def test_range(index):
+    holidays = index.range(country="gb", start=date(1992, 7, 1), end=date(1992, 7, 31))
+
+    assert [holiday["date"]["iso"] for holiday in holidays] == [
+        "1992-07-11",
+        "1992-07-12",
+        "1992-07-13",
+    ]
+
+
+def test_range_skips_duplicates_from_overlapping_files(output_dir):
+    shutil.copy(
+        os.path.join(output_dir, "ua_7-7-1992_18-9-1992.txt"),
+        os.path.join(output_dir, "ua_1-1-1992_31-12-1992.txt"),
+    )
+    build_index(output_dir=output_dir)
+    index = HolidayIndex(output_dir=output_dir)
+
+    assert len(index) == 41
+    assert len(index.lookup(country="ua", day=date(1992, 8, 24))) == 1
+    index.close()
+
+
+def test_lookup_detects_changed_files(index, output_dir):
+    with open(os.path.join(output_dir, "ua_7-7-1992_18-9-1992.txt"), "a") as file:
+        file.write("\n")
+
+    with pytest.raises(IndexException):
+        index.lookup(country="ua", day=date(1992, 8, 24))
+
+
+def test_missing_index(output_dir):
+    with pytest.raises(IndexException):
+        HolidayIndex(output_dir=output_dir)
@@ -0,0 +1,29 @@
+import pytest
+
+import json_codec
+from json_codec import JsonCodec
+
+HOLIDAY = {"name": "Independence Day", "description": "Ukraine’s Independence Day"}
+
+
+def test_standard_codec_matches_json_module():
+    codec = JsonCodec()
+
+    assert codec.dumps(HOLIDAY) == (
+        '{"name": "Independence Day", "description": "Ukraine\\u2019s Independence Day"}'
+    )
+    assert codec.loads(codec.dumps(HOLIDAY).encode()) == HOLIDAY
+
+
+def test_fast_codec_falls_back_without_orjson(monkeypatch):
+    monkeypatch.setattr(json_codec, "_import_orjson", lambda: None)
+
+    assert JsonCodec(fast=True).fast is False
+
+
+def test_fast_codec_round_trip():
+    pytest.importorskip("orjson")
+    codec = JsonCodec(fast=True)
+
+    assert codec.fast is True
+    assert codec.loads(codec.dumps(HOLIDAY)) == HOLIDAY
@@ -0,0 +1,95 @@
+import io
+import json
+import logging
+from datetime import date
+
+import pytest
+
+from calendarific import CalendarificClient
+from logger import RateLimitFilter, console_handler, logger, setup_logging, stop_logging
+from parameters import CalendarParams
+
+
+@pytest.fixture
+def stream():
+    stream = io.StringIO()
+    previous = console_handler.setStream(stream)
+    yield stream
+    stop_logging()
+    console_handler.setStream(previous)
+
+
+def _read_records(stream):
+    stop_logging()
+    return [json.loads(line) for line in stream.getvalue().splitlines()]
+
+
+def test_json_records_carry_fields(stream):
+    setup_logging(level="INFO", log_format="json", debug_rate=0)
+
+    logger.info("Holidays for %s are up to date", "ua", extra={"country": "ua"})
+    logger.debug("Not written")
+
+    [record] = _read_records(stream)
+    assert record["level"] == "INFO"
+    assert record["message"] == "Holidays for ua are up to date"
+    assert record["country"] == "ua"
+
+
+def test_disabled_levels_are_not_formatted(stream):
+    class Argument:
+        formatted = False
+
+        def __str__(self):
+            Argument.formatted = True
+            return "argument"
+
+    setup_logging(level="INFO", log_format="text", debug_rate=0)
+    logger.debug("Request for %s", Argument())
+    stop_logging()
+
+    assert not Argument.formatted
+    assert stream.getvalue() == ""
+
+
+def test_setup_logging_rejects_unknown_format():
+    with pytest.raises(ValueError):
+        setup_logging(log_format="xml")
+
+
+def test_rate_limit_filter_drops_debug_records():
+    now = [0.0]
+    log_filter = RateLimitFilter(rate=1, burst=2, clock=lambda: now[0])
+
+    def make_record(level):
+        return logging.LogRecord("logger", level, __file__, 0, "message", (), None)
+
+    passed = [log_filter.filter(make_record(logging.DEBUG)) for _ in range(3)]
+    assert passed == [True, True, False]
+    assert log_filter.filter(make_record(logging.WARNING))
+    now[0] = 1.0
+    assert log_filter.filter(make_record(logging.DEBUG))
+    assert log_filter.dropped == 1
+
+
+def test_client_logs_requests_as_structured_records(stream, requests_mock):
+    requests_mock.get(
+        CalendarificClient.BASE_URL,
+        json={"meta": {"code": 200}, "response": {"holidays": []}},
+    )
+    setup_logging(level="DEBUG", log_format="json", debug_rate=0)
+    client = CalendarificClient(
+        values=CalendarParams.from_dates(
+            countries=["ua"], start_date=date(1992, 8, 1), end_date=date(1992, 8, 31)
+        )
+    )
+
+    list(client.get_data())
+
+    [record] = _read_records(stream)
+    assert record["level"] == "DEBUG"
+    assert record["country"] == "ua"
+    assert record["period"] == "1992-08"
+    assert record["granularity"] == "month"
+    assert record["status"] == "200"
+    assert record["latency"] >= 0
@@ -0,0 +1,220 @@
+import os
+import tempfile
+from datetime import date
+
+import pytest
+
+from cache import ResponseCache
+from calendarific import CalendarificClient
+from custom_exceptions import ClientException
+from manifest import Manifest, merge_intervals, subtract_intervals
+from parameters import CalendarParams, Country, Day, EndDate, Month, StartDate, Year
+
+
+@pytest.fixture
+def temp_dir():
+    with tempfile.TemporaryDirectory() as temp_dir:
+        yield temp_dir
+
+
+def _calendar_params(start_date, end_date):
+    return CalendarParams(
+        countries=[Country(value="UA")],
+        start_date=StartDate(
+            Year(start_date.year), Month(start_date.month), Day(start_date.day)
+        ),
+        end_date=EndDate(Year(end_date.year), Month(end_date.month), Day(end_date.day)),
+    )
+
+
+def _holidays_callback(request, context):
+    year = int(request.qs["year"][0])
+    months = [int(request.qs["month"][0])] if "month" in request.qs else range(1, 13)
+
+    return {
+        "meta": {"code": 200},
+        "response": {
+            "holidays": [
+                {
+                    "name": f"Holiday {month}",
+                    "country": {"id": "ua", "name": "Ukraine"},
+                    "date": {"iso": f"{year}-{month:02d}-10"},
+                }
+                for month in months
+            ]
+        },
+    }
+
+
+def test_merge_intervals():
+    assert merge_intervals(
+        intervals=[
+            (date(2021, 3, 1), date(2021, 3, 31), 1.0),
+            (date(2021, 1, 1), date(2021, 2, 28), 1.0),
+            (date(2021, 4, 1), date(2021, 4, 30), 2.0),
+        ]
+    ) == [
+        (date(2021, 1, 1), date(2021, 3, 31), 1.0),
+        (date(2021, 4, 1), date(2021, 4, 30), 2.0),
+    ]
+
+
+def test_manifest_missing_intervals(temp_dir):
+    manifest = Manifest(output_dir=temp_dir, max_age=0)
+    manifest.record(
+        country="ua",
+        file_name=None,
+        intervals=[
+            (date(1992, 3, 1), date(1992, 3, 31), 1.0),
+            (date(1992, 6, 1), date(1992, 6, 30), 1.0),
+        ],
+    )
+
+    assert Manifest(output_dir=temp_dir, max_age=0).get_missing_intervals(
+        country="ua", start=date(1992, 2, 1), end=date(1992, 6, 15)
+    ) == [
+        (date(1992, 2, 1), date(1992, 2, 29)),
+        (date(1992, 4, 1), date(1992, 5, 31)),
+    ]
+
+
+def test_manifest_stale_intervals(temp_dir):
+    manifest = Manifest(output_dir=temp_dir, max_age=60)
+    current_year = date.today().year
+    manifest.record(
+        country="ua",
+        file_name=None,
+        intervals=[
+            (date(1992, 1, 1), date(1992, 12, 31), 1.0),
+            (date(current_year, 1, 1), date(current_year, 12, 31), 1.0),
+        ],
+    )
+
+    assert manifest.get_missing_intervals(
+        country="ua", start=date(1992, 1, 1), end=date(current_year, 12, 31)
+    ) == [(date(1993, 1, 1), date(current_year, 12, 31))]
+
+
+def test_incremental_run_fetches_only_missing_ranges(temp_dir, requests_mock):
+    requests_mock.get(CalendarificClient.BASE_URL, json=_holidays_callback)
+
+    CalendarificClient(
+        values=_calendar_params(date(1992, 7, 7), date(1992, 9, 18))
+    ).run(output_dir=temp_dir)
+    assert requests_mock.call_count == 3
+
+    CalendarificClient(
+        values=_calendar_params(date(1992, 7, 7), date(1992, 10, 18))
+    ).run(output_dir=temp_dir, incremental=True)
+    assert requests_mock.call_count == 4
+
+    with open(os.path.join(temp_dir, "ua_7-7-1992_18-10-1992.txt")) as file:
+        names = [line.split('"')[3] for line in file]
+    assert names == ["Holiday 7", "Holiday 8", "Holiday 9", "Holiday 10"]
+    # Replaced by the file of the extended range
+    assert not os.path.exists(os.path.join(temp_dir, "ua_7-7-1992_18-9-1992.txt"))
+
+    CalendarificClient(
+        values=_calendar_params(date(1992, 7, 7), date(1992, 10, 18))
+    ).run(output_dir=temp_dir, incremental=True)
+    assert requests_mock.call_count == 4
+
+
+def test_incremental_run_needs_jsonl(temp_dir):
+    client = CalendarificClient(
+        values=_calendar_params(date(1992, 7, 7), date(1992, 9, 18))
+    )
+
+    with pytest.raises(ClientException):
+        client.run(output_dir=temp_dir, output_format="npy", incremental=True)
+
+
+def test_resumed_run_reuses_cached_responses(temp_dir, requests_mock):
+    def callback(request, context):
+        if request.qs.get("month") == ["9"]:
+            context.status_code = 400
+            return {"meta": {"code": 400}}
+        return _holidays_callback(request, context)
+
+    requests_mock.get(CalendarificClient.BASE_URL, json=callback)
+    cache = ResponseCache(
+        path=os.path.join(temp_dir, "cache", "responses.sqlite3"),
+        ttl={"year": 60, "month": 60, "day": 60, "past": 0},
+        max_entries=10,
+    )
+    output_dir = os.path.join(temp_dir, "output")
+    values = _calendar_params(date(1992, 7, 7), date(1992, 9, 18))
+
+    with pytest.raises(ClientException):
+        CalendarificClient(values=values, cache=cache).run(output_dir=output_dir)
+    assert requests_mock.call_count == 3
+
+    requests_mock.get(CalendarificClient.BASE_URL, json=_holidays_callback)
+    CalendarificClient(values=values, cache=cache).run(
+        output_dir=output_dir, incremental=True
+    )
+    cache.close()
+
+    # Months 7 and 8 come from the cache, instead of a new year request
+    assert requests_mock.call_count == 4
+    assert requests_mock.last_request.qs["month"] == ["9"]
+
+
+def test_incremental_run_over_a_written_sub_range(temp_dir, requests_mock):
+    requests_mock.get(CalendarificClient.BASE_URL, json=_holidays_callback)
+
+    CalendarificClient(
+        values=_calendar_params(date(1992, 1, 1), date(1992, 12, 31))
+    ).run(output_dir=temp_dir)
+    CalendarificClient(
+        values=_calendar_params(date(1992, 7, 1), date(1992, 7, 31))
+    ).run(output_dir=temp_dir, incremental=True)
+    assert requests_mock.call_count == 1
+
+    with open(os.path.join(temp_dir, "ua_1-1-1992_31-12-1992.txt")) as file:
+        assert len(file.readlines()) == 12
+    assert (
+        Manifest(output_dir=temp_dir, max_age=0).get_missing_intervals(
+            country="ua", start=date(1992, 1, 1), end=date(1992, 12, 31)
+        )
+        == []
+    )
+
+
+def test_incremental_run_over_an_overlapping_range(temp_dir, requests_mock):
+    requests_mock.get(CalendarificClient.BASE_URL, json=_holidays_callback)
+
+    CalendarificClient(
+        values=_calendar_params(date(1992, 7, 1), date(1992, 9, 30))
+    ).run(output_dir=temp_dir)
+    CalendarificClient(
+        values=_calendar_params(date(1992, 9, 1), date(1992, 11, 30))
+    ).run(output_dir=temp_dir, incremental=True)
+
+    with open(os.path.join(temp_dir, "ua_1-9-1992_30-11-1992.txt")) as file:
+        names = [line.split('"')[3] for line in file]
+    # July and August are kept from the previous file, which is then removed
+    assert names == [f"Holiday {month}" for month in range(7, 12)]
+    assert not os.path.exists(os.path.join(temp_dir, "ua_1-7-1992_30-9-1992.txt"))
+    assert (
+        Manifest(output_dir=temp_dir, max_age=0).get_missing_intervals(
+            country="ua", start=date(1992, 7, 1), end=date(1992, 11, 30)
+        )
+        == []
+    )
+
+
+def test_subtract_intervals():
+    assert subtract_intervals(
+        intervals=[
+            (date(2021, 1, 1), date(2021, 6, 30), 1.0),
+            (date(2021, 8, 1), date(2021, 8, 31), 2.0),
+        ],
+        removed=[
+            (date(2021, 3, 1), date(2021, 3, 31)),
+            (date(2021, 8, 1), date(2021, 9, 30)),
+        ],
+    ) == [
+        (date(2021, 1, 1), date(2021, 2, 28), 1.0),
+        (date(2021, 4, 1), date(2021, 6, 30), 1.0),
+    ]
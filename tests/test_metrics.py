@@ -0,0 +1,95 @@
+import json
+import tempfile
+
+from calendarific import CalendarificClient
+from metrics import Metrics
+from parameters import CalendarParams, Country, Day, EndDate, Month, StartDate, Year
+
+
+def test_metrics_counters_and_histograms():
+    metrics = Metrics()
+
+    metrics.increment("requests_total", granularity="year", status="200")
+    metrics.increment("requests_total", value=2, granularity="month", status="200")
+    metrics.observe("request_duration_seconds", value=0.02, granularity="year")
+    with metrics.time("write_duration_seconds"):
+        pass
+
+    assert metrics.get_counter("requests_total") == 3
+    assert metrics.get_counter("requests_total", granularity="month") == 2
+    histogram = metrics.to_dict()["histograms"]["request_duration_seconds"][0]
+    assert histogram["count"] == 1
+    assert histogram["buckets"][0.025] == 1
+
+
+def test_metrics_to_prometheus():
+    metrics = Metrics()
+    metrics.increment("requests_total", granularity="year", status="200")
+    metrics.observe("request_duration_seconds", value=0.02, granularity="year")
+
+    text = metrics.to_prometheus()
+
+    assert "# TYPE calendarific_requests_total counter" in text
+    assert 'calendarific_requests_total{granularity="year",status="200"} 1' in text
+    assert (
+        'calendarific_request_duration_seconds_bucket{granularity="year",le="0.01"} 0'
+        in text
+    )
+    assert (
+        'calendarific_request_duration_seconds_bucket{granularity="year",le="+Inf"} 1'
+        in text
+    )
+
+
+def test_cache_hit_ratio():
+    metrics = Metrics()
+    assert metrics.get_cache_hit_ratio() is None
+
+    metrics.increment("cache_hits_total", match="exact")
+    metrics.increment("cache_misses_total")
+
+    assert metrics.get_cache_hit_ratio() == 0.5
+
+
+def test_client_collects_metrics(requests_mock):
+    requests_mock.get(
+        CalendarificClient.BASE_URL,
+        json={
+            "meta": {"code": 200},
+            "response": {
+                "holidays": [
+                    {
+                        "name": "A",
+                        "country": {"id": "ua", "name": "Ukraine"},
+                        "date": {"iso": "1992-08-24"},
+                    },
+                    {
+                        "name": "B",
+                        "country": {"id": "ua", "name": "Ukraine"},
+                        "date": {"iso": "1992-01-01"},
+                    },
+                ]
+            },
+        },
+    )
+    client = CalendarificClient(
+        values=CalendarParams(
+            countries=[Country(value="UA")],
+            start_date=StartDate(Year(1992), Month(7), Day(7)),
+            end_date=EndDate(Year(1992), Month(9), Day(18)),
+        ),
+        responses={},
+    )
+
+    with tempfile.TemporaryDirectory() as output_dir:
+        client.run(output_dir=output_dir)
+
+    metrics = client.metrics
+    assert metrics.get_counter("requests_total", granularity="month", status="200") == 3
+    assert metrics.get_counter("holidays_kept_total") == 3
+    assert metrics.get_counter("holidays_filtered_total") == 3
+    assert metrics.get_counter("response_bytes_total") > 0
+    assert metrics.get_cache_hit_ratio() == 0
+    dump = json.loads(metrics.to_json())
+    assert dump["histograms"]["write_duration_seconds"][0]["count"] == 1
+    assert dump["histograms"]["plan_duration_seconds"][0]["count"] == 1
@@ -0,0 +1,191 @@
+import gzip
+import json
+import os
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+
+import pytest
+
+import partition
+from calendarific import CalendarificClient
+from custom_exceptions import ClientException
+from parameters import CalendarParams
+from partition import (
+    GZIP,
+    NONE,
+    PARTITIONED,
+    ZSTD,
+    PartitionWriter,
+    read_partitions,
+    resolve_compression,
+)
+
+
+def _holiday(iso_date, name="Holiday"):
+    return {"name": name, "country": {"id": "us"}, "date": {"iso": iso_date}}
+
+
+def _write(*, output_dir, holidays, bounds, compression=GZIP):
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        writer = PartitionWriter(
+            output_dir=output_dir,
+            country="US",
+            compression=compression,
+            bounds=bounds,
+            executor=executor,
+        )
+        writer.add(
+            lines=(
+                (holiday["date"]["iso"], json.dumps(holiday) + "\n")
+                for holiday in holidays
+            )
+        )
+        return writer.close()
+
+
+@pytest.fixture
+def output_dir():
+    with tempfile.TemporaryDirectory() as output_dir:
+        yield output_dir
+
+
+def test_writer_writes_one_compressed_file_per_year(output_dir):
+    holidays = [_holiday("1991-12-25"), _holiday("1992-01-01"), _holiday("1992-08-24")]
+
+    paths = _write(
+        output_dir=output_dir, holidays=holidays, bounds=("1991-01-01", "1992-12-31")
+    )
+
+    assert paths == [
+        os.path.join(output_dir, "us", "1991.jsonl.gz"),
+        os.path.join(output_dir, "us", "1992.jsonl.gz"),
+    ]
+    with gzip.open(paths[1], "rt") as file:
+        assert [json.loads(line) for line in file] == holidays[1:]
+
+
+def test_writer_keeps_holidays_outside_the_range(output_dir):
+    _write(
+        output_dir=output_dir,
+        holidays=[_holiday("1992-01-01"), _holiday("1992-08-24", name="Old")],
+        bounds=("1992-01-01", "1992-12-31"),
+        compression=NONE,
+    )
+
+    _write(
+        output_dir=output_dir,
+        holidays=[_holiday("1992-08-24", name="New")],
+        bounds=("1992-08-01", "1992-08-31"),
+    )
+
+    assert not os.path.exists(os.path.join(output_dir, "us", "1992.jsonl"))
+    assert list(
+        read_partitions(
+            output_dir=output_dir,
+            country="us",
+            start_date=date(1992, 1, 1),
+            end_date=date(1992, 12, 31),
+        )
+    ) == [_holiday("1992-01-01"), _holiday("1992-08-24", name="New")]
+
+
+def test_writer_removes_stale_holidays_of_empty_years(output_dir):
+    _write(
+        output_dir=output_dir,
+        holidays=[_holiday("1992-08-24")],
+        bounds=("1992-01-01", "1992-12-31"),
+    )
+
+    paths = _write(
+        output_dir=output_dir, holidays=[], bounds=("1992-01-01", "1992-12-31")
+    )
+
+    assert paths == []
+    assert os.listdir(os.path.join(output_dir, "us")) == []
+
+
+def test_read_partitions_opens_only_the_needed_years(output_dir, monkeypatch):
+    holidays = [_holiday(f"{year}-07-04") for year in range(1990, 2000)]
+    _write(
+        output_dir=output_dir, holidays=holidays, bounds=("1990-01-01", "1999-12-31")
+    )
+    read_paths = []
+    read_partition_lines = partition.read_partition_lines
+
+    def spy(*, path):
+        read_paths.append(os.path.basename(path))
+        return read_partition_lines(path=path)
+
+    monkeypatch.setattr(partition, "read_partition_lines", spy)
+
+    result = list(
+        read_partitions(
+            output_dir=output_dir,
+            country="US",
+            start_date=date(1994, 7, 5),
+            end_date=date(1995, 12, 31),
+        )
+    )
+
+    assert result == [_holiday("1995-07-04")]
+    assert read_paths == ["1994.jsonl.gz", "1995.jsonl.gz"]
+
+
+def test_resolve_compression(monkeypatch):
+    assert resolve_compression(compression=GZIP) == GZIP
+    with pytest.raises(ClientException):
+        resolve_compression(compression="brotli")
+
+    monkeypatch.setattr(partition, "_import_zstandard", lambda: None)
+    assert resolve_compression(compression=ZSTD) == GZIP
+
+
+def test_client_writes_partitioned_layout(output_dir, requests_mock):
+    def callback(request, context):
+        year = request.qs["year"][0]
+        holidays = [_holiday(f"{year}-01-01"), _holiday(f"{year}-12-25")]
+        return {"meta": {"code": 200}, "response": {"holidays": holidays}}
+
+    requests_mock.get(CalendarificClient.BASE_URL, json=callback)
+    client = CalendarificClient(
+        values=CalendarParams.from_dates(
+            countries=["us"], start_date=date(1991, 6, 1), end_date=date(1993, 12, 31)
+        )
+    )
+
+    client.run(output_dir=output_dir, layout=PARTITIONED, compression=GZIP)
+
+    assert sorted(os.listdir(os.path.join(output_dir, "us"))) == [
+        "1991.jsonl.gz",
+        "1992.jsonl.gz",
+        "1993.jsonl.gz",
+    ]
+    assert [
+        holiday["date"]["iso"]
+        for holiday in read_partitions(
+            output_dir=output_dir,
+            country="us",
+            start_date=date(1991, 1, 1),
+            end_date=date(1993, 12, 31),
+        )
+    ] == ["1991-12-25", "1992-01-01", "1992-12-25", "1993-01-01", "1993-12-25"]
+
+
+@pytest.mark.parametrize(
+    "options",
+    [
+        {"layout": "nested"},
+        {"layout": PARTITIONED, "incremental": True},
+        {"compression": GZIP},
+    ],
+)
+def test_client_rejects_invalid_layout_options(output_dir, options):
+    client = CalendarificClient(
+        values=CalendarParams.from_dates(
+            countries=["us"], start_date=date(1992, 1, 1), end_date=date(1992, 12, 31)
+        )
+    )
+
+    with pytest.raises(ClientException):
+        client.run(output_dir=output_dir, **options)
@@ -0,0 +1,102 @@
+from datetime import datetime
+
+import pytest
+
+from calendarific import CalendarificClient
+from custom_exceptions import InvalidInputData
+from parameters import CalendarParams, Country, Day, EndDate, Month, StartDate, Year
+from planner import AUTO, MIN_CALLS, plan_periods, summarize_plan
+
+
+@pytest.mark.parametrize(
+    "start_date, end_date, expected_periods",
+    [
+        (
+            datetime(2021, 1, 30),
+            datetime(2021, 2, 1),
+            [
+                {"year": 2021, "month": 1, "day": 30},
+                {"year": 2021, "month": 1, "day": 31},
+                {"year": 2021, "month": 2, "day": 1},
+            ],
+        ),
+        (
+            datetime(2021, 11, 7),
+            datetime(2022, 1, 18),
+            [
+                {"year": 2021, "month": 11, "day": None},
+                {"year": 2021, "month": 12, "day": None},
+                {"year": 2022, "month": 1, "day": None},
+            ],
+        ),
+        (
+            datetime(1800, 1, 1),
+            datetime(2049, 12, 31),
+            [{"year": year, "month": None, "day": None} for year in range(1800, 2050)],
+        ),
+    ],
+)
+def test_plan_periods_auto(start_date, end_date, expected_periods):
+    assert (
+        plan_periods(start_date=start_date, end_date=end_date, strategy=AUTO)
+        == expected_periods
+    )
+
+
+def test_plan_periods_min_calls():
+    periods = plan_periods(
+        start_date=datetime(1991, 12, 31),
+        end_date=datetime(1993, 1, 15),
+        strategy=MIN_CALLS,
+    )
+
+    assert periods == [
+        {"year": 1991, "month": 12, "day": 31},
+        {"year": 1992, "month": None, "day": None},
+        {"year": 1993, "month": 1, "day": None},
+    ]
+
+
+def test_plan_periods_invalid_strategy():
+    with pytest.raises(InvalidInputData):
+        plan_periods(
+            start_date=datetime(2021, 1, 1),
+            end_date=datetime(2021, 1, 1),
+            strategy="unknown",
+        )
+
+
+def test_summarize_plan():
+    params = [
+        {"country": "us", "year": 2021, "month": None, "day": None},
+        {"country": "us", "year": 2022, "month": 1, "day": None},
+        {"country": "us", "year": 2022, "month": 2, "day": None},
+    ]
+
+    assert summarize_plan(params=params) == {
+        "requests": 3,
+        "year": 1,
+        "month": 2,
+        "day": 0,
+    }
+
+
+def test_client_plan_summary_counts_local_responses():
+    calendar_params = CalendarParams(
+        countries=[Country(value="US"), Country(value="GB")],
+        start_date=StartDate(Year(1992), Month(7), Day(7)),
+        end_date=EndDate(Year(1992), Month(9), Day(18)),
+    )
+    client = CalendarificClient(
+        values=calendar_params,
+        responses={'{"country": "us", "year": 1992}': {}},
+    )
+
+    assert client.get_plan_summary() == {
+        "requests": 6,
+        "year": 0,
+        "month": 6,
+        "day": 0,
+        "cached": 3,
+        "quota_cost": 3,
+    }
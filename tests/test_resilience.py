@@ -0,0 +1,255 @@
+import os
+import tempfile
+import threading
+import time
+from datetime import date
+from types import SimpleNamespace
+
+import pytest
+
+from cache import ResponseCache
+from calendarific import AsyncCalendarificClient, CalendarificClient
+from custom_exceptions import CircuitOpenException, ClientException, DeadlineException
+from metrics import Metrics
+from parameters import CalendarParams
+from resilience import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, Hedger
+from transport import Transport
+from scheduler import RequestScheduler
+
+HOLIDAYS = [{"name": "Independence Day", "date": {"iso": "1992-08-24"}}]
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_breaker_opens_after_failures_and_closes_after_trial():
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=10, clock=clock)
+
+    assert not breaker.record(failed=True)
+    assert breaker.record(failed=True)
+    assert breaker.state == OPEN
+    assert not breaker.allow()
+
+    clock.now = 10
+    assert breaker.allow()
+    assert breaker.state == HALF_OPEN
+    # A single trial request at a time
+    assert not breaker.allow()
+
+    breaker.record(failed=False)
+    assert breaker.state == CLOSED
+    assert breaker.allow()
+
+
+def test_breaker_reopens_when_trial_fails():
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_threshold=5, reset_timeout=10, clock=clock)
+    for _ in range(5):
+        breaker.record(failed=True)
+
+    clock.now = 10
+    assert breaker.allow()
+    assert breaker.record(failed=True)
+    assert breaker.state == OPEN
+    assert not breaker.allow()
+
+
+def test_hedger_returns_the_first_response():
+    release = threading.Event()
+    calls = []
+
+    def send():
+        calls.append(None)
+        if len(calls) == 1:
+            release.wait(timeout=5)
+            return "slow"
+        return "fast"
+
+    hedger = Hedger(delay=0.01)
+    metrics = Metrics()
+    try:
+        assert hedger.send(send=send, metrics=metrics) == "fast"
+    finally:
+        release.set()
+        hedger.close()
+
+    assert metrics.get_counter("hedged_requests_total") == 1
+    assert metrics.get_counter("hedge_wins_total") == 1
+
+
+def test_hedger_delay_follows_recent_latencies():
+    hedger = Hedger(delay=1.0, percentile=0.9, min_samples=10)
+    for latency in range(10):
+        hedger.latencies.observe(latency / 10)
+
+    assert hedger.get_delay() == pytest.approx(0.9)
+
+
+def test_hedger_stops_at_the_deadline():
+    release = threading.Event()
+    hedger = Hedger(enabled=False)
+    try:
+        with pytest.raises(DeadlineException):
+            hedger.send(
+                send=lambda: release.wait(timeout=5),
+                deadline_at=time.monotonic() + 0.05,
+            )
+    finally:
+        release.set()
+        hedger.close()
+
+
+@pytest.fixture
+def cache():
+    with tempfile.TemporaryDirectory() as temp_dir:
+        response_cache = ResponseCache(
+            path=os.path.join(temp_dir, "responses.sqlite3"),
+            ttl={"year": 60, "month": 60, "day": 60, "past": 60},
+            max_entries=10,
+        )
+        yield response_cache
+        response_cache.close()
+
+
+def _get_client(**kwargs):
+    scheduler = RequestScheduler(
+        rate=0,
+        burst=1,
+        max_concurrency=1,
+        max_retries=0,
+        backoff_base=1,
+        backoff_max=1,
+        latency_threshold=5,
+    )
+    kwargs.setdefault("breaker", CircuitBreaker(failure_threshold=1))
+
+    return CalendarificClient(
+        values=CalendarParams.from_dates(
+            countries=["ua"], start_date=date(1992, 1, 1), end_date=date(1992, 12, 31)
+        ),
+        scheduler=scheduler,
+        hedger=Hedger(enabled=False),
+        deadline=0,
+        **kwargs,
+    )
+
+
+def test_client_falls_back_to_stale_cached_response(cache, requests_mock, monkeypatch):
+    requests_mock.get(
+        CalendarificClient.BASE_URL,
+        json={"meta": {"code": 200}, "response": {"holidays": HOLIDAYS}},
+    )
+    assert list(_get_client(cache=cache).get_data()) == [HOLIDAYS]
+
+    monkeypatch.setattr("cache.time.time", lambda: 10**12)
+    requests_mock.get(CalendarificClient.BASE_URL, status_code=503)
+    client = _get_client(cache=cache)
+
+    assert list(client.get_data()) == [HOLIDAYS]
+    assert client.metrics.get_counter("fallback_responses_total", source="stale") == 1
+    assert client.metrics.get_counter("circuit_opened_total") == 1
+    assert len(client.degraded_params) == 1
+
+
+def test_client_fails_fast_while_the_circuit_is_open(requests_mock):
+    requests_mock.get(CalendarificClient.BASE_URL, status_code=503)
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=60)
+    client = _get_client(breaker=breaker)
+
+    with pytest.raises(ClientException):
+        list(client.get_data())
+    with pytest.raises(CircuitOpenException):
+        list(client.get_data())
+
+    assert requests_mock.call_count == 1
+    assert client.metrics.get_counter("circuit_rejected_total") == 1
+
+
+def test_client_allows_partial_results(requests_mock):
+    requests_mock.get(CalendarificClient.BASE_URL, status_code=503)
+    client = _get_client(allow_partial=True)
+
+    assert list(client.get_data()) == [[]]
+    assert client.metrics.get_counter("fallback_responses_total", source="partial") == 1
+
+
+def test_client_counts_exceeded_deadlines(requests_mock):
+    requests_mock.get(
+        CalendarificClient.BASE_URL, status_code=503, headers={"Retry-After": "10"}
+    )
+    scheduler = RequestScheduler(
+        rate=0,
+        burst=1,
+        max_concurrency=1,
+        max_retries=3,
+        backoff_base=1,
+        backoff_max=1,
+        latency_threshold=5,
+    )
+    client = CalendarificClient(
+        values=CalendarParams.from_dates(
+            countries=["ua"], start_date=date(1992, 1, 1), end_date=date(1992, 12, 31)
+        ),
+        scheduler=scheduler,
+        deadline=1,
+    )
+
+    with pytest.raises(DeadlineException):
+        list(client.get_data())
+
+    assert requests_mock.call_count == 1
+    assert (
+        client.metrics.get_counter(
+            "request_deadline_exceeded_total", granularity="year"
+        )
+        == 1
+    )
+
+
+class SlowTransport(Transport):
+    def __init__(self, *, latency):
+        self.latency = latency
+
+    def get(self, *, url, params, headers=None):
+        time.sleep(self.latency)
+        body = b'{"meta": {"code": 200}, "response": {"holidays": []}}'
+        return SimpleNamespace(status_code=200, headers={}, content=body)
+
+
+def test_client_hedger_fits_concurrency_above_default_workers():
+    concurrency = 64
+    client = AsyncCalendarificClient(
+        values=CalendarParams.from_dates(
+            countries=["ua"], start_date=date(1950, 1, 1), end_date=date(2013, 12, 31)
+        ),
+        concurrency=concurrency,
+        scheduler=RequestScheduler(
+            rate=0,
+            burst=1,
+            max_concurrency=concurrency,
+            max_retries=0,
+            backoff_base=1,
+            backoff_max=1,
+            latency_threshold=5,
+        ),
+        transport=SlowTransport(latency=0.4),
+        deadline=0.6,
+    )
+
+    assert len(list(client.get_data())) == 1
+    assert (
+        client.metrics.get_counter("requests_total", granularity="year", status="200")
+        == 64
+    )
+    assert (
+        client.metrics.get_counter(
+            "request_deadline_exceeded_total", granularity="year"
+        )
+        == 0
+    )
@@ -0,0 +1,135 @@
+from types import SimpleNamespace
+
+import pytest
+
+from calendarific import CalendarificClient
+from custom_exceptions import ClientException
+from parameters import CalendarParams, Country, Day, EndDate, Month, StartDate, Year
+from scheduler import AdaptiveLimiter, RequestScheduler, TokenBucket
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def scheduler(clock):
+    return RequestScheduler(
+        rate=0,
+        burst=1,
+        max_concurrency=4,
+        max_retries=2,
+        backoff_base=1,
+        backoff_max=8,
+        latency_threshold=5,
+        clock=clock,
+        sleep=clock.sleep,
+    )
+
+
+def _response(status_code, **headers):
+    return SimpleNamespace(status_code=status_code, headers=headers)
+
+
+def test_token_bucket_limits_rate(clock):
+    bucket = TokenBucket(rate=2, capacity=2, clock=clock, sleep=clock.sleep)
+
+    for _ in range(4):
+        bucket.acquire()
+
+    assert clock.now == pytest.approx(1.0)
+
+
+def test_token_bucket_pause(clock):
+    bucket = TokenBucket(rate=0, capacity=1, clock=clock, sleep=clock.sleep)
+
+    bucket.pause(seconds=3)
+    bucket.acquire()
+
+    assert clock.now == pytest.approx(3.0)
+
+
+def test_adaptive_limiter():
+    limiter = AdaptiveLimiter(max_concurrency=8, latency_threshold=1)
+
+    limiter.acquire()
+    limiter.release(latency=0.1, failed=True)
+    assert limiter.limit == 4
+
+    limiter.acquire()
+    limiter.release(latency=2, failed=False)
+    assert limiter.limit == 2
+
+    for _ in range(2):
+        limiter.acquire()
+        limiter.release(latency=0.1, failed=False)
+    assert limiter.limit == 3
+
+
+def test_scheduler_honours_retry_after(scheduler, clock):
+    responses = iter([_response(429, **{"Retry-After": "7"}), _response(200)])
+
+    response = scheduler.run(send=lambda: next(responses))
+
+    assert response.status_code == 200
+    assert clock.sleeps == [7.0]
+
+
+def test_scheduler_backs_off_with_jitter(scheduler, clock):
+    response = scheduler.run(send=lambda: _response(503))
+
+    assert response.status_code == 503
+    assert len(clock.sleeps) == 2
+    assert 0 <= clock.sleeps[0] <= 1
+    assert 0 <= clock.sleeps[1] <= 2
+
+
+def test_scheduler_pauses_when_rate_limit_is_exhausted(scheduler, clock):
+    scheduler.run(
+        send=lambda: _response(
+            200, **{"X-RateLimit-Remaining": "0", "X-RateLimit-Reset": "4"}
+        )
+    )
+    scheduler.bucket.acquire()
+
+    assert scheduler.remaining_quota == 0
+    assert clock.now == pytest.approx(4.0)
+
+
+def test_client_retries_throttled_requests(scheduler, requests_mock):
+    calendar_params = CalendarParams(
+        countries=[Country(value="US")],
+        start_date=StartDate(Year(2021), Month(1), Day(1)),
+        end_date=EndDate(Year(2021), Month(12), Day(31)),
+    )
+    client = CalendarificClient(values=calendar_params, scheduler=scheduler)
+    mocked_response = {"meta": {"code": 200}, "response": {"holidays": []}}
+    requests_mock.get(
+        client.BASE_URL,
+        [
+            {"status_code": 429, "headers": {"Retry-After": "1"}},
+            {"status_code": 200, "json": mocked_response},
+        ],
+    )
+
+    assert client._request(url=client.api_url, params={}) == mocked_response
+
+    requests_mock.get(client.BASE_URL, status_code=500)
+
+    with pytest.raises(ClientException):
+        client._request(url=client.api_url, params={})
+    assert requests_mock.call_count == 5
@@ -0,0 +1,199 @@
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+
+import pytest
+import requests
+
+from calendarific import CalendarificClient
+from service import HolidayService, LRUCache, RequestCoalescer, create_server
+
+HOLIDAYS = [
+    {"name": "New Year's Day", "country": {"id": "us"}, "date": {"iso": "2024-01-01"}},
+    {
+        "name": "Independence Day",
+        "country": {"id": "us"},
+        "date": {"iso": "2024-07-04"},
+    },
+]
+
+
+@pytest.fixture
+def upstream(requests_mock):
+    calls = []
+
+    def callback(request, context):
+        calls.append(request.qs)
+        time.sleep(0.05)
+        return {"meta": {"code": 200}, "response": {"holidays": HOLIDAYS}}
+
+    requests_mock.get(CalendarificClient.BASE_URL, json=callback)
+
+    return calls
+
+
+def test_lru_cache_evicts_least_recently_used():
+    cache = LRUCache(max_entries=2)
+    cache["a"] = 1
+    cache["b"] = 2
+    assert cache["a"] == 1
+
+    cache["c"] = 3
+
+    assert "b" not in cache
+    assert dict(cache) == {"a": 1, "c": 3}
+
+
+def test_lru_cache_expires_entries():
+    now = [0.0]
+    cache = LRUCache(max_entries=2, ttl=10, clock=lambda: now[0])
+    cache["a"] = 1
+
+    now[0] = 11
+
+    assert cache.get("a") is None
+    assert len(cache) == 0
+
+
+def test_coalescer_runs_concurrent_calls_once():
+    coalescer = RequestCoalescer()
+    started = threading.Event()
+    calls = []
+
+    def fetch():
+        calls.append(1)
+        started.set()
+        time.sleep(0.05)
+        return "response"
+
+    with ThreadPoolExecutor(max_workers=10) as executor:
+        leader = executor.submit(coalescer.run, key="us", fetch=fetch)
+        started.wait()
+        followers = [
+            executor.submit(coalescer.run, key="us", fetch=fetch) for _ in range(9)
+        ]
+        results = [leader.result()] + [future.result() for future in followers]
+
+    assert len(calls) == 1
+    assert results == [("response", False)] + [("response", True)] * 9
+
+
+def test_coalescer_shares_errors():
+    coalescer = RequestCoalescer()
+
+    def fetch():
+        raise ValueError("boom")
+
+    with pytest.raises(ValueError):
+        coalescer.run(key="us", fetch=fetch)
+    # The failed call is not remembered
+    assert coalescer.run(key="us", fetch=lambda: 1) == (1, False)
+
+
+def test_service_burst_sends_one_upstream_request(upstream):
+    service = HolidayService()
+
+    with ThreadPoolExecutor(max_workers=100) as executor:
+        answers = list(
+            executor.map(
+                lambda _: service.query(
+                    countries=["US"],
+                    start_date=date(2024, 1, 1),
+                    end_date=date(2024, 12, 31),
+                ),
+                range(100),
+            )
+        )
+
+    assert len(upstream) == 1
+    assert len(set(answers)) == 1
+    assert json.loads(answers[0]) == {"holidays": {"us": HOLIDAYS}}
+
+
+def test_service_answers_from_memory(upstream):
+    service = HolidayService()
+    query = {
+        "countries": ["us"],
+        "start_date": date(2024, 7, 1),
+        "end_date": date(2024, 7, 31),
+    }
+    service.query(
+        countries=["us"], start_date=date(2024, 1, 1), end_date=date(2024, 12, 31)
+    )
+
+    answer = service.query(**query)
+    started_at = time.perf_counter()
+    for _ in range(1000):
+        service.query(**query)
+    elapsed = (time.perf_counter() - started_at) / 1000
+
+    assert len(upstream) == 1
+    assert json.loads(answer) == {"holidays": {"us": HOLIDAYS[1:]}}
+    assert elapsed < 0.001
+    assert service.metrics.get_counter("queries_total", source="memory") == 1000
+
+
+def test_server_endpoints(upstream, requests_mock):
+    # Only the upstream API is mocked, requests to the service are real
+    requests_mock.real_http = True
+    server = create_server(service=HolidayService(), host="127.0.0.1", port=0)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    host, port = server.server_address
+    url = f"http://{host}:{port}"
+
+    try:
+        ok = requests.get(
+            f"{url}/holidays",
+            params={"countries": "us", "start": "2024-01-01", "end": "2024-12-31"},
+        )
+        invalid = requests.get(
+            f"{url}/holidays",
+            params={"countries": "usa", "start": "2024-01-01", "end": "2024-12-31"},
+        )
+        metrics = requests.get(f"{url}/metrics")
+        missing = requests.get(f"{url}/unknown")
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    assert ok.status_code == 200
+    assert ok.json() == {"holidays": {"us": HOLIDAYS}}
+    assert invalid.status_code == 400
+    assert "error" in invalid.json()
+    assert metrics.status_code == 200
+    assert 'calendarific_queries_total{source="client"} 1' in metrics.text
+    assert missing.status_code == 404
+
+
+def _serve(*, service):
+    server = create_server(service=service, host="127.0.0.1", port=0)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    host, port = server.server_address
+
+    return server, f"http://{host}:{port}/holidays"
+
+
+def test_server_reports_upstream_errors(requests_mock, monkeypatch):
+    requests_mock.real_http = True
+    # A response without meta
+    requests_mock.get(CalendarificClient.BASE_URL, json={"response": {}})
+    service = HolidayService()
+    server, url = _serve(service=service)
+    params = {"countries": "us", "start": "2024-01-01", "end": "2024-12-31"}
+
+    try:
+        malformed = requests.get(url, params=params)
+        monkeypatch.setattr(service, "query", lambda **kwargs: 1 / 0, raising=False)
+        broken = requests.get(url, params=params)
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    assert malformed.status_code == 502
+    assert malformed.json() == {"error": "Upstream error"}
+    assert broken.status_code == 500
+    assert broken.json() == {"error": "Internal error"}
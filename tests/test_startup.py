@@ -0,0 +1,73 @@
+import os
+import subprocess
+import sys
+
+import config
+from logger import logger, setup_logging, stop_logging
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Cumulative cold import time of the client module, in microseconds
+IMPORT_BUDGET = 150_000
+# Only needed once a request is sent, an async run starts or .env is read
+DEFERRED_MODULES = ("requests", "urllib3", "asyncio", "dotenv", "email.utils", "orjson")
+
+
+def _get_import_times(*, module: str) -> dict[str, int]:
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT_DIR,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    import_times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.split("|")
+        import_times[name.strip()] = int(cumulative)
+
+    return import_times
+
+
+def test_client_import_defers_heavy_modules():
+    import_times = _get_import_times(module="calendarific")
+
+    assert not set(DEFERRED_MODULES) & set(import_times)
+    assert import_times["calendarific"] < IMPORT_BUDGET
+
+
+def test_config_is_loaded_on_first_access(monkeypatch):
+    monkeypatch.setenv("MAX_RETRIES", "3")
+    result = subprocess.run(
+        [
+            sys.executable,
+            "-c",
+            "import sys, config; loaded = 'dotenv' in sys.modules; "
+            "print(loaded, config.MAX_RETRIES, 'dotenv' in sys.modules)",
+        ],
+        cwd=ROOT_DIR,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+    assert result.stdout.split() == ["False", "3", "True"]
+
+
+def test_config_keeps_assigned_values(monkeypatch):
+    monkeypatch.setattr(config, "_loaded", False)
+    monkeypatch.setattr(config, "OUTPUT_DIR", "/tmp/holidays", raising=False)
+
+    config.load()
+
+    assert config.OUTPUT_DIR == "/tmp/holidays"
+
+
+def test_setup_logging_adds_queue_handler_once():
+    setup_logging()
+    setup_logging()
+
+    assert len(logger.handlers) == 1
+    stop_logging()
+    assert logger.handlers == []
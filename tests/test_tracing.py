@@ -0,0 +1,78 @@
+import json
+import os
+import tempfile
+
+from calendarific import CalendarificClient
+from parameters import CalendarParams, Country, Day, EndDate, Month, StartDate, Year
+from tracing import NULL_TRACER, Tracer
+
+
+def test_tracer_records_complete_events():
+    tracer = Tracer()
+
+    with tracer.span("UA", category="country", size=3):
+        pass
+
+    (event,) = tracer.to_chrome_trace()["traceEvents"]
+    assert event["name"] == "UA"
+    assert event["cat"] == "country"
+    assert event["ph"] == "X"
+    assert event["dur"] >= 0
+    assert event["args"] == {"size": "3"}
+
+
+def test_tracer_records_span_on_error():
+    tracer = Tracer()
+
+    try:
+        with tracer.span("request", category="request"):
+            raise ValueError
+    except ValueError:
+        pass
+
+    assert len(tracer.events) == 1
+
+
+def test_null_tracer_records_nothing():
+    with NULL_TRACER.span("request", category="request"):
+        pass
+
+
+def test_client_trace_covers_pipeline_stages(requests_mock):
+    requests_mock.get(
+        CalendarificClient.BASE_URL,
+        json={
+            "meta": {"code": 200},
+            "response": {
+                "holidays": [
+                    {
+                        "name": "A",
+                        "country": {"id": "ua", "name": "Ukraine"},
+                        "date": {"iso": "1992-08-24"},
+                    }
+                ]
+            },
+        },
+    )
+    tracer = Tracer()
+    client = CalendarificClient(
+        values=CalendarParams(
+            countries=[Country(value="UA")],
+            start_date=StartDate(Year(1992), Month(1), Day(1)),
+            end_date=EndDate(Year(1992), Month(12), Day(31)),
+        ),
+        tracer=tracer,
+    )
+
+    with tempfile.TemporaryDirectory() as output_dir:
+        client.run(output_dir=output_dir)
+        trace_path = os.path.join(output_dir, "trace.json")
+        tracer.write(path=trace_path)
+        with open(trace_path) as file:
+            trace = json.load(file)
+
+    names = {event["name"] for event in trace["traceEvents"]}
+    assert {"plan", "UA", "request", "decode", "filter", "write"} <= names
+    request = next(e for e in trace["traceEvents"] if e["name"] == "request")
+    assert request["args"]["granularity"] == "year"
+    assert "api_key" not in request["args"]
@@ -0,0 +1,119 @@
+import json
+import tempfile
+from types import SimpleNamespace
+
+import pytest
+import requests
+
+from benchmarks.server import FakeCalendarificServer
+from calendarific import CalendarificClient, get_default_transport
+from custom_exceptions import ClientException
+from parameters import CalendarParams, Country, Day, EndDate, Month, StartDate, Year
+from transport import RequestsTransport, Transport
+
+VALUES = CalendarParams(
+    countries=[Country(value="UA"), Country(value="GB"), Country(value="US")],
+    start_date=StartDate(Year(1992), Month(1), Day(1)),
+    end_date=EndDate(Year(1992), Month(12), Day(31)),
+)
+
+
+def test_requests_transport_session():
+    transport = RequestsTransport(pool_maxsize=16, connect_timeout=2, read_timeout=7)
+    adapter = transport.session.get_adapter("https://calendarific.com")
+
+    assert transport.session.headers["Accept"] == "application/json"
+    assert "gzip" in transport.session.headers["Accept-Encoding"]
+    assert transport.session.headers["User-Agent"].startswith("calendarific-client/")
+    assert adapter._pool_maxsize == 16
+    assert transport.timeout == (2, 7)
+
+
+def test_default_transport_pool_fits_concurrency():
+    transport = get_default_transport(max_connections=64)
+    adapter = transport.session.get_adapter("https://calendarific.com")
+
+    assert adapter._pool_maxsize == 64
+
+
+def test_requests_transport_sends_timeout(requests_mock):
+    requests_mock.get(CalendarificClient.BASE_URL, json={})
+
+    RequestsTransport(connect_timeout=2, read_timeout=7).get(
+        url=CalendarificClient.BASE_URL, params={"country": "ua"}
+    )
+
+    assert requests_mock.last_request.timeout == (2, 7)
+
+
+def test_requests_transport_wraps_errors(requests_mock):
+    requests_mock.get(CalendarificClient.BASE_URL, exc=requests.ConnectTimeout)
+
+    with pytest.raises(ClientException):
+        RequestsTransport().get(url=CalendarificClient.BASE_URL, params={})
+
+
+def test_requests_transport_hides_api_key(requests_mock):
+    requests_mock.get(
+        CalendarificClient.BASE_URL,
+        exc=requests.ConnectionError(
+            "Max retries exceeded with url: /api/v2/holidays?api_key=SECRET&year=1992"
+        ),
+    )
+
+    with pytest.raises(ClientException) as error:
+        RequestsTransport().get(url=CalendarificClient.BASE_URL, params={})
+
+    assert "SECRET" not in str(error.value)
+    assert "api_key=***&year=1992" in str(error.value)
+    assert error.value.__suppress_context__
+
+
+def test_read_timeout_fails_hung_request():
+    with FakeCalendarificServer(latency=0.5) as server:
+        transport = RequestsTransport(read_timeout=0.05)
+
+        with pytest.raises(ClientException):
+            transport.get(url=server.url, params={"country": "ua", "year": 1992})
+
+
+def test_client_reuses_connection_and_accepts_gzip():
+    with FakeCalendarificServer(holidays_per_year=200) as server:
+
+        class LocalClient(CalendarificClient):
+            BASE_URL = server.url
+
+        client = LocalClient(values=VALUES)
+        with tempfile.TemporaryDirectory() as output_dir:
+            client.run(output_dir=output_dir)
+
+    assert server.requests == 3
+    assert server.connections == 1
+    assert server.bytes_sent < client.metrics.get_counter("response_bytes_total") / 4
+
+
+def test_client_uses_custom_transport():
+    class StaticTransport(Transport):
+        def __init__(self) -> None:
+            self.calls = []
+
+        def get(self, *, url, params, headers=None):
+            self.calls.append(params)
+            body = {"meta": {"code": 200}, "response": {"holidays": []}}
+            return SimpleNamespace(
+                status_code=200, headers={}, content=json.dumps(body).encode()
+            )
+
+    transport = StaticTransport()
+    client = CalendarificClient(values=VALUES, transport=transport)
+
+    assert list(client.get_data()) == [[], [], []]
+    assert [str(params["country"]) for params in transport.calls] == ["UA", "GB", "US"]
+
+
+def test_transport_requires_get():
+    class IncompleteTransport(Transport):
+        pass
+
+    with pytest.raises(TypeError):
+        IncompleteTransport()
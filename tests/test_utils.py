@@ -1,7 +1,7 @@
 from datetime import datetime
 
 import pytest
-from utils import get_clean_dict, parse_date
+from utils import filter_by_date, get_clean_dict, get_iso_date, parse_date
 
 
 @pytest.mark.parametrize(
@@ -40,3 +40,23 @@ def test_parse_date(date_string, expected_date):
     parsed_date = parse_date(iso_date=date_string)
 
     assert parsed_date == expected_date
+
+
+def test_get_iso_date():
+    assert get_iso_date(date=datetime(1800, 7, 4)) == "1800-07-04"
+
+
+def test_filter_by_date():
+    holidays = [
+        {"name": "A", "date": {"iso": "2021-02-28"}},
+        {"name": "B", "date": {"iso": "2021-03-01T23:59:59"}},
+        {"name": "C", "date": {"iso": "2021-10-01"}},
+        {"name": "D", "date": {"iso": "2021-10-02T00:00:00-04:00"}},
+    ]
+
+    result = filter_by_date(
+        holidays=holidays, start_date="2021-03-01", end_date="2021-10-01"
+    )
+
+    assert [holiday["name"] for holiday in result] == ["B", "C"]
+    assert len(holidays) == 4
@@ -0,0 +1,93 @@
+import os
+import tempfile
+
+import pytest
+
+from writer import FILE_MODE, HASHES_FILE_NAME, AtomicFileWriter, ContentHashes
+
+
+@pytest.fixture
+def temp_dir():
+    with tempfile.TemporaryDirectory() as temp_dir:
+        yield temp_dir
+
+
+def test_atomic_file_writer_commits(temp_dir):
+    path = os.path.join(temp_dir, "us.txt")
+
+    with AtomicFileWriter(path=path) as writer:
+        writer.write_lines(["a\n", "b\n"])
+
+        assert not os.path.exists(path)
+
+    with open(path) as file:
+        assert file.read() == "a\nb\n"
+    assert os.listdir(temp_dir) == ["us.txt"]
+
+
+def test_atomic_file_writer_leaves_umask_alone(temp_dir, monkeypatch):
+    def umask(mask):
+        raise AssertionError("The umask is shared by all threads")
+
+    monkeypatch.setattr(os, "umask", umask)
+    path = os.path.join(temp_dir, "us.txt")
+
+    with AtomicFileWriter(path=path) as writer:
+        writer.write_lines(["a\n"])
+
+    assert os.stat(path).st_mode & 0o777 == FILE_MODE
+
+
+def test_atomic_file_writer_keeps_previous_file_on_error(temp_dir):
+    path = os.path.join(temp_dir, "us.txt")
+    with open(path, "w") as file:
+        file.write("previous\n")
+
+    with pytest.raises(RuntimeError):
+        with AtomicFileWriter(path=path) as writer:
+            writer.write_lines(["partial\n"])
+            raise RuntimeError
+
+    with open(path) as file:
+        assert file.read() == "previous\n"
+    assert os.listdir(temp_dir) == ["us.txt"]
+
+
+def test_atomic_file_writer_skips_unchanged_content(temp_dir):
+    path = os.path.join(temp_dir, "us.txt")
+    hashes = ContentHashes(output_dir=temp_dir)
+    with AtomicFileWriter(path=path, hashes=hashes) as writer:
+        writer.write_lines(["a\n"])
+    hashes.save()
+    mtime = os.stat(path).st_mtime_ns
+
+    hashes = ContentHashes(output_dir=temp_dir)
+    with AtomicFileWriter(path=path, hashes=hashes) as writer:
+        writer.write_lines(["a\n"])
+
+    assert not writer.changed
+    assert os.stat(path).st_mtime_ns == mtime
+    assert sorted(os.listdir(temp_dir)) == [HASHES_FILE_NAME, "us.txt"]
+
+    with AtomicFileWriter(path=path, hashes=hashes) as writer:
+        writer.file.write("b\n")
+
+    assert writer.changed
+    with open(path) as file:
+        assert file.read() == "b\n"
+
+
+def test_atomic_file_writer_rewrites_edited_file(temp_dir):
+    path = os.path.join(temp_dir, "us.txt")
+    hashes = ContentHashes(output_dir=temp_dir)
+    with AtomicFileWriter(path=path, hashes=hashes) as writer:
+        writer.write_lines(["a\n"])
+
+    with open(path, "w") as file:
+        file.write("edited\n")
+    with AtomicFileWriter(path=path, hashes=hashes) as writer:
+        writer.write_lines(["a\n"])
+
+    assert writer.changed
+    with open(path) as file:
+        assert file.read() == "a\n"
@@ -0,0 +1,58 @@
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from typing import Any, ContextManager, Iterator
+
+
+class Tracer:
+    """
+    Records one span per pipeline stage as Chrome trace events.
+
+    The written file can be opened in ``chrome://tracing`` or Perfetto.
+    """
+
+    def __init__(self) -> None:
+        self.events: list[dict[str, Any]] = []
+        self._lock = threading.Lock()
+        self._pid = os.getpid()
+
+    @contextmanager
+    def span(self, name: str, *, category: str, **args: Any) -> Iterator[None]:
+        started_at = time.perf_counter_ns()
+        try:
+            yield
+        finally:
+            event = {
+                "name": name,
+                "cat": category,
+                "ph": "X",
+                "ts": started_at / 1000,
+                "dur": (time.perf_counter_ns() - started_at) / 1000,
+                "pid": self._pid,
+                "tid": threading.get_ident(),
+                "args": {key: str(value) for key, value in args.items()},
+            }
+            with self._lock:
+                self.events.append(event)
+
+    def to_chrome_trace(self) -> dict[str, Any]:
+        with self._lock:
+            return {"traceEvents": list(self.events), "displayTimeUnit": "ms"}
+
+    def write(self, *, path: str) -> None:
+        with open(path, "w") as file:
+            json.dump(self.to_chrome_trace(), file)
+
+
+class NullTracer:
+    """Tracer that records nothing, used when tracing is disabled."""
+
+    _span = nullcontext()
+
+    def span(self, name: str, *, category: str, **args: Any) -> ContextManager[None]:
+        return self._span
+
+
+NULL_TRACER = NullTracer()
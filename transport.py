@@ -0,0 +1,101 @@
+import re
+from abc import ABC, abstractmethod
+from typing import Any
+
+from custom_exceptions import ClientException
+
+USER_AGENT = "calendarific-client/0.1.0"
+DEFAULT_HEADERS = {
+    "Accept": "application/json",
+    "Accept-Encoding": "gzip, deflate",
+    "Connection": "keep-alive",
+}
+# The API key is sent in the query string, which errors quote with the URL
+API_KEY_PATTERN = re.compile(r"(api_key=)[^&\s'\"]+")
+
+
+def redact(*, text: str) -> str:
+    """Hide the API key in ``text``, e.g. the message of a failed request."""
+    return API_KEY_PATTERN.sub(r"\1***", text)
+
+
+class Transport(ABC):
+    """
+    Sends the client's HTTP GET requests.
+
+    Subclasses wrap an HTTP library. ``get`` sends ``headers`` on top of its
+    own and returns a response with ``status_code``, ``headers`` and the
+    decompressed ``content``. It raises ``ClientException`` when no response
+    was received. A transport is shared by every request of a run, so it
+    should keep its connections alive.
+    """
+
+    @abstractmethod
+    def get(
+        self,
+        *,
+        url: str,
+        params: dict[str, Any],
+        headers: dict[str, str] | None = None,
+    ) -> Any:
+        """Send a GET request and return its response."""
+
+    def close(self) -> None:
+        pass
+
+
+class RequestsTransport(Transport):
+    """
+    Transport backed by a ``requests.Session`` and urllib3 connection pools.
+
+    :param pool_connections: Number of hosts with a pool of their own.
+    :param pool_maxsize: Connections kept alive per host, this should be at
+        least the number of requests in flight.
+    :param connect_timeout: Seconds to wait for a connection.
+    :param read_timeout: Seconds to wait for the next bytes of a response.
+    """
+
+    def __init__(
+        self,
+        *,
+        pool_connections: int = 1,
+        pool_maxsize: int = 10,
+        connect_timeout: float = 5,
+        read_timeout: float = 30,
+    ) -> None:
+        import requests
+        from requests.adapters import HTTPAdapter
+
+        self.timeout = (connect_timeout, read_timeout)
+        self.session = requests.Session()
+        self.session.headers.update(
+            {
+                **DEFAULT_HEADERS,
+                "User-Agent": f"{USER_AGENT} python-requests/{requests.__version__}",
+            }
+        )
+        adapter = HTTPAdapter(
+            pool_connections=pool_connections, pool_maxsize=pool_maxsize
+        )
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def get(
+        self,
+        *,
+        url: str,
+        params: dict[str, Any],
+        headers: dict[str, str] | None = None,
+    ) -> Any:
+        import requests
+
+        try:
+            return self.session.get(
+                url=url, params=params, headers=headers, timeout=self.timeout
+            )
+        except requests.RequestException as e:
+            # Not chained, its traceback would show the URL with the API key
+            raise ClientException(f"Error: {redact(text=str(e))}") from None
+
+    def close(self) -> None:
+        self.session.close()
@@ -10,3 +10,23 @@ def parse_date(*, iso_date: str) -> datetime:
     date: list[str] = date_string.split(" ")
 
     return datetime.strptime(date[0], "%Y-%m-%d")
+
+
+def get_iso_date(*, date: datetime) -> str:
+    return date.strftime("%Y-%m-%d")
+
+
+def filter_by_date(
+    *, holidays: list[dict], start_date: str, end_date: str
+) -> list[dict]:
+    """
+    Keep the holidays dated between ``start_date`` and ``end_date`` inclusive.
+
+    ISO dates sort like the dates they represent, so the date part of each
+    holiday is compared as a string and no datetime is built.
+    """
+    return [
+        holiday
+        for holiday in holidays
+        if start_date <= holiday["date"]["iso"][:10] <= end_date
+    ]
@@ -0,0 +1,184 @@
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from typing import Iterable
+
+# Buffer size for output files, writes reach the disk in chunks of this size
+BUFFER_SIZE = 1024 * 1024
+HASHES_FILE_NAME = ".calendarific-hashes.json"
+
+
+def _get_umask() -> int:
+    # os.umask can only be read by setting it, which changes it for every
+    # thread, so it is only read once, on import
+    umask = os.umask(0)
+    os.umask(umask)
+
+    return umask
+
+
+# Mode of the written files, as ``open`` would create them
+FILE_MODE = 0o666 & ~_get_umask()
+
+
+class ContentHashes:
+    """
+    SHA-256 digests of the files written to ``output_dir``, kept in a sidecar
+    file next to them as ``{relative path: [digest, size, mtime_ns]}``.
+
+    A file is unchanged when its new content has the recorded digest and the
+    file on disk still has the recorded size and modification time, i.e. it
+    was not edited since. Changes are kept in memory until ``save``.
+    """
+
+    def __init__(self, *, output_dir: str) -> None:
+        self.output_dir = output_dir
+        self.path = os.path.join(output_dir, HASHES_FILE_NAME)
+        self.entries: dict[str, list] = {}
+        self._changed = False
+        self._lock = threading.Lock()
+
+        if os.path.exists(self.path):
+            with open(self.path) as file:
+                self.entries = json.load(file)
+
+    def is_unchanged(self, *, path: str, digest: str) -> bool:
+        with self._lock:
+            entry = self.entries.get(self._get_key(path=path))
+        if entry is None or entry[0] != digest:
+            return False
+
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return False
+
+        return [stat.st_size, stat.st_mtime_ns] == entry[1:]
+
+    def record(self, *, path: str, digest: str) -> None:
+        stat = os.stat(path)
+        with self._lock:
+            self.entries[self._get_key(path=path)] = [
+                digest,
+                stat.st_size,
+                stat.st_mtime_ns,
+            ]
+            self._changed = True
+
+    def save(self) -> None:
+        with self._lock:
+            if not self._changed:
+                return
+
+            with AtomicFileWriter(path=self.path) as writer:
+                json.dump(self.entries, writer.file, indent=2, sort_keys=True)
+            self._changed = False
+
+    def _get_key(self, *, path: str) -> str:
+        return os.path.relpath(path, self.output_dir).replace(os.sep, "/")
+
+
+class AtomicFileWriter:
+    """
+    Write a file through a temporary file in the same directory.
+
+    The temporary file replaces ``path`` only on ``commit``, so readers never
+    see a partially written file. Used as a context manager, the file is
+    committed on success and discarded when an exception is raised.
+
+    With ``hashes``, the content is hashed while it is written. A file whose
+    content did not change is left untouched, with its modification time,
+    and ``changed`` is False after the commit.
+    """
+
+    def __init__(
+        self,
+        *,
+        path: str,
+        buffer_size: int = BUFFER_SIZE,
+        binary: bool = False,
+        hashes: ContentHashes | None = None,
+    ) -> None:
+        self.path = path
+        self.buffer_size = buffer_size
+        self.binary = binary
+        self.hashes = hashes
+        self.changed: bool | None = None
+        self._file = None
+        self._temp_path: str | None = None
+        self._hash = hashlib.sha256()
+        # Writes through ``file`` bypass the hash, which is then read back
+        self._is_hashed = True
+
+    def open(self) -> "AtomicFileWriter":
+        directory, file_name = os.path.split(self.path)
+        descriptor, self._temp_path = tempfile.mkstemp(
+            dir=directory or ".", prefix=f".{file_name}.", suffix=".tmp"
+        )
+        os.chmod(self._temp_path, FILE_MODE)
+        self._file = os.fdopen(
+            descriptor, "wb" if self.binary else "w", buffering=self.buffer_size
+        )
+
+        return self
+
+    @property
+    def file(self):
+        self._is_hashed = False
+        return self._file
+
+    def write(self, data: bytes | str) -> None:
+        if self.hashes is not None:
+            self._hash.update(data if self.binary else data.encode())
+        self._file.write(data)
+
+    def write_lines(self, lines: Iterable[str]) -> None:
+        if self.hashes is None:
+            self._file.writelines(lines)
+            return
+
+        for line in lines:
+            self.write(line)
+
+    def commit(self) -> None:
+        self._file.close()
+        if self.hashes is None:
+            os.replace(self._temp_path, self.path)
+            self.changed = True
+            return
+
+        digest = self._get_digest()
+        self.changed = not self.hashes.is_unchanged(path=self.path, digest=digest)
+        if not self.changed:
+            os.remove(self._temp_path)
+            return
+
+        os.replace(self._temp_path, self.path)
+        self.hashes.record(path=self.path, digest=digest)
+
+    def discard(self) -> None:
+        self._file.close()
+        if os.path.exists(self._temp_path):
+            os.remove(self._temp_path)
+
+    def _get_digest(self) -> str:
+        if self._is_hashed:
+            return self._hash.hexdigest()
+
+        file_hash = hashlib.sha256()
+        with open(self._temp_path, "rb") as file:
+            for chunk in iter(lambda: file.read(self.buffer_size), b""):
+                file_hash.update(chunk)
+
+        return file_hash.hexdigest()
+
+    def __enter__(self) -> "AtomicFileWriter":
+        return self.open()
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        if exc_type is None:
+            self.commit()
+        else:
+            self.discard()